@@ -0,0 +1,43 @@
+"""
+Texts/sec for analyze() in a loop vs. analyze_many().
+
+    poetry run python -m benchmarks.bench_ner_batch --n 500 --batch-size 32 --n-process 1
+
+Set ZERO_SHOT=1 LLM_MOCK=0 to include the BART zero-shot model.
+"""
+import argparse
+import time
+
+from src.app.services import ner_cache, ner_service
+from .corpus import make_corpus
+
+def _rate(n: int, seconds: float) -> str:
+    return f"{n / seconds:8.1f} texts/s  ({seconds:.2f}s)"
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=500)
+    ap.add_argument("--batch-size", type=int, default=ner_service.BATCH_SIZE)
+    ap.add_argument("--n-process", type=int, default=1)
+    args = ap.parse_args()
+
+    texts = make_corpus(args.n)
+    ner_service._nlp()          # load models outside the timed sections
+    ner_service._zero_shot()
+    print(f"zero-shot: {'on' if ner_service.USE_ZERO_SHOT else 'off'}  n={args.n}")
+
+    ner_cache.clear()       # measure cold classification, not cache hits
+    t0 = time.perf_counter()
+    loop = [ner_service.analyze(t) for t in texts]
+    print(f"analyze() loop   {_rate(args.n, time.perf_counter() - t0)}")
+
+    ner_cache.clear()
+    t0 = time.perf_counter()
+    batch = ner_service.analyze_many(texts, batch_size=args.batch_size, n_process=args.n_process)
+    print(f"analyze_many()   {_rate(args.n, time.perf_counter() - t0)}")
+
+    mismatches = sum(a != b for a, b in zip(loop, batch))
+    print(f"mismatched items: {mismatches}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Post feed page latency at increasing depth: OFFSET vs keyset cursor.
+
+    BENCH_DATABASE_URL=postgresql+psycopg2://... poetry run python -m benchmarks.bench_pagination --rows 1000000
+
+Uses a throwaway database (tables are dropped and recreated). Seeds --rows
+posts with generate_series, then times fetching page N both ways. OFFSET
+cost grows with N; the keyset page should stay flat.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from sqlalchemy import text
+
+from src.app import create_app, db
+from src.app.models import CitizenPost, State
+from src.app.services.pagination import encode_cursor
+from src.app.services.posts_service import list_posts
+
+def seed(rows: int) -> None:
+    db.drop_all()
+    db.create_all()
+    db.session.add(State("California"))
+    db.session.commit()
+    db.session.execute(text("""
+        INSERT INTO citizen_posts (id, title, body, category, city, state_name, score, created_at)
+        SELECT gen_random_uuid(), 'post ' || g, '...', 'crime', 'Los Angeles', 'California',
+               (random() * 500)::int, now() - g * interval '1 second'
+        FROM generate_series(1, :n) g
+    """), {"n": rows})
+    db.session.commit()
+    db.session.execute(text("ANALYZE citizen_posts"))
+
+def offset_page(page: int, size: int):
+    return (CitizenPost.query
+            .order_by(CitizenPost.score.desc(), CitizenPost.created_at.desc(), CitizenPost.id.desc())
+            .offset(page * size).limit(size).all())
+
+def time_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--size", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    url = os.environ["BENCH_DATABASE_URL"]
+    app = create_app({"SQLALCHEMY_DATABASE_URI": url})
+    with app.app_context():
+        print(f"seeding {args.rows:,} posts ...")
+        seed(args.rows)
+        print(f"{'page':>8} {'offset ms':>10} {'keyset ms':>10}")
+        for page in (0, 10, 100, 1_000, 5_000):
+            if page * args.size >= args.rows:
+                break
+            # the cursor a client holds after reading `page` pages: the last row before it
+            if page:
+                last = offset_page(page - 1, args.size)[-1]
+                cursor = encode_cursor((last.score, last.created_at, last.id), "posts")
+            else:
+                cursor = None
+            off = time_ms(lambda: offset_page(page, args.size), args.repeat)
+            key = time_ms(lambda: list_posts(None, None, None, limit=args.size, cursor=cursor), args.repeat)
+            print(f"{page:>8} {off:>10.2f} {key:>10.2f}")
+
+if __name__ == "__main__":
+    main()
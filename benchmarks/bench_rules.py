@@ -0,0 +1,78 @@
+"""
+Rule matching cost as the phrase list grows: 8, 100 and 1,000 phrases.
+
+    poetry run python -m benchmarks.bench_rules --texts 2000
+
+Compares the old approach (one case-insensitive alternation regex per label,
+re.search'd in turn, plus one regex per phrase for reference) against
+rule_engine.PhraseMatcher, which scans each text once.
+"""
+import argparse
+import random
+import re
+import time
+
+from src.app.services.ner_service import CANDIDATE_LABELS, RULES
+from src.app.services.rule_engine import PhraseMatcher
+from .corpus import make_corpus
+
+def make_rules(n_phrases: int, seed: int = 11):
+    """RULES-shaped list with n_phrases spread over the 8 labels (real phrases first)."""
+    rng = random.Random(seed)
+    real = [(l, w, p) for l, w, ps in RULES for p in ps]
+    phrases = real[:n_phrases]
+    while len(phrases) < n_phrases:
+        label, weight, _ = rng.choice(real)
+        words = " ".join("".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(3, 9)))
+                         for _ in range(rng.randint(1, 3)))
+        phrases.append((label, weight, words))
+    by_label = {l: [] for l in CANDIDATE_LABELS}
+    weights = {}
+    for label, weight, phrase in phrases:
+        by_label[label].append(phrase)
+        weights[label] = weight
+    return [(l, weights[l], ps) for l, ps in by_label.items() if ps]
+
+def legacy_per_label(rules):
+    compiled = [(re.compile(r"\b(" + "|".join(map(re.escape, ps)) + r")\b", re.I), l, w) for l, w, ps in rules]
+    def scores(text):
+        best = {}
+        for rx, label, weight in compiled:
+            if rx.search(text):
+                best[label] = max(best.get(label, 0.0), weight)
+        return best
+    return scores
+
+def legacy_per_phrase(rules):
+    compiled = [(re.compile(r"\b" + re.escape(p) + r"\b", re.I), l, w) for l, w, ps in rules for p in ps]
+    def scores(text):
+        best = {}
+        for rx, label, weight in compiled:
+            if rx.search(text):
+                best[label] = max(best.get(label, 0.0), weight)
+        return best
+    return scores
+
+def _time(fn, texts) -> float:
+    t0 = time.perf_counter()
+    for t in texts:
+        fn(t)
+    return (time.perf_counter() - t0) / len(texts) * 1e6
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--texts", type=int, default=2000)
+    args = ap.parse_args()
+    texts = make_corpus(args.texts)
+
+    print(f"{'phrases':>8} {'per-label re':>14} {'per-phrase re':>14} {'matcher':>10}   (µs/text)")
+    for n in (8, 100, 1000):
+        rules = make_rules(n)
+        matcher = PhraseMatcher(rules)
+        per_label, per_phrase = legacy_per_label(rules), legacy_per_phrase(rules)
+        assert all(matcher.scores(t) == per_label(t) for t in texts[:200])
+        print(f"{n:>8} {_time(per_label, texts):>14.1f} {_time(per_phrase, texts):>14.1f} "
+              f"{_time(matcher.scores, texts):>10.1f}")
+
+if __name__ == "__main__":
+    main()
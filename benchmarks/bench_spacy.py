@@ -0,0 +1,65 @@
+"""
+Full en_core_web_sm vs. the trimmed NER-only pipeline ner_service loads.
+
+    poetry run python -m benchmarks.bench_spacy --n 2000
+
+Each pipeline is loaded in its own subprocess; reports components, RSS added
+by loading the model, per-document latency for nlp(text) and nlp.pipe, and
+whether both pipelines extract identical entities.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from .corpus import make_corpus
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return float("nan")
+
+def run_mode(mode: str, n: int):
+    from src.app.services import ner_service
+    texts = make_corpus(n)
+    before = _rss_mb()
+    nlp = ner_service.load_nlp(full=(mode == "full"))
+    loaded = _rss_mb()
+
+    nlp(texts[0])  # warm-up
+    t0 = time.perf_counter()
+    ents = [ner_service._entities_from_doc(nlp(t), t) for t in texts]
+    single = (time.perf_counter() - t0) / n
+    t0 = time.perf_counter()
+    list(nlp.pipe(texts, batch_size=ner_service.BATCH_SIZE))
+    piped = (time.perf_counter() - t0) / n
+    print(json.dumps({
+        "mode": mode, "pipes": nlp.pipe_names, "model_mb": loaded - before, "rss_mb": loaded,
+        "single_ms": single * 1000, "pipe_ms": piped * 1000, "ents": ents,
+    }))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=2000)
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return run_mode(args.child, args.n)
+
+    res = {}
+    for mode in ("full", "trimmed"):
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_spacy", "--n", str(args.n), "--child", mode],
+                             check=True, capture_output=True, text=True).stdout
+        res[mode] = json.loads(out.strip().splitlines()[-1])
+
+    print(f"{'pipeline':>8} {'model MB':>9} {'RSS MB':>8} {'nlp() ms':>9} {'pipe ms':>8}  components")
+    for mode, r in res.items():
+        print(f"{mode:>8} {r['model_mb']:>9.1f} {r['rss_mb']:>8.1f} {r['single_ms']:>9.3f} {r['pipe_ms']:>8.3f}  {r['pipes']}")
+    same = res["full"]["ents"] == res["trimmed"]["ents"]
+    print(f"identical entities on {args.n} docs: {same}")
+
+if __name__ == "__main__":
+    main()
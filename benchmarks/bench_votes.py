@@ -0,0 +1,66 @@
+"""
+Votes/sec on a single hot post: direct score update vs VOTE_BUFFER write-behind.
+
+    BENCH_DATABASE_URL=postgresql+psycopg2://... poetry run python -m benchmarks.bench_votes --votes 5000 --threads 32
+
+Uses a throwaway database (tables are dropped and recreated). Every thread
+votes on the same post with its own voter tokens, so the direct path
+serializes on that post's row lock while the buffered path only inserts
+vote rows and leaves the score to one UPDATE per flush.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.app import create_app, db
+from src.app.models import CitizenPost, State
+from src.app.models.enums import Category, VoteType
+from src.app.services import vote_buffer
+from src.app.services.posts_service import vote_post
+
+def seed() -> CitizenPost:
+    db.drop_all()
+    db.create_all()
+    db.session.add(State("California"))
+    post = CitizenPost(title="hot post", body="...", category=Category.crime, city="Los Angeles", state_name="California")
+    db.session.add(post)
+    db.session.commit()
+    return post
+
+def run(app, post_id, votes: int, threads: int, buffered: bool, tag: str) -> float:
+    def cast(i):
+        with app.app_context():
+            vote_post(post_id, f"{tag}-{i}", VoteType.up, buffered=buffered)
+            db.session.remove()
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(cast, range(votes)))
+    if buffered:
+        vote_buffer.buffer.flush()
+    return votes / (time.perf_counter() - t0)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--votes", type=int, default=2_000)
+    ap.add_argument("--threads", type=int, default=16)
+    args = ap.parse_args()
+
+    url = os.environ["BENCH_DATABASE_URL"]
+    app = create_app({"SQLALCHEMY_DATABASE_URI": url,
+                      "SQLALCHEMY_ENGINE_OPTIONS": {"pool_size": args.threads, "max_overflow": 0}})
+    with app.app_context():
+        post_id = seed().id
+        db.session.remove()
+        print(f"{'mode':>10} {'votes/s':>10}")
+        for mode, buffered in (("direct", False), ("buffered", True)):
+            rate = run(app, post_id, args.votes, args.threads, buffered, mode)
+            print(f"{mode:>10} {rate:>10.0f}")
+        db.session.expire_all()
+        score = db.session.get(CitizenPost, post_id).score
+        print(f"final score {score} (expected {2 * args.votes})")
+        print(vote_buffer.stats())
+
+if __name__ == "__main__":
+    main()
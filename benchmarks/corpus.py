@@ -0,0 +1,22 @@
+"""Synthetic civic-post corpus shared by the benchmark scripts."""
+import random
+from typing import List
+
+SAMPLE_TEXTS = [
+    "Our neighborhood is a food desert with no grocery store within two miles.",
+    "Two shootings and a car break-in last week near Market St.",
+    "The pothole on Sunset Blvd has caused another collision this month.",
+    "Landlord announced a rent hike of 20% and tenants fear eviction.",
+    "City council is voting on a rezoning variance for the lot on Main Street.",
+    "The bus to the metro station has been late every morning since March.",
+    "Mayor proposes a funding cut to parks in the 2025 budget.",
+    "The urgent care clinic on 5th Ave closed and overdose calls are up.",
+    "Can we get a crosswalk by the elementary school? Drivers keep speeding.",
+    "Homeless encampment under the freeway keeps growing, shelter beds are full.",
+    "Proposed bond measure would fund a new subway line and bike lane network.",
+    "Nothing much happened at the meeting on Tuesday, just public comment.",
+]
+
+def make_corpus(n: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [f"{rng.choice(SAMPLE_TEXTS)} (report #{i})" for i in range(n)]
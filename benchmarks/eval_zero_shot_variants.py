@@ -0,0 +1,100 @@
+"""
+Offline comparison of zero-shot variants against the fp32 model.
+
+    poetry run python -m benchmarks.eval_zero_shot_variants
+    poetry run python -m benchmarks.eval_zero_shot_variants --variants fp32,int8 --corpus posts.txt
+
+Each variant is loaded in its own subprocess so RSS numbers don't bleed into
+each other. Reports, per variant: load time, RSS after load, per-text
+latency (mean / p95), top-1 agreement and label-set agreement (score >= 0.5)
+with fp32, and mean / max absolute score drift per label.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from src.app.services import ner_service
+from .corpus import SAMPLE_TEXTS
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return float("nan")
+
+def run_variant(variant: str, texts):
+    """Runs inside the child process; prints one JSON line."""
+    t0 = time.perf_counter()
+    pipe = ner_service.load_zero_shot(variant)
+    load_s = time.perf_counter() - t0
+    rss = _rss_mb()
+    pipe(texts[0], ner_service.CANDIDATE_LABELS, multi_label=True)  # warm-up
+    scores, lat = [], []
+    for t in texts:
+        t0 = time.perf_counter()
+        out = pipe(t, ner_service.CANDIDATE_LABELS, multi_label=True)
+        lat.append(time.perf_counter() - t0)
+        scores.append(dict(zip(out["labels"], map(float, out["scores"]))))
+    print(json.dumps({"variant": variant, "load_s": load_s, "rss_mb": rss, "latency_s": lat, "scores": scores}))
+
+def _spawn(variant: str, corpus_path):
+    cmd = [sys.executable, "-m", "benchmarks.eval_zero_shot_variants", "--child", variant]
+    if corpus_path:
+        cmd += ["--corpus", corpus_path]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True, env=os.environ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def compare(base, other, threshold: float = 0.5):
+    labels = ner_service.CANDIDATE_LABELS
+    n = len(base["scores"])
+    top1 = sum(max(b, key=b.get) == max(o, key=o.get) for b, o in zip(base["scores"], other["scores"]))
+    sets = sum({l for l in labels if b[l] >= threshold} == {l for l in labels if o[l] >= threshold}
+               for b, o in zip(base["scores"], other["scores"]))
+    drift = {l: [abs(b[l] - o[l]) for b, o in zip(base["scores"], other["scores"])] for l in labels}
+    return {
+        "top1_agreement": top1 / n,
+        "labelset_agreement": sets / n,
+        "drift": {l: (sum(d) / n, max(d)) for l, d in drift.items()},
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--variants", default=",".join(ner_service.ZERO_SHOT_VARIANTS))
+    ap.add_argument("--corpus", help="text file, one post per line (default: benchmarks.corpus.SAMPLE_TEXTS)")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    texts = SAMPLE_TEXTS
+    if args.corpus:
+        with open(args.corpus) as f:
+            texts = [line.strip() for line in f if line.strip()]
+    if args.child:
+        return run_variant(args.child, texts)
+
+    variants = args.variants.split(",")
+    if "fp32" not in variants:
+        variants.insert(0, "fp32")
+    results = {v: _spawn(v, args.corpus) for v in variants}
+    base = results["fp32"]
+
+    print(f"corpus: {len(texts)} texts")
+    print(f"{'variant':>15} {'load s':>7} {'RSS MB':>8} {'mean ms':>8} {'p95 ms':>8} {'top1':>6} {'labels':>7}")
+    for v, r in results.items():
+        lat = sorted(r["latency_s"])
+        cmp = compare(base, r)
+        print(f"{v:>15} {r['load_s']:>7.1f} {r['rss_mb']:>8.0f} {sum(lat) / len(lat) * 1000:>8.1f} "
+              f"{lat[int(0.95 * (len(lat) - 1))] * 1000:>8.1f} {cmp['top1_agreement']:>6.2f} "
+              f"{cmp['labelset_agreement']:>7.2f}")
+    for v, r in results.items():
+        if v == "fp32":
+            continue
+        print(f"\nscore drift vs fp32: {v}  (mean / max abs)")
+        for label, (mean, worst) in compare(base, r)["drift"].items():
+            print(f"  {label:>12} {mean:.4f} / {worst:.4f}")
+
+if __name__ == "__main__":
+    main()
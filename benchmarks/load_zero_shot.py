@@ -0,0 +1,84 @@
+"""
+Throughput and p50/p99 latency of zero-shot scoring under 1, 8 and 32
+concurrent callers, direct (batch size 1 per caller) vs. the micro-batcher.
+
+    ZERO_SHOT=1 LLM_MOCK=0 poetry run python -m benchmarks.load_zero_shot
+    poetry run python -m benchmarks.load_zero_shot --fake   # no model: simulated cost
+
+--fake replaces the pipeline with one that costs base + per-item ms and can
+only run one batch at a time (one CPU's worth of model), which is enough to
+see the batching effect without downloading BART.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from src.app.services import ner_service
+from src.app.services.inference_batcher import MicroBatcher
+from .corpus import make_corpus
+
+def fake_pipeline(base_ms: float, per_item_ms: float):
+    lock = Lock()
+    def run(texts, labels, multi_label=True, batch_size=1):
+        items = texts if isinstance(texts, list) else [texts]
+        with lock:
+            time.sleep((base_ms + per_item_ms * len(items)) / 1000.0)
+        outs = [{"labels": list(labels), "scores": [0.5] * len(labels)} for _ in items]
+        return outs if isinstance(texts, list) else outs[0]
+    return run
+
+def run_load(score_one, texts, concurrency: int, per_worker: int):
+    latencies = []
+    lat_lock = Lock()
+
+    def worker(w: int):
+        for i in range(per_worker):
+            t0 = time.perf_counter()
+            score_one(texts[(w * per_worker + i) % len(texts)])
+            with lat_lock:
+                latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(worker, range(concurrency)))
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    return len(latencies) / wall, p(0.50), p(0.99)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--concurrency", default="1,8,32")
+    ap.add_argument("--per-worker", type=int, default=20)
+    ap.add_argument("--max-batch", type=int, default=ner_service.BATCHER_MAX_BATCH)
+    ap.add_argument("--max-wait-ms", type=float, default=ner_service.BATCHER_MAX_WAIT_MS)
+    ap.add_argument("--fake", action="store_true")
+    ap.add_argument("--fake-base-ms", type=float, default=40.0)
+    ap.add_argument("--fake-per-item-ms", type=float, default=6.0)
+    args = ap.parse_args()
+
+    if args.fake:
+        pipe = fake_pipeline(args.fake_base_ms, args.fake_per_item_ms)
+        ner_service._zero_shot = lambda: pipe
+    elif ner_service._zero_shot() is None:
+        raise SystemExit("zero-shot disabled: set ZERO_SHOT=1 LLM_MOCK=0, or pass --fake")
+
+    texts = make_corpus(256)
+    batcher = MicroBatcher(
+        lambda batch: ner_service._zero_shot_direct(batch, args.max_batch),
+        max_batch=args.max_batch, max_wait_ms=args.max_wait_ms, max_queue=1024, submit_timeout=5.0,
+    )
+    modes = {
+        "direct": lambda t: ner_service._zero_shot_direct([t])[0],
+        "batched": lambda t: batcher(t),
+    }
+    print(f"{'callers':>7} {'mode':>8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for c in (int(x) for x in args.concurrency.split(",")):
+        for name, fn in modes.items():
+            rps, p50, p99 = run_load(fn, texts, c, args.per_worker)
+            print(f"{c:>7} {name:>8} {rps:>9.1f} {p50:>9.1f} {p99:>9.1f}")
+    print("batcher:", batcher.stats())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""keyset pagination indexes
+
+Revision ID: 1a6d9f3e8c40
+Revises: e7c3a95f0b18
+Create Date: 2025-11-10 11:47:23.918402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '1a6d9f3e8c40'
+down_revision = 'e7c3a95f0b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("UPDATE citizen_posts SET score = 0 WHERE score IS NULL")
+    with op.batch_alter_table('citizen_posts', schema=None) as batch_op:
+        batch_op.alter_column('score', existing_type=sa.Integer(), nullable=False, server_default='0')
+        batch_op.drop_index('ix_citizen_posts_city_key')
+        batch_op.create_index('ix_citizen_posts_city_key', [sa.text('lower(city)'), 'score', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_citizen_posts_feed', ['score', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('sources', schema=None) as batch_op:
+        batch_op.drop_index('ix_sources_body_recent')
+        batch_op.create_index('ix_sources_body_recent', ['body_id', 'meeting_datetime', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_sources_recent', ['meeting_datetime', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_sources_undated', ['created_at', 'id'], unique=False, postgresql_where=sa.text('meeting_datetime IS NULL'))
+
+
+def downgrade():
+    with op.batch_alter_table('sources', schema=None) as batch_op:
+        batch_op.drop_index('ix_sources_undated', postgresql_where=sa.text('meeting_datetime IS NULL'))
+        batch_op.drop_index('ix_sources_recent')
+        batch_op.drop_index('ix_sources_body_recent')
+        batch_op.create_index('ix_sources_body_recent', ['body_id', sa.text('meeting_datetime DESC NULLS LAST'), sa.text('created_at DESC'), 'id'], unique=False)
+
+    with op.batch_alter_table('citizen_posts', schema=None) as batch_op:
+        batch_op.drop_index('ix_citizen_posts_feed')
+        batch_op.drop_index('ix_citizen_posts_city_key')
+        batch_op.create_index('ix_citizen_posts_city_key', [sa.text('lower(city)'), sa.text('score DESC'), sa.text('created_at DESC'), 'id'], unique=False)
+        batch_op.alter_column('score', existing_type=sa.Integer(), nullable=True, server_default=None)
@@ -0,0 +1,35 @@
+"""classification cache table
+
+Revision ID: 3c1f7a9e2b40
+Revises: f803498db830
+Create Date: 2025-11-02 10:14:22.481903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '3c1f7a9e2b40'
+down_revision = 'f803498db830'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('classification_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.String(length=64), nullable=False),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('classification_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_classification_cache_version'), ['version'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('classification_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_classification_cache_version'))
+
+    op.drop_table('classification_cache')
@@ -0,0 +1,165 @@
+"""category rollups
+
+Revision ID: 5e9a1d4c7b26
+Revises: 8d2e5b7c1a93
+Create Date: 2025-11-06 10:12:47.381920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5e9a1d4c7b26'
+down_revision = '8d2e5b7c1a93'
+branch_labels = None
+depends_on = None
+
+# frozen copy of app.models.rollups.ROLLUP_TRIGGERS_SQL at this revision
+TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION rollup_source_tags(p_body_id uuid, p_tags varchar[], p_delta integer) RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO jurisdiction_category_counts AS c (jurisdiction_id, category, source_count)
+    SELECT b.jurisdiction_id, t.tag, p_delta
+    FROM bodies b, (SELECT DISTINCT unnest(p_tags) AS tag) t
+    WHERE b.id = p_body_id AND t.tag IS NOT NULL
+    ON CONFLICT (jurisdiction_id, category) DO UPDATE SET source_count = c.source_count + excluded.source_count
+$$;
+
+CREATE OR REPLACE FUNCTION sources_rollup_stmt() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO jurisdiction_category_counts AS c (jurisdiction_id, category, source_count)
+        SELECT b.jurisdiction_id, t.tag, count(*)
+        FROM new_rows s JOIN bodies b ON b.id = s.body_id
+        CROSS JOIN LATERAL (SELECT DISTINCT unnest(s.tags) AS tag) t
+        WHERE t.tag IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT (jurisdiction_id, category) DO UPDATE SET source_count = c.source_count + excluded.source_count;
+    ELSE
+        UPDATE jurisdiction_category_counts c SET source_count = c.source_count - d.n
+        FROM (
+            SELECT b.jurisdiction_id, t.tag AS category, count(*) AS n
+            FROM old_rows s JOIN bodies b ON b.id = s.body_id
+            CROSS JOIN LATERAL (SELECT DISTINCT unnest(s.tags) AS tag) t
+            WHERE t.tag IS NOT NULL
+            GROUP BY 1, 2
+        ) d
+        WHERE c.jurisdiction_id = d.jurisdiction_id AND c.category = d.category;
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION sources_rollup_row() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM rollup_source_tags(OLD.body_id, OLD.tags, -1);
+    PERFORM rollup_source_tags(NEW.body_id, NEW.tags, 1);
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION citizen_posts_rollup_stmt() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO post_geo_category_counts AS c (state_key, city_key, county_key, category, post_count)
+        SELECT lower(state_name), lower(city), coalesce(lower(county), ''), category::text, count(*)
+        FROM new_rows GROUP BY 1, 2, 3, 4
+        ON CONFLICT (state_key, city_key, county_key, category) DO UPDATE SET post_count = c.post_count + excluded.post_count;
+    ELSE
+        UPDATE post_geo_category_counts c SET post_count = c.post_count - d.n
+        FROM (
+            SELECT lower(state_name) AS state_key, lower(city) AS city_key, coalesce(lower(county), '') AS county_key,
+                   category::text AS category, count(*) AS n
+            FROM old_rows GROUP BY 1, 2, 3, 4
+        ) d
+        WHERE (c.state_key, c.city_key, c.county_key, c.category) = (d.state_key, d.city_key, d.county_key, d.category);
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION citizen_posts_rollup_row() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE post_geo_category_counts SET post_count = post_count - 1
+    WHERE state_key = lower(OLD.state_name) AND city_key = lower(OLD.city)
+      AND county_key = coalesce(lower(OLD.county), '') AND category = OLD.category::text;
+    INSERT INTO post_geo_category_counts AS c (state_key, city_key, county_key, category, post_count)
+    VALUES (lower(NEW.state_name), lower(NEW.city), coalesce(lower(NEW.county), ''), NEW.category::text, 1)
+    ON CONFLICT (state_key, city_key, county_key, category) DO UPDATE SET post_count = c.post_count + 1;
+    RETURN NULL;
+END $$;
+
+CREATE TRIGGER sources_rollup_ins AFTER INSERT ON sources
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION sources_rollup_stmt();
+CREATE TRIGGER sources_rollup_del AFTER DELETE ON sources
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION sources_rollup_stmt();
+CREATE TRIGGER sources_rollup_upd AFTER UPDATE OF tags, body_id ON sources FOR EACH ROW
+    WHEN (OLD.tags IS DISTINCT FROM NEW.tags OR OLD.body_id IS DISTINCT FROM NEW.body_id)
+    EXECUTE FUNCTION sources_rollup_row();
+
+CREATE TRIGGER citizen_posts_rollup_ins AFTER INSERT ON citizen_posts
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION citizen_posts_rollup_stmt();
+CREATE TRIGGER citizen_posts_rollup_del AFTER DELETE ON citizen_posts
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION citizen_posts_rollup_stmt();
+CREATE TRIGGER citizen_posts_rollup_upd AFTER UPDATE OF category, city, county, state_name ON citizen_posts FOR EACH ROW
+    WHEN ((OLD.category, OLD.city, OLD.county, OLD.state_name) IS DISTINCT FROM (NEW.category, NEW.city, NEW.county, NEW.state_name))
+    EXECUTE FUNCTION citizen_posts_rollup_row();
+"""
+
+BACKFILL_SQL = """
+DELETE FROM jurisdiction_category_counts;
+INSERT INTO jurisdiction_category_counts (jurisdiction_id, category, source_count)
+SELECT b.jurisdiction_id, t.tag, count(*)
+FROM sources s JOIN bodies b ON b.id = s.body_id
+CROSS JOIN LATERAL (SELECT DISTINCT unnest(s.tags) AS tag) t
+WHERE t.tag IS NOT NULL
+GROUP BY 1, 2;
+
+DELETE FROM post_geo_category_counts;
+INSERT INTO post_geo_category_counts (state_key, city_key, county_key, category, post_count)
+SELECT lower(state_name), lower(city), coalesce(lower(county), ''), category::text, count(*)
+FROM citizen_posts GROUP BY 1, 2, 3, 4;
+"""
+
+
+def upgrade():
+    op.create_table('jurisdiction_category_counts',
+    sa.Column('jurisdiction_id', sa.UUID(), nullable=False),
+    sa.Column('category', sa.String(length=64), nullable=False),
+    sa.Column('source_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['jurisdiction_id'], ['jurisdictions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('jurisdiction_id', 'category')
+    )
+    op.create_table('post_geo_category_counts',
+    sa.Column('state_key', sa.String(length=50), nullable=False),
+    sa.Column('city_key', sa.String(length=120), nullable=False),
+    sa.Column('county_key', sa.String(length=120), nullable=False),
+    sa.Column('category', sa.String(length=32), nullable=False),
+    sa.Column('post_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('state_key', 'city_key', 'county_key', 'category')
+    )
+    with op.batch_alter_table('post_geo_category_counts', schema=None) as batch_op:
+        batch_op.create_index('ix_post_geo_category_counts_city_key', ['city_key'], unique=False)
+        batch_op.create_index('ix_post_geo_category_counts_county_key', ['county_key'], unique=False)
+
+    op.execute(TRIGGERS_SQL)
+    op.execute(BACKFILL_SQL)
+
+
+def downgrade():
+    op.execute("""
+DROP TRIGGER IF EXISTS citizen_posts_rollup_upd ON citizen_posts;
+DROP TRIGGER IF EXISTS citizen_posts_rollup_del ON citizen_posts;
+DROP TRIGGER IF EXISTS citizen_posts_rollup_ins ON citizen_posts;
+DROP TRIGGER IF EXISTS sources_rollup_upd ON sources;
+DROP TRIGGER IF EXISTS sources_rollup_del ON sources;
+DROP TRIGGER IF EXISTS sources_rollup_ins ON sources;
+DROP FUNCTION IF EXISTS citizen_posts_rollup_row();
+DROP FUNCTION IF EXISTS citizen_posts_rollup_stmt();
+DROP FUNCTION IF EXISTS sources_rollup_row();
+DROP FUNCTION IF EXISTS sources_rollup_stmt();
+DROP FUNCTION IF EXISTS rollup_source_tags(uuid, varchar[], integer);
+""")
+    with op.batch_alter_table('post_geo_category_counts', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_geo_category_counts_county_key')
+        batch_op.drop_index('ix_post_geo_category_counts_city_key')
+
+    op.drop_table('post_geo_category_counts')
+    op.drop_table('jurisdiction_category_counts')
@@ -0,0 +1,44 @@
+"""enrichments table
+
+Revision ID: 8d2e5b7c1a93
+Revises: 3c1f7a9e2b40
+Create Date: 2025-11-04 16:40:09.112734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '8d2e5b7c1a93'
+down_revision = '3c1f7a9e2b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('enrichments',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('post_id', sa.UUID(), nullable=True),
+    sa.Column('text_hash', sa.String(length=64), nullable=False),
+    sa.Column('primary_category', sa.String(length=32), nullable=True),
+    sa.Column('categories', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('tags', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('entities', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.Column('tier', sa.String(length=16), nullable=True),
+    sa.Column('latency_ms', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['post_id'], ['citizen_posts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('enrichments', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_enrichments_post_id'), ['post_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_enrichments_text_hash'), ['text_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('enrichments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_enrichments_text_hash'))
+        batch_op.drop_index(batch_op.f('ix_enrichments_post_id'))
+
+    op.drop_table('enrichments')
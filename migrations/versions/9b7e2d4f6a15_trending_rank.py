@@ -0,0 +1,29 @@
+"""trending rank column
+
+Revision ID: 9b7e2d4f6a15
+Revises: 1a6d9f3e8c40
+Create Date: 2025-11-12 16:21:08.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9b7e2d4f6a15'
+down_revision = '1a6d9f3e8c40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('citizen_posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('hot_rank', sa.Float(), sa.Computed("sign(score::float8) * log(greatest(abs(score), 1)::float8) + coalesce(extract(epoch FROM created_at), 0)::float8 / 45000", persisted=True), nullable=True))
+        batch_op.create_index('ix_citizen_posts_trending', ['hot_rank', 'id'], unique=False)
+        batch_op.create_index('ix_citizen_posts_geo_trending', ['state_name', sa.text('lower(city)'), 'category', 'hot_rank', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('citizen_posts', schema=None) as batch_op:
+        batch_op.drop_index('ix_citizen_posts_geo_trending')
+        batch_op.drop_index('ix_citizen_posts_trending')
+        batch_op.drop_column('hot_rank')
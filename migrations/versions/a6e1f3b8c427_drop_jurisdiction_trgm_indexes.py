@@ -0,0 +1,32 @@
+"""drop jurisdiction trigram indexes
+
+Revision ID: a6e1f3b8c427
+Revises: f4b9d2c7e815
+Create Date: 2025-11-18 14:05:51.630288
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a6e1f3b8c427'
+down_revision = 'f4b9d2c7e815'
+branch_labels = None
+depends_on = None
+
+# jurisdiction matching moved to the in-memory GeoResolver; these had no reader
+JURISDICTION_TRGM_INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS ix_jurisdictions_name_trgm ON jurisdictions USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_jurisdictions_state_name_trgm ON jurisdictions USING gin (state_name gin_trgm_ops);
+"""
+
+
+def upgrade():
+    op.execute("DROP INDEX IF EXISTS ix_jurisdictions_state_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_jurisdictions_name_trgm")
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.execute(sa.text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first():
+        op.execute(JURISDICTION_TRGM_INDEXES_SQL)
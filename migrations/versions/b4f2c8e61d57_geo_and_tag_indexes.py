@@ -0,0 +1,66 @@
+"""geo and tag indexes
+
+Revision ID: b4f2c8e61d57
+Revises: 5e9a1d4c7b26
+Create Date: 2025-11-07 09:31:05.227114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b4f2c8e61d57'
+down_revision = '5e9a1d4c7b26'
+branch_labels = None
+depends_on = None
+
+# frozen copy of app.models.trgm.TRGM_INDEXES_SQL at this revision
+TRGM_INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS ix_jurisdictions_name_trgm ON jurisdictions USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_jurisdictions_state_name_trgm ON jurisdictions USING gin (state_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_bodies_name_trgm ON bodies USING gin (name gin_trgm_ops);
+"""
+
+
+def upgrade():
+    with op.batch_alter_table('bodies', schema=None) as batch_op:
+        batch_op.create_index('ix_bodies_jurisdiction_id', ['jurisdiction_id'], unique=False)
+
+    with op.batch_alter_table('sources', schema=None) as batch_op:
+        batch_op.create_index('ix_sources_tags', ['tags'], unique=False, postgresql_using='gin')
+        batch_op.create_index('ix_sources_body_recent', ['body_id', sa.text('meeting_datetime DESC NULLS LAST'), sa.text('created_at DESC'), 'id'], unique=False)
+
+    with op.batch_alter_table('citizen_posts', schema=None) as batch_op:
+        batch_op.create_index('ix_citizen_posts_city_key', [sa.text('lower(city)'), sa.text('score DESC'), sa.text('created_at DESC'), 'id'], unique=False)
+        batch_op.create_index('ix_citizen_posts_county_key', [sa.text('lower(county)')], unique=False)
+        batch_op.create_index('ix_citizen_posts_state_key', [sa.text('lower(state_name)')], unique=False)
+
+    with op.batch_alter_table('geo_context', schema=None) as batch_op:
+        batch_op.create_index('ix_geo_context_geo_key', [sa.text('lower(city)'), 'state_name', sa.text('as_of DESC NULLS LAST')], unique=False)
+
+    # trigram indexes only where pg_trgm is installable (postgres-contrib)
+    conn = op.get_bind()
+    if conn.execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(TRGM_INDEXES_SQL)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_bodies_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_jurisdictions_state_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_jurisdictions_name_trgm")
+
+    with op.batch_alter_table('geo_context', schema=None) as batch_op:
+        batch_op.drop_index('ix_geo_context_geo_key')
+
+    with op.batch_alter_table('citizen_posts', schema=None) as batch_op:
+        batch_op.drop_index('ix_citizen_posts_state_key')
+        batch_op.drop_index('ix_citizen_posts_county_key')
+        batch_op.drop_index('ix_citizen_posts_city_key')
+
+    with op.batch_alter_table('sources', schema=None) as batch_op:
+        batch_op.drop_index('ix_sources_body_recent')
+        batch_op.drop_index('ix_sources_tags', postgresql_using='gin')
+
+    with op.batch_alter_table('bodies', schema=None) as batch_op:
+        batch_op.drop_index('ix_bodies_jurisdiction_id')
@@ -0,0 +1,25 @@
+"""geo_context updated_at
+
+Revision ID: b8d4e2a6f153
+Revises: a6e1f3b8c427
+Create Date: 2025-11-18 16:48:12.904417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b8d4e2a6f153'
+down_revision = 'a6e1f3b8c427'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('geo_context', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('geo_context', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,32 @@
+"""store ner analysis on citizen_posts
+
+Revision ID: c2a8f1e5d304
+Revises: 9b7e2d4f6a15
+Create Date: 2025-11-13 10:38:54.117260
+
+Existing posts get NULL categories/tags/entities (list and discover show
+them as []). Fill them in after upgrading with `flask posts backfill-analysis`.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c2a8f1e5d304'
+down_revision = '9b7e2d4f6a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('citizen_posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('categories', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+        batch_op.add_column(sa.Column('tags', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+        batch_op.add_column(sa.Column('entities', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('citizen_posts', schema=None) as batch_op:
+        batch_op.drop_column('entities')
+        batch_op.drop_column('tags')
+        batch_op.drop_column('categories')
@@ -0,0 +1,44 @@
+"""geo_context upsert key
+
+Revision ID: d5f3b9a7c621
+Revises: c2a8f1e5d304
+Create Date: 2025-11-14 09:12:40.553802
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd5f3b9a7c621'
+down_revision = 'c2a8f1e5d304'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # keep one row of any (city, state, as_of) duplicates before adding the key:
+    # the one with the most data columns filled in, a crime index winning ties
+    # (equally complete rows are interchangeable; the lowest id stays)
+    op.execute("""
+        DELETE FROM geo_context WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY lower(city), state_name, as_of
+                    ORDER BY num_nonnulls(crime_index_12mo, median_rent_usd, median_income_usd, population,
+                                          percent_poverty, county, zipcode) DESC,
+                             crime_index_12mo IS NOT NULL DESC,
+                             id
+                ) AS rank
+                FROM geo_context
+                WHERE city IS NOT NULL AND as_of IS NOT NULL
+            ) ranked
+            WHERE rank > 1
+        )
+    """)
+    with op.batch_alter_table('geo_context', schema=None) as batch_op:
+        batch_op.create_index('uq_geo_context_geo_as_of', [sa.text('lower(city)'), 'state_name', 'as_of'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('geo_context', schema=None) as batch_op:
+        batch_op.drop_index('uq_geo_context_geo_as_of')
@@ -0,0 +1,37 @@
+"""law enforcement agencies (city -> ORI index)
+
+Revision ID: e1c7a4d9b382
+Revises: d5f3b9a7c621
+Create Date: 2025-11-15 13:27:06.910451
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e1c7a4d9b382'
+down_revision = 'd5f3b9a7c621'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('law_enforcement_agencies',
+    sa.Column('ori', sa.String(length=9), nullable=False),
+    sa.Column('state_name', sa.String(length=50), nullable=False),
+    sa.Column('agency_name', sa.String(length=200), nullable=False),
+    sa.Column('agency_type', sa.String(length=64), nullable=True),
+    sa.Column('city', sa.String(length=120), nullable=True),
+    sa.Column('county', sa.String(length=120), nullable=True),
+    sa.ForeignKeyConstraint(['state_name'], ['states.state_name'], ),
+    sa.PrimaryKeyConstraint('ori')
+    )
+    with op.batch_alter_table('law_enforcement_agencies', schema=None) as batch_op:
+        batch_op.create_index('ix_law_enforcement_agencies_geo_key', [sa.text('lower(city)'), 'state_name'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('law_enforcement_agencies', schema=None) as batch_op:
+        batch_op.drop_index('ix_law_enforcement_agencies_geo_key')
+
+    op.drop_table('law_enforcement_agencies')
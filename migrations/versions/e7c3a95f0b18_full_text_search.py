@@ -0,0 +1,36 @@
+"""full-text search columns
+
+Revision ID: e7c3a95f0b18
+Revises: b4f2c8e61d57
+Create Date: 2025-11-08 14:02:51.640318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'e7c3a95f0b18'
+down_revision = 'b4f2c8e61d57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('sources', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('english', coalesce(title, '')), 'A') || setweight(to_tsvector('english', coalesce(summary, '')), 'B')", persisted=True), nullable=True))
+        batch_op.create_index('ix_sources_search_vector', ['search_vector'], unique=False, postgresql_using='gin')
+
+    with op.batch_alter_table('citizen_posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('english', coalesce(title, '')), 'A') || setweight(to_tsvector('english', coalesce(body, '')), 'B')", persisted=True), nullable=True))
+        batch_op.create_index('ix_citizen_posts_search_vector', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    with op.batch_alter_table('citizen_posts', schema=None) as batch_op:
+        batch_op.drop_index('ix_citizen_posts_search_vector', postgresql_using='gin')
+        batch_op.drop_column('search_vector')
+
+    with op.batch_alter_table('sources', schema=None) as batch_op:
+        batch_op.drop_index('ix_sources_search_vector', postgresql_using='gin')
+        batch_op.drop_column('search_vector')
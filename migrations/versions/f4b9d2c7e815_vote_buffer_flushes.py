@@ -0,0 +1,29 @@
+"""vote buffer flush generations
+
+Revision ID: f4b9d2c7e815
+Revises: e1c7a4d9b382
+Create Date: 2025-11-18 10:42:37.215904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'f4b9d2c7e815'
+down_revision = 'e1c7a4d9b382'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('vote_buffer_flushes',
+    sa.Column('buffer_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('generation', sa.BigInteger(), nullable=False),
+    sa.Column('flushed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('buffer_id')
+    )
+
+
+def downgrade():
+    op.drop_table('vote_buffer_flushes')
@@ -7,9 +7,11 @@ from .config import Config
 db = SQLAlchemy()
 migrate = Migrate()
 
-def create_app():
+def create_app(test_config=None):
     app = Flask(__name__)
     app.config.from_object(Config)
+    if test_config:
+        app.config.update(test_config)
 
     db.init_app(app)
     migrate.init_app(app, db)
@@ -17,12 +19,15 @@ def create_app():
     from . import models
 
     CORS(app, resources={r"/api/*": {"origins": app.config.get("CORS_ORIGINS", [])}},
-         supports_credentials=True)
+         supports_credentials=True, expose_headers=["X-Next-Cursor", "ETag"])
 
     # register blueprints under /api/v1
     from .routes import bp as routes_bp
     app.register_blueprint(routes_bp, url_prefix="/api/v1")
 
+    from .commands import register_commands
+    register_commands(app)
+
     # root ping
     @app.get("/")
     def index():
@@ -0,0 +1,178 @@
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU map with hit/miss counters.
+    maxsize <= 0 disables the cache (every get is a miss, puts are dropped).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Optional[Any]:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class TTLCache(LRUCache):
+    """
+    LRUCache whose entries also expire `ttl` seconds after they were put.
+    Expired entries count as misses and are dropped on access; ttl <= 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        super().__init__(maxsize if ttl > 0 else 0)
+        self.ttl = ttl
+        self.expired = 0
+        self._clock = clock
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expired += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        super().put(key, (self._clock() + self.ttl, value))
+
+    def pop(self, key: Hashable, default: Any = None) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return entry[1] if entry is not None else default
+
+    def pop_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key satisfies predicate; returns how many were removed."""
+        with self._lock:
+            doomed = [k for k in self._data if predicate(k)]
+            for k in doomed:
+                del self._data[k]
+        return len(doomed)
+
+    def stats(self) -> Dict[str, int]:
+        return {**super().stats(), "ttl": self.ttl, "expired": self.expired}
+
+
+class SWRCache:
+    """
+    Stale-while-revalidate cache with request collapsing.
+
+    get(key, loader): an entry younger than `ttl` is returned as is. Up to
+    `stale_ttl` seconds past that it is still returned, and one background
+    thread reloads it (a failed reload keeps the stale value). Older or
+    missing entries are loaded inline, and concurrent callers for the same key
+    wait for that single load instead of each calling `loader` (its
+    exception, if any, is raised to all of them). Bounded to `maxsize` keys, LRU.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0, stale_ttl: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()  # key -> (loaded_at, value)
+        self._inflight: Dict[Hashable, "Future"] = {}
+        self._lock = Lock()
+        self._counts = {"hits": 0, "stale_hits": 0, "misses": 0, "collapsed": 0, "refreshes": 0, "errors": 0}
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            age = self._clock() - entry[0] if entry is not None else None
+            if age is not None and age < self.ttl + self.stale_ttl:
+                self._data.move_to_end(key)
+                if age < self.ttl:
+                    self._counts["hits"] += 1
+                    return entry[1]
+                self._counts["stale_hits"] += 1
+                if key not in self._inflight:
+                    pending = self._inflight[key] = Future()
+                    Thread(target=self._load, args=(key, loader, pending, True), daemon=True).start()
+                return entry[1]
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                self._counts["misses"] += 1
+                pending = self._inflight[key] = Future()
+            else:
+                self._counts["collapsed"] += 1
+        if owner:
+            self._load(key, loader, pending, False)
+        return pending.result()
+
+    def _load(self, key: Hashable, loader: Callable[[], Any], pending: "Future", background: bool) -> None:
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self._counts["errors"] += 1
+            pending.set_exception(e)
+            return
+        with self._lock:
+            self._data[key] = (self._clock(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            self._inflight.pop(key, None)
+            if background:
+                self._counts["refreshes"] += 1
+        pending.set_result(value)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "ttl": self.ttl, "stale_ttl": self.stale_ttl,
+                    "inflight": len(self._inflight), **self._counts}
@@ -0,0 +1,138 @@
+import os
+
+import click
+from flask.cli import AppGroup
+
+rollups_cli = AppGroup("rollups", help="Maintain the discover category rollup tables.")
+
+@rollups_cli.command("rebuild")
+def rebuild_rollups():
+    """Recount category rollups from sources and citizen posts."""
+    from .services.discover_service import rebuild_category_rollups
+    for table, n in rebuild_category_rollups().items():
+        click.echo(f"{table}: {n} rows")
+
+posts_cli = AppGroup("posts", help="Citizen post maintenance.")
+
+@posts_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", "fmt", type=click.Choice(["ndjson", "csv"]), default=None,
+              help="Input format (default: from the file extension).")
+@click.option("--batch-size", default=500, show_default=True, help="Rows per classification batch and commit.")
+@click.option("--rejects", type=click.Path(dir_okay=False), default=None,
+              help="Where rejected rows go (default: PATH.rejects.ndjson).")
+@click.option("--resume/--no-resume", default=True, show_default=True,
+              help="Continue after the last row committed by a previous run (PATH.progress).")
+@click.option("--no-entities", is_flag=True, help="Skip spaCy entity extraction.")
+@click.option("--source", default=None,
+              help="Stable name of this input in post ids (default: file name plus a hash of its first 64 KB).")
+def import_posts(path, fmt, batch_size, rejects, resume, no_entities, source):
+    """Stream NDJSON/CSV citizen posts into the database."""
+    from .services import post_import
+    fmt = fmt or ("csv" if path.lower().endswith(".csv") else "ndjson")
+    source = source or post_import.source_for(path)
+    progress = f"{path}.progress"
+    start_after = 0
+    if resume and os.path.exists(progress):
+        with open(progress) as f:
+            done_source, _, row = f.read().strip().rpartition(" ")
+        if done_source == source:
+            start_after = int(row or 0)
+            click.echo(f"resuming after row {start_after}")
+        else:
+            click.echo(f"{progress} is for another input ({done_source or 'unknown'}); starting over")
+
+    def report(stats):
+        with open(progress, "w") as f:
+            f.write(f"{source} {stats['row']}")
+        click.echo(f"row {stats['row']}: {stats['inserted']} inserted, {stats['rejected']} rejected, "
+                   f"{stats['rows_per_sec']} rows/s")
+
+    with open(path, newline="", encoding="utf-8") as src, \
+            open(rejects or f"{path}.rejects.ndjson", "a", encoding="utf-8") as rej:
+        stats = post_import.import_posts(src, fmt, source=source, rejects=rej,
+                                         batch_size=batch_size, start_after=start_after,
+                                         entities=not no_entities, on_batch=report)
+    click.echo(f"done: {stats['read']} read, {stats['inserted']} inserted, {stats['duplicates']} duplicates, "
+               f"{stats['rejected']} rejected in {stats['seconds']}s ({stats['rows_per_sec']} rows/s)")
+    if stats["duplicates"] and stats["duplicates"] == stats["read"]:
+        click.echo(f"warning: every row was already imported under source {source!r}; "
+                   "pass --source if this is a different export", err=True)
+
+@posts_cli.command("backfill-analysis")
+@click.option("--batch-size", default=200, show_default=True, help="Posts per classification batch and commit.")
+@click.option("--no-entities", is_flag=True, help="Skip spaCy entity extraction.")
+def backfill_analysis(batch_size, no_entities):
+    """Store categories, tags and entities on posts that predate those columns."""
+    from .services.posts_service import backfill_analysis
+    n = backfill_analysis(batch_size, entities=not no_entities, on_batch=lambda done: click.echo(f"{done} posts"))
+    click.echo(f"done: {n} posts backfilled")
+
+context_cli = AppGroup("context", help="Load geo_context data.")
+
+@context_cli.command("ingest-acs")
+@click.option("--year", default=2022, show_default=True, help="ACS 5-year release.")
+@click.option("--state", "states", multiple=True, help="State name (repeatable; default: every state with a FIPS code).")
+@click.option("--concurrency", default=4, show_default=True, help="Census requests in flight at once.")
+def ingest_acs(year, states, concurrency):
+    """
+    Upsert population, income, rent and poverty for every place in the given states.
+
+    A new --year adds rows that start with each city's latest crime index;
+    run ingest-crime afterwards to compute one for the new rows.
+    """
+    from flask import current_app
+    from .services.acs_ingest import ingest_acs
+    out = ingest_acs(year, current_app.config.get("CENSUS_API_KEY"), states or None, concurrency)
+    click.echo(f"{out['rows']} places in {out['states']} states")
+    for state, err in out["failed"].items():
+        click.echo(f"failed: {state}: {err}", err=True)
+
+@context_cli.command("sync-agencies")
+@click.option("--state", "states", multiple=True, help="State name (repeatable; default: every state).")
+def sync_agencies(states):
+    """Refresh the local city -> ORI index from the FBI agency lists."""
+    from flask import current_app
+    from .services.crime_index import sync_agencies
+    out = sync_agencies(current_app.config.get("FBI_API_KEY"), states or None)
+    click.echo(f"{out['agencies']} agencies in {out['states']} states")
+    for state, err in out["failed"].items():
+        click.echo(f"failed: {state}: {err}", err=True)
+
+@context_cli.command("ingest-crime")
+@click.option("--since", type=int, default=None, help="First year (default: last year).")
+@click.option("--until", type=int, default=None, help="Last year (default: --since).")
+@click.option("--state", "states", multiple=True, help="State name (repeatable; default: every state).")
+@click.option("--offense", "offenses", multiple=True, help="NIBRS offense slug (repeatable; default: violent + property set).")
+@click.option("--concurrency", default=8, show_default=True, help="FBI requests in flight at once.")
+@click.option("--rate", default=10.0, show_default=True, help="Max FBI requests started per second.")
+def ingest_crime(since, until, states, offenses, concurrency, rate):
+    """Fetch NIBRS counts per city agency and write geo_context.crime_index_12mo."""
+    from datetime import date
+    from flask import current_app
+    from .services import crime_index
+    since = since or date.today().year - 1
+    out = crime_index.ingest_crime(current_app.config.get("FBI_API_KEY"), since, until or since, states or None,
+                                   offenses or crime_index.OFFENSES, concurrency, rate)
+    click.echo(f"crime index for {out['cities']} cities in {out['states']} states "
+               f"({out['requests']} requests, {out['failed_requests']} failed)")
+
+ner_cli = AppGroup("ner", help="Classification cache maintenance.")
+
+@ner_cli.command("purge-cache")
+@click.option("--days", default=30.0, show_default=True, help="Only delete entries older than this.")
+@click.option("--keep", "keep", multiple=True,
+              help="Version to keep (repeatable; default: this process's model_version()).")
+def purge_cache(days, keep):
+    """Delete shared classification cache entries of other rules/model versions."""
+    from .services import ner_cache
+    from .services.ner_service import model_version
+    keep = keep or (model_version(),)
+    n = ner_cache.purge_stale(keep, days)
+    click.echo(f"deleted {n} entries older than {days:g} days (kept {', '.join(keep)})")
+
+def register_commands(app):
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(posts_cli)
+    app.cli.add_command(context_cli)
+    app.cli.add_command(ner_cli)
@@ -1,5 +1,9 @@
+import asyncio
+
 import httpx
 
+ACS5_URL = "https://api.census.gov/data/{year}/acs/acs5"
+
 class CensusClient:
     def __init__(self, api_key: str | None):
         self.api_key = api_key
@@ -13,7 +17,42 @@ class CensusClient:
             "in": f"state:{state_fips}",
             "key": self.api_key or "",
         }
-        url = f"https://api.census.gov/data/{year}/acs/acs5"
+        url = ACS5_URL.format(year=year)
         r = self.client.get(url, params=params)
         r.raise_for_status()
         return r.json()
+
+class AsyncCensusClient:
+    """
+    Pooled async ACS client for bulk pulls. At most `concurrency` requests are
+    in flight at once, sharing one connection pool. Use as an async context
+    manager so the pool is closed.
+    """
+
+    def __init__(self, api_key: str | None, concurrency: int = 4, timeout: float = 30.0):
+        self.api_key = api_key
+        self._sem = asyncio.Semaphore(concurrency)
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+    async def acs5_places(self, table_vars: list[str], state_fips: str, year: int = 2022) -> list[dict]:
+        """Every place in a state in one wildcard call, as {header: value} dicts."""
+        params = {
+            "get": ",".join(table_vars),
+            "for": "place:*",
+            "in": f"state:{state_fips}",
+            "key": self.api_key or "",
+        }
+        async with self._sem:
+            r = await self.client.get(ACS5_URL.format(year=year), params=params)
+        r.raise_for_status()
+        header, *rows = r.json()  # the API answers with a header row, then one row per place
+        return [dict(zip(header, row)) for row in rows]
@@ -1,6 +1,13 @@
+import asyncio
+import os
+import time
+
 import httpx
 
-BASE="https://api.usa.gov/crime/fbi/sapi/api"
+BASE = os.getenv("FBI_API_BASE", "https://api.usa.gov/crime/fbi/sapi/api")  # point at a local stub for offline runs
+
+def _offense_path(state_abbr: str, ori: str, offense: str, since: int, until: int) -> str:
+    return f"/nibrs/{offense}/offense/reported/agencies/state/{state_abbr}/agency/{ori}/offense/reported/{since}/{until}"
 
 class FBIClient:
     def __init__(self, api_key : str | None):
@@ -8,9 +15,68 @@ class FBIClient:
         self.client = httpx.Client(base_url=BASE, timeout=10.0)
 
     def nibrs_offence_by_city(self, state_abbr: str, ori: str, offense: str, since: int, until: int):
-        # need to map LA → correct ORI; for MVP we’ll seed geo_context.
+        # the city -> ORI mapping lives in law_enforcement_agencies (services/crime_index.py)
         params = {"api_key": self.api_key}
-        path = f"/nibrs/{offense}/offense/reported/agencies/state/{state_abbr}/agency/{ori}/offense/reported/{since}/{until}"
-        r = self.client.get(path, params=params)
+        r = self.client.get(_offense_path(state_abbr, ori, offense, since, until), params=params)
+        r.raise_for_status()
+        return r.json()
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart (rate <= 0: unlimited)."""
+
+    def __init__(self, rate: float, clock=time.monotonic, sleep=asyncio.sleep):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = self._clock()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await self._sleep(delay)
+
+class AsyncFBIClient:
+    """
+    Pooled async client for fanning out NIBRS requests: one connection pool,
+    at most `concurrency` requests in flight, starts spaced by `rate` per
+    second. Use as an async context manager so the pool is closed.
+    """
+
+    def __init__(self, api_key: str | None, concurrency: int = 8, rate: float = 10.0,
+                 base_url: str = BASE, timeout: float = 30.0):
+        self.api_key = api_key
+        self._sem = asyncio.Semaphore(concurrency)
+        self._limiter = RateLimiter(rate)
+        self.client = httpx.AsyncClient(
+            base_url=base_url, timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+    async def _get(self, path: str):
+        async with self._sem:
+            await self._limiter.wait()
+            r = await self.client.get(path, params={"api_key": self.api_key or ""})
         r.raise_for_status()
-        return r.json()
\ No newline at end of file
+        return r.json()
+
+    async def agencies(self, state_abbr: str) -> list[dict]:
+        data = await self._get(f"/agencies/byStateAbbr/{state_abbr}")
+        return data.get("results", data) if isinstance(data, dict) else data
+
+    async def offense_count(self, state_abbr: str, ori: str, offense: str, since: int, until: int) -> int:
+        """Reported offenses for one agency over [since, until], summed across the response rows."""
+        data = await self._get(_offense_path(state_abbr, ori, offense, since, until))
+        rows = data.get("data", data.get("results", [])) if isinstance(data, dict) else data
+        return sum(int(r.get("value", r.get("count", 0)) or 0) for r in rows)
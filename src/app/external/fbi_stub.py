@@ -0,0 +1,73 @@
+"""
+Local stand-in for the FBI crime API, for running the NIBRS pipeline offline.
+
+    python -m src.app.external.fbi_stub --port 5055
+    FBI_API_BASE=http://localhost:5055 flask context sync-agencies --state California
+    FBI_API_BASE=http://localhost:5055 flask context ingest-crime --state California
+
+Serves the two endpoints AsyncFBIClient uses. Agencies come from AGENCIES
+(or a JSON file given as --agencies, {"CA": [{...}, ...]}); offense counts
+are deterministic per (ori, offense, years). respond() is also what the
+tests mount behind respx.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+
+AGENCIES: Dict[str, List[Dict]] = {
+    "CA": [
+        {"ori": "CA0194200", "agency_name": "Los Angeles Police Department", "agency_type_name": "City", "county_name": "Los Angeles"},
+        {"ori": "CA0195300", "agency_name": "Pasadena Police Department", "agency_type_name": "City", "county_name": "Los Angeles"},
+        {"ori": "CA0190000", "agency_name": "Los Angeles County Sheriff's Office", "agency_type_name": "County", "county_name": "Los Angeles"},
+    ],
+    "GA": [
+        {"ori": "GAAPD0000", "agency_name": "Atlanta Police Department", "agency_type_name": "City", "county_name": "Fulton"},
+    ],
+}
+
+_AGENCIES = re.compile(r"^/agencies/byStateAbbr/(?P<abbr>[A-Z]{2})$")
+_OFFENSE = re.compile(r"^/nibrs/(?P<offense>[\w-]+)/offense/reported/agencies/state/[A-Z]{2}/agency/(?P<ori>\w+)"
+                      r"/offense/reported/(?P<since>\d{4})/(?P<until>\d{4})$")
+
+def offense_count(ori: str, offense: str, year: int) -> int:
+    return int(hashlib.sha1(f"{ori}:{offense}:{year}".encode()).hexdigest()[:4], 16) % 500
+
+def respond(path: str, agencies: Dict[str, List[Dict]] = AGENCIES) -> Tuple[int, Optional[object]]:
+    """(status, JSON body) for a request path relative to the API base."""
+    m = _AGENCIES.match(path)
+    if m:
+        return 200, {"results": agencies.get(m["abbr"], [])}
+    m = _OFFENSE.match(path)
+    if m:
+        years = range(int(m["since"]), int(m["until"]) + 1)
+        return 200, {"data": [{"data_year": y, "key": m["offense"], "value": offense_count(m["ori"], m["offense"], y)}
+                              for y in years]}
+    return 404, {"error": "not found"}
+
+def create_stub(agencies: Dict[str, List[Dict]] = AGENCIES):
+    from flask import Flask
+    app = Flask(__name__)
+
+    @app.get("/<path:path>")
+    def any_path(path):
+        status, body = respond(f"/{path}", agencies)
+        return body, status
+
+    return app
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=5055)
+    ap.add_argument("--agencies", help="JSON file of {state_abbr: [agency, ...]}")
+    args = ap.parse_args()
+    agencies = AGENCIES
+    if args.agencies:
+        with open(args.agencies) as f:
+            agencies = json.load(f)
+    create_stub(agencies).run(port=args.port)
+
+if __name__ == "__main__":
+    main()
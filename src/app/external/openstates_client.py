@@ -1,10 +1,16 @@
 import os
+import random
 import time
+from collections import deque
+from threading import Lock
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from flask import current_app
 
+from ..cache import SWRCache
+
 BASE_URL = "https://v3.openstates.org"
 
 class OpenStatesError(Exception):
@@ -71,10 +77,90 @@ JURISDICTION_MAP: Dict[str, str] = {
     "district of columbia": "ocd-jurisdiction/country:us/district:dc/government",
 }
 
-# simple in-proc cache for the latest session per jurisdiction_id
-_LATEST_SESSIONS: Dict[str, str] = {}
+# Per-process stale-while-revalidate caches (see cache.SWRCache): bills per
+# (jurisdiction, q, limit), and the latest session per jurisdiction_id, which
+# expires so a new legislative session is picked up without a restart.
+BILLS_TTL = float(os.getenv("OPENSTATES_BILLS_TTL", "300"))
+BILLS_STALE_TTL = float(os.getenv("OPENSTATES_BILLS_STALE_TTL", "3600"))
+SESSION_TTL = float(os.getenv("OPENSTATES_SESSION_TTL", "21600"))
+SESSION_STALE_TTL = float(os.getenv("OPENSTATES_SESSION_STALE_TTL", "86400"))
+
+_BILLS = SWRCache(int(os.getenv("OPENSTATES_BILLS_CACHE_SIZE", "256")), BILLS_TTL, BILLS_STALE_TTL)
+_LATEST_SESSIONS = SWRCache(64, SESSION_TTL, SESSION_STALE_TTL)
 
 DEFAULT_TIMEOUT = 10.0
+POOL_SIZE = int(os.getenv("OPENSTATES_POOL_SIZE", "10"))            # keep-alive connections per host
+MAX_RETRIES = int(os.getenv("OPENSTATES_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("OPENSTATES_BACKOFF_BASE", "0.25"))   # seconds; doubles per attempt
+BACKOFF_MAX = float(os.getenv("OPENSTATES_BACKOFF_MAX", "4"))
+DEADLINE = float(os.getenv("OPENSTATES_DEADLINE", "8"))              # whole call, retries included
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# One pooled session per process: connections (and TLS sessions) are reused
+# across calls instead of being opened per request.
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = Lock()
+
+_sleep = time.sleep
+_clock = time.monotonic
+
+def _session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                s = requests.Session()
+                s.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
+                _SESSION = s
+    return _SESSION
+
+class _Metrics:
+    def __init__(self):
+        self._lock = Lock()
+        self._latencies: deque = deque(maxlen=512)  # seconds per call, retries included
+        self._counts = {"calls": 0, "attempts": 0, "retries": 0, "failures": 0, "deadline_exceeded": 0}
+        self._statuses: Dict[str, int] = {}
+
+    def attempt(self, status: Optional[int]) -> None:
+        with self._lock:
+            self._counts["attempts"] += 1
+            key = str(status) if status is not None else "network_error"
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def call(self, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self._counts["calls"] += 1
+            if not ok:
+                self._counts["failures"] += 1
+            self._latencies.append(seconds)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lat = sorted(self._latencies)
+            out = {**self._counts, "statuses": dict(self._statuses)}
+        pct = lambda q: round(lat[min(len(lat) - 1, int(q * len(lat)))] * 1000, 1) if lat else None
+        return {**out, "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "max": pct(1.0)}}
+
+_metrics = _Metrics()
+
+def stats() -> Dict:
+    return {"pool_size": POOL_SIZE, "max_retries": MAX_RETRIES, "deadline_s": DEADLINE, **_metrics.stats(),
+            "bills_cache": _BILLS.stats(), "session_cache": _LATEST_SESSIONS.stats()}
+
+def _in_app_context(fn):
+    # background refreshes run on their own thread; give them the caller's app (for the API key)
+    app = current_app._get_current_object() if current_app else None
+    if app is None:
+        return fn
+    def run():
+        with app.app_context():
+            return fn()
+    return run
 
 def _headers() -> Dict[str, str]:
     # Prefer Flask config, fallback to env var
@@ -83,24 +169,72 @@ def _headers() -> Dict[str, str]:
         raise InvalidAPIKeyError("OPENSTATES_API_KEY not configured")
     return {"X-API-KEY": api_key}
 
-def _request(method: str, path: str, *, params: Dict[str, Any]) -> Dict[str, Any]:
-    url = f"{BASE_URL}{path}"
-    try:
-        r = requests.request(method, url, headers=_headers(), params=params, timeout=DEFAULT_TIMEOUT)
-    except requests.RequestException as e:
-        raise OpenStatesError(f"Network error: {e}") from e
+def _backoff(attempt: int, retry_after: Optional[str]) -> float:
+    """Seconds to wait before retry `attempt` (1-based): Retry-After if given, else full-jitter exponential."""
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass  # HTTP-date form: fall back to our own backoff
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)))
 
+def _error(r: requests.Response) -> OpenStatesError:
     if r.status_code == 401:
-        raise InvalidAPIKeyError("OpenStates API key invalid or missing")
+        return InvalidAPIKeyError("OpenStates API key invalid or missing")
     if r.status_code == 429:
-        # honor Retry-After if present
-        ra = int(r.headers.get("Retry-After", "1"))
-        time.sleep(min(ra, 5))
-        raise RateLimitError("OpenStates rate limit hit")
-    if r.status_code >= 400:
-        raise OpenStatesError(f"OpenStates error {r.status_code}: {r.text}")
+        return RateLimitError("OpenStates rate limit hit")
+    return OpenStatesError(f"OpenStates error {r.status_code}: {r.text}")
+
+def _request(method: str, path: str, *, params: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, Any]:
+    """
+    One API call on the pooled session. 429/5xx and network errors are
+    retried up to MAX_RETRIES times with jittered exponential backoff
+    (Retry-After wins when present), but never past DEADLINE seconds: a retry
+    that could not start in time fails immediately instead of sleeping.
+    `deadline` (on _clock) replaces DEADLINE when the call is one step of a
+    larger operation that shares a single budget.
+    """
+    url = f"{BASE_URL}{path}"
+    headers = _headers()
+    start = _clock()
+    deadline = start + DEADLINE if deadline is None else deadline
+    attempt = 0
+    ok = False
+    try:
+        while True:
+            remaining = deadline - _clock()
+            if remaining <= 0:
+                _metrics.count("deadline_exceeded")
+                raise OpenStatesError("OpenStates deadline exceeded")
+            try:
+                r = _session().request(method, url, headers=headers, params=params,
+                                       timeout=max(0.1, min(DEFAULT_TIMEOUT, remaining)))
+            except requests.RequestException as e:
+                _metrics.attempt(None)
+                err: OpenStatesError = OpenStatesError(f"Network error: {e}")
+                err.__cause__ = e
+                retry_after = None
+            else:
+                _metrics.attempt(r.status_code)
+                if r.status_code < 400:
+                    ok = True
+                    return r.json()
+                err = _error(r)
+                if r.status_code not in RETRY_STATUSES:
+                    raise err
+                retry_after = r.headers.get("Retry-After")
 
-    return r.json()
+            attempt += 1
+            if attempt > MAX_RETRIES:
+                raise err
+            wait = _backoff(attempt, retry_after)
+            if _clock() + wait >= deadline:
+                _metrics.count("deadline_exceeded")
+                raise err
+            _metrics.count("retries")
+            _sleep(wait)
+    finally:
+        _metrics.call(_clock() - start, ok)
 
 def _normalize_bill(b: Dict[str, Any]) -> Dict[str, Any]:
     # Normalize fields we actually use in the app
@@ -115,36 +249,43 @@ def _normalize_bill(b: Dict[str, Any]) -> Dict[str, Any]:
         "raw": b,  # keep for persistence if you want
     }
 
-def get_latest_session(jurisdiction_id: str) -> str:
+def get_latest_session(jurisdiction_id: str, deadline: Optional[float] = None) -> str:
     """Get the latest session string for a jurisdiction_id (OCD)."""
-    if jurisdiction_id in _LATEST_SESSIONS:
-        return _LATEST_SESSIONS[jurisdiction_id]
+    return _LATEST_SESSIONS.get(jurisdiction_id,
+                                _in_app_context(lambda: _fetch_latest_session(jurisdiction_id, deadline)))
 
+def _fetch_latest_session(jurisdiction_id: str, deadline: Optional[float] = None) -> str:
     params = {
         "jurisdiction_id": jurisdiction_id,  # <-- correct param for OCD
         "sort": "updated_desc",
         "per_page": 1,
     }
-    data = _request("GET", "/bills", params=params)
+    data = _request("GET", "/bills", params=params, deadline=deadline)
     results = data.get("results") or []
     if not results:
         raise OpenStatesError("No bills found for jurisdiction to infer session")
     session = results[0].get("session")
     if not session:
         raise OpenStatesError("No session field on latest bill")
-    _LATEST_SESSIONS[jurisdiction_id] = session
     return session
 
 def get_bills(jurisdiction: str, q: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
     """
     Fetch recent bills for a state “jurisdiction” (e.g., 'California').
     Uses OCD jurisdiction_id under the hood and auto-detects current session.
+    Served from a TTL cache; stale results are returned while a refresh runs.
     """
     ocd_id = JURISDICTION_MAP.get(jurisdiction.lower())
     if not ocd_id:
         raise ValueError(f"Unknown jurisdiction: {jurisdiction}")
+    key = (ocd_id, (q or "").strip() or None, limit)
+    return _BILLS.get(key, _in_app_context(lambda: _fetch_bills(ocd_id, key[1], limit)))
 
-    session = get_latest_session(ocd_id)
+def _fetch_bills(ocd_id: str, q: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    # one DEADLINE for the whole load: the session lookup (on a miss) and the
+    # bills call share it rather than getting one each
+    deadline = _clock() + DEADLINE
+    session = get_latest_session(ocd_id, deadline)
     params: Dict[str, Any] = {
         "jurisdiction_id": ocd_id,
         "session": session,
@@ -154,7 +295,7 @@ def get_bills(jurisdiction: str, q: Optional[str] = None, limit: int = 5) -> Lis
     if q:
         params["q"] = q
 
-    data = _request("GET", "/bills", params=params)
+    data = _request("GET", "/bills", params=params, deadline=deadline)
     results = data.get("results") or []
     return [_normalize_bill(b) for b in results]
 
@@ -1,7 +1,10 @@
 from .. import db
 from .state import State
 from .governance import Jurisdiction, Body, District, Official, Source, Meeting, AgendaItem
-from .civic import CitizenPost, PostVote, IssueTopicMatch, GeoContext
+from .civic import CitizenPost, PostVote, VoteBufferFlush, IssueTopicMatch, GeoContext, LawEnforcementAgency, Enrichment
+from .cache import ClassificationCache
+from .rollups import JurisdictionCategoryCount, PostGeoCategoryCount
+from .trgm import create_trgm_indexes
 ''' 
 create users_model.py for db, import here like:
 
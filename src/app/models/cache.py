@@ -0,0 +1,13 @@
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import JSONB
+
+from .. import db
+
+
+class ClassificationCache(db.Model):
+    """Shared (cross-worker) tier of the ner_service result cache."""
+    __tablename__ = "classification_cache"
+    key = db.Column(db.String(64), primary_key=True)                 # sha256(version + normalized text)
+    version = db.Column(db.String(64), nullable=False, index=True)   # rules/model fingerprint
+    result = db.Column(JSONB, nullable=False)                        # {rule_scores, zero_shot_scores, entities}
+    created_at = db.Column(db.DateTime, default=datetime.now)
@@ -1,6 +1,6 @@
 import uuid
-from datetime import datetime
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
 from sqlalchemy import Enum as PgEnum
 
 from .. import db
@@ -17,8 +17,34 @@ class CitizenPost(db.Model):
     city = db.Column(db.String(120), nullable=False)                 # normalization: city name (ex "Los Angeles"
     county = db.Column(db.String(120), nullable=True)                # ex "Los Angeles County"
     state_name = db.Column(db.String(50), db.ForeignKey("states.state_name"), nullable=False)
-    score = db.Column(db.Integer, default=0)                         # upvotes/ downvotes
+    score = db.Column(db.Integer, nullable=False, default=0, server_default="0")  # upvotes/ downvotes
     created_at = db.Column(db.DateTime, default=datetime.now)
+    # ner analysis, stored once at creation so reads never re-run the model
+    categories = db.Column(JSONB, nullable=True)                       # [{label, score}, ...]
+    tags = db.Column(JSONB, nullable=True)
+    entities = db.Column(JSONB, nullable=True)
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(body, '')), 'B')", persisted=True)))
+    # "trending" rank: log10(|score|) signed, plus one point per 12.5h of created_at.
+    # Sorting by it equals sorting by log-score minus age decay, but a row's value
+    # only changes when its score does, so Postgres keeps it current on every vote.
+    hot_rank = db.Column(db.Float, db.Computed(
+        "sign(score::float8) * log(greatest(abs(score), 1)::float8) + "
+        "coalesce(extract(epoch FROM created_at), 0)::float8 / 45000", persisted=True))
+
+    # geo filters compare lower(col) = lower(:value). The feed is keyset-paged on
+    # (score, created_at, id) DESC, served by backward scans of the ascending indexes;
+    # sort=trending pages on (hot_rank, id) DESC the same way.
+    __table_args__ = (
+        db.Index("ix_citizen_posts_feed", score, created_at, id),
+        db.Index("ix_citizen_posts_city_key", db.func.lower(city), score, created_at, id),
+        db.Index("ix_citizen_posts_trending", hot_rank, id),
+        db.Index("ix_citizen_posts_geo_trending", state_name, db.func.lower(city), category, hot_rank, id),
+        db.Index("ix_citizen_posts_county_key", db.func.lower(county)),
+        db.Index("ix_citizen_posts_state_key", db.func.lower(state_name)),
+        db.Index("ix_citizen_posts_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
 class PostVote(db.Model):
     __tablename__ = "post_votes"
@@ -30,6 +56,13 @@ class PostVote(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.now)
     __table_args__ = (db.UniqueConstraint("post_id", "voter_token_hash", name="uq_post_vote_once_per_token"),)
 
+class VoteBufferFlush(db.Model):
+    """Last committed flush generation of one process's vote buffer (services/vote_buffer)."""
+    __tablename__ = "vote_buffer_flushes"
+    buffer_id = db.Column(UUID(as_uuid=True), primary_key=True)
+    generation = db.Column(db.BigInteger, nullable=False)
+    flushed_at = db.Column(db.DateTime, default=datetime.now)
+
 class IssueTopicMatch(db.Model):
     __tablename__ = "issue_topic_matches"
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -52,4 +85,41 @@ class GeoContext(db.Model):
     median_income_usd = db.Column(db.Integer, nullable=True)
     population = db.Column(db.Integer, nullable=True)
     percent_poverty = db.Column(db.Numeric, nullable=True)
-    as_of = db.Column(db.Date, nullable=True)
\ No newline at end of file
+    as_of = db.Column(db.Date, nullable=True)
+    # moves whenever the row's data does (ingestion updates rows in place
+    # without touching as_of); /context sends it as Last-Modified
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, server_default=db.func.now(),
+                           default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.Index("ix_geo_context_geo_key", db.func.lower(city), state_name, as_of.desc().nullslast()),
+        db.Index("uq_geo_context_geo_as_of", db.func.lower(city), state_name, as_of, unique=True),  # ingestion upsert key
+    )
+
+class LawEnforcementAgency(db.Model):
+    """FBI reporting agency (ORI); city agencies map geo_context cities to their NIBRS data."""
+    __tablename__ = "law_enforcement_agencies"
+    ori = db.Column(db.String(9), primary_key=True)
+    state_name = db.Column(db.String(50), db.ForeignKey("states.state_name"), nullable=False)
+    agency_name = db.Column(db.String(200), nullable=False)
+    agency_type = db.Column(db.String(64), nullable=True)            # "City", "County", ...
+    city = db.Column(db.String(120), nullable=True)                   # derived for city agencies
+    county = db.Column(db.String(120), nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_law_enforcement_agencies_geo_key", db.func.lower(city), state_name),
+    )
+
+class Enrichment(db.Model):
+    """Background (slow-path) classification of a post or discover message."""
+    __tablename__ = "enrichments"
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    post_id = db.Column(UUID(as_uuid=True), db.ForeignKey("citizen_posts.id", ondelete="CASCADE"), nullable=True, index=True)
+    text_hash = db.Column(db.String(64), nullable=False, index=True)  # sha256 of the normalized text
+    primary_category = db.Column(db.String(32), nullable=True)
+    categories = db.Column(JSONB, nullable=True)                       # [{label, score}, ...]
+    tags = db.Column(JSONB, nullable=True)
+    entities = db.Column(JSONB, nullable=True)
+    tier = db.Column(db.String(16), nullable=True)                     # which ner tier answered
+    latency_ms = db.Column(db.Integer, nullable=True)                  # queue wait + processing
+    created_at = db.Column(db.DateTime, default=datetime.now)
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY, TSVECTOR
 from sqlalchemy import Enum as PgEnum
 
 from .. import db
@@ -24,6 +24,10 @@ class Body(db.Model):
     body_type = db.Column(PgEnum(BodyType, name="body_type", create_type=True), nullable=False)
     slug = db.Column(db.String(80), unique=True, nullable=True)
 
+    __table_args__ = (
+        db.Index("ix_bodies_jurisdiction_id", jurisdiction_id),
+    )
+
 class District(db.Model):
     __tablename__ = "districts"
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -57,9 +61,19 @@ class Source(db.Model):
     tags = db.Column(ARRAY(db.String), default=[])
     raw = db.Column(JSONB, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.now)
+    # full-text search document: title weighs more than summary
+    search_vector = db.deferred(db.Column(TSVECTOR, db.Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(summary, '')), 'B')", persisted=True)))
 
     __table_args__ = (
         db.UniqueConstraint("body_id", "source_type", "external_id", name="uq_source_body_type_ext"),
+        db.Index("ix_sources_tags", tags, postgresql_using="gin"),                  # tags @> ARRAY[...]
+        # listings page on (meeting_datetime, created_at, id) DESC, undated last (backward scans)
+        db.Index("ix_sources_recent", meeting_datetime, created_at, id),
+        db.Index("ix_sources_undated", created_at, id, postgresql_where=meeting_datetime.is_(None)),
+        db.Index("ix_sources_body_recent", body_id, meeting_datetime, created_at, id),
+        db.Index("ix_sources_search_vector", "search_vector", postgresql_using="gin"),
     )
 
 class Meeting(db.Model):
@@ -0,0 +1,139 @@
+from sqlalchemy import DDL, event
+from sqlalchemy.dialects.postgresql import UUID
+
+from .. import db
+
+# Per-geo category counts behind discover's "top categories". Maintained by
+# the triggers below on every insert/update/delete of sources and posts, so a
+# lookup is an indexed read of a few rows instead of scanning every tag.
+
+class JurisdictionCategoryCount(db.Model):
+    """Sources (via their body) per jurisdiction and tag; a source counts once per distinct tag."""
+    __tablename__ = "jurisdiction_category_counts"
+    jurisdiction_id = db.Column(UUID(as_uuid=True), db.ForeignKey("jurisdictions.id", ondelete="CASCADE"), primary_key=True)
+    category = db.Column(db.String(64), primary_key=True)
+    source_count = db.Column(db.Integer, nullable=False, default=0)
+
+class PostGeoCategoryCount(db.Model):
+    """Citizen posts per lowercase (state, city, county) and category; county_key '' = no county."""
+    __tablename__ = "post_geo_category_counts"
+    state_key = db.Column(db.String(50), primary_key=True)
+    city_key = db.Column(db.String(120), primary_key=True)
+    county_key = db.Column(db.String(120), primary_key=True)
+    category = db.Column(db.String(32), primary_key=True)
+    post_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_post_geo_category_counts_city_key", "city_key"),
+        db.Index("ix_post_geo_category_counts_county_key", "county_key"),
+    )
+
+# INSERT/DELETE are statement-level with transition tables, so bulk loads do one
+# aggregated upsert per statement. UPDATE is row-level and only fires when the
+# counted columns change (votes update citizen_posts constantly).
+ROLLUP_TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION rollup_source_tags(p_body_id uuid, p_tags varchar[], p_delta integer) RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO jurisdiction_category_counts AS c (jurisdiction_id, category, source_count)
+    SELECT b.jurisdiction_id, t.tag, p_delta
+    FROM bodies b, (SELECT DISTINCT unnest(p_tags) AS tag) t
+    WHERE b.id = p_body_id AND t.tag IS NOT NULL
+    ON CONFLICT (jurisdiction_id, category) DO UPDATE SET source_count = c.source_count + excluded.source_count
+$$;
+
+CREATE OR REPLACE FUNCTION sources_rollup_stmt() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO jurisdiction_category_counts AS c (jurisdiction_id, category, source_count)
+        SELECT b.jurisdiction_id, t.tag, count(*)
+        FROM new_rows s JOIN bodies b ON b.id = s.body_id
+        CROSS JOIN LATERAL (SELECT DISTINCT unnest(s.tags) AS tag) t
+        WHERE t.tag IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT (jurisdiction_id, category) DO UPDATE SET source_count = c.source_count + excluded.source_count;
+    ELSE
+        UPDATE jurisdiction_category_counts c SET source_count = c.source_count - d.n
+        FROM (
+            SELECT b.jurisdiction_id, t.tag AS category, count(*) AS n
+            FROM old_rows s JOIN bodies b ON b.id = s.body_id
+            CROSS JOIN LATERAL (SELECT DISTINCT unnest(s.tags) AS tag) t
+            WHERE t.tag IS NOT NULL
+            GROUP BY 1, 2
+        ) d
+        WHERE c.jurisdiction_id = d.jurisdiction_id AND c.category = d.category;
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION sources_rollup_row() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM rollup_source_tags(OLD.body_id, OLD.tags, -1);
+    PERFORM rollup_source_tags(NEW.body_id, NEW.tags, 1);
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION citizen_posts_rollup_stmt() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO post_geo_category_counts AS c (state_key, city_key, county_key, category, post_count)
+        SELECT lower(state_name), lower(city), coalesce(lower(county), ''), category::text, count(*)
+        FROM new_rows GROUP BY 1, 2, 3, 4
+        ON CONFLICT (state_key, city_key, county_key, category) DO UPDATE SET post_count = c.post_count + excluded.post_count;
+    ELSE
+        UPDATE post_geo_category_counts c SET post_count = c.post_count - d.n
+        FROM (
+            SELECT lower(state_name) AS state_key, lower(city) AS city_key, coalesce(lower(county), '') AS county_key,
+                   category::text AS category, count(*) AS n
+            FROM old_rows GROUP BY 1, 2, 3, 4
+        ) d
+        WHERE (c.state_key, c.city_key, c.county_key, c.category) = (d.state_key, d.city_key, d.county_key, d.category);
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION citizen_posts_rollup_row() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE post_geo_category_counts SET post_count = post_count - 1
+    WHERE state_key = lower(OLD.state_name) AND city_key = lower(OLD.city)
+      AND county_key = coalesce(lower(OLD.county), '') AND category = OLD.category::text;
+    INSERT INTO post_geo_category_counts AS c (state_key, city_key, county_key, category, post_count)
+    VALUES (lower(NEW.state_name), lower(NEW.city), coalesce(lower(NEW.county), ''), NEW.category::text, 1)
+    ON CONFLICT (state_key, city_key, county_key, category) DO UPDATE SET post_count = c.post_count + 1;
+    RETURN NULL;
+END $$;
+
+CREATE TRIGGER sources_rollup_ins AFTER INSERT ON sources
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION sources_rollup_stmt();
+CREATE TRIGGER sources_rollup_del AFTER DELETE ON sources
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION sources_rollup_stmt();
+CREATE TRIGGER sources_rollup_upd AFTER UPDATE OF tags, body_id ON sources FOR EACH ROW
+    WHEN (OLD.tags IS DISTINCT FROM NEW.tags OR OLD.body_id IS DISTINCT FROM NEW.body_id)
+    EXECUTE FUNCTION sources_rollup_row();
+
+CREATE TRIGGER citizen_posts_rollup_ins AFTER INSERT ON citizen_posts
+    REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION citizen_posts_rollup_stmt();
+CREATE TRIGGER citizen_posts_rollup_del AFTER DELETE ON citizen_posts
+    REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION citizen_posts_rollup_stmt();
+CREATE TRIGGER citizen_posts_rollup_upd AFTER UPDATE OF category, city, county, state_name ON citizen_posts FOR EACH ROW
+    WHEN ((OLD.category, OLD.city, OLD.county, OLD.state_name) IS DISTINCT FROM (NEW.category, NEW.city, NEW.county, NEW.state_name))
+    EXECUTE FUNCTION citizen_posts_rollup_row();
+"""
+
+# Recount everything from the base tables (backfill / repair).
+REBUILD_ROLLUPS_SQL = """
+DELETE FROM jurisdiction_category_counts;
+INSERT INTO jurisdiction_category_counts (jurisdiction_id, category, source_count)
+SELECT b.jurisdiction_id, t.tag, count(*)
+FROM sources s JOIN bodies b ON b.id = s.body_id
+CROSS JOIN LATERAL (SELECT DISTINCT unnest(s.tags) AS tag) t
+WHERE t.tag IS NOT NULL
+GROUP BY 1, 2;
+
+DELETE FROM post_geo_category_counts;
+INSERT INTO post_geo_category_counts (state_key, city_key, county_key, category, post_count)
+SELECT lower(state_name), lower(city), coalesce(lower(county), ''), category::text, count(*)
+FROM citizen_posts GROUP BY 1, 2, 3, 4;
+"""
+
+# create_all() (tests, fresh databases) gets the same triggers as the migration
+event.listen(db.metadata, "after_create", DDL(ROLLUP_TRIGGERS_SQL).execute_if(dialect="postgresql"))
@@ -0,0 +1,39 @@
+import logging
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+
+from .. import db
+
+log = logging.getLogger(__name__)
+
+# Body lookups match names by substring (ILIKE '%los angeles%'), which no
+# B-tree can serve; a trigram GIN index can. (Jurisdictions are matched in
+# memory by services/geo_resolver, so they need none.) pg_trgm ships with
+# postgres-contrib, but not every server has it, so these are created only
+# where the extension is available and the queries still work without them.
+TRGM_INDEXES_SQL = """
+CREATE INDEX IF NOT EXISTS ix_bodies_name_trgm ON bodies USING gin (name gin_trgm_ops);
+"""
+
+def trgm_available(conn) -> bool:
+    return conn.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first() is not None
+
+def create_trgm_indexes(conn) -> bool:
+    """Install pg_trgm and the trigram indexes; returns False (and logs) where that is not possible."""
+    if not trgm_available(conn):
+        log.warning("pg_trgm not available; skipping trigram indexes")
+        return False
+    try:
+        with conn.begin_nested():
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(text(TRGM_INDEXES_SQL))
+    except DBAPIError as e:
+        log.warning("could not create trigram indexes: %s", e)
+        return False
+    return True
+
+@event.listens_for(db.metadata, "after_create")
+def _after_create(target, connection, **kw):
+    if connection.dialect.name == "postgresql":
+        create_trgm_indexes(connection)
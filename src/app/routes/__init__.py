@@ -1,5 +1,6 @@
 from flask import Blueprint
 from .. import db
+from ..services.pagination import InvalidCursor
 
 
 bp = Blueprint("routes", __name__)
@@ -16,6 +17,10 @@ bp.register_blueprint(user_bp)
 def health():
     return {"ok": True}
 
+@bp.app_errorhandler(InvalidCursor)
+def invalid_cursor(e):
+    return {"error": str(e)}, 400
+
 
 from .posts import bp as posts_bp
 from .topics import bp as topics_bp
@@ -24,6 +29,7 @@ from .refresh import bp as refresh_bp
 from .openstates import bp as openstates_bp
 from .ner import bp as ner_bp
 from .discover import bp as discover_bp
+from .search import bp as search_bp
 
 bp.register_blueprint(posts_bp, url_prefix="/posts")
 bp.register_blueprint(topics_bp, url_prefix="/topics")
@@ -32,3 +38,4 @@ bp.register_blueprint(refresh_bp, url_prefix="/refresh")
 bp.register_blueprint(openstates_bp, url_prefix="/openstates")
 bp.register_blueprint(ner_bp, url_prefix="/ner")
 bp.register_blueprint(discover_bp, url_prefix="/discover")
+bp.register_blueprint(search_bp, url_prefix="/search")
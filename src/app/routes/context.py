@@ -1,24 +1,26 @@
-from flask import Blueprint, request
-from ..models.civic import GeoContext
+from flask import Blueprint, jsonify, request
+from ..services import context_snapshot
 
 bp = Blueprint("context", __name__)
 
+# browsers/CDN may reuse a response this long, then revalidate (ETag / Last-Modified -> 304)
+MAX_AGE = 300
+
 @bp.get("/")
 def ctx():
     city = request.args.get("city")
     state = request.args.get("state_name")
-    q = GeoContext.query
-    if city: q = q.filter(GeoContext.city.ilike(city))
-    if state: q = q.filter(GeoContext.state_name == state)
-    g = q.order_by(GeoContext.as_of.desc().nullslast()).first()
-    if not g:
+    entry = context_snapshot.lookup(city, state)
+    if entry is None:
         return {"message": "no context"}, 404
-    return {
-        "city": g.city, "state_name": g.state_name, "zipcode": g.zipcode,
-        "crime_index_12mo": float(g.crime_index_12mo) if g.crime_index_12mo is not None else None,
-        "median_rent_usd": g.median_rent_usd,
-        "median_income_usd": g.median_income_usd,
-        "population": g.population,
-        "percent_poverty": float(g.percent_poverty) if g.percent_poverty is not None else None,
-        "as_of": g.as_of.isoformat() if g.as_of else None
-    }
+    resp = jsonify(entry.payload)
+    resp.set_etag(entry.etag)
+    if entry.last_modified:
+        resp.last_modified = entry.last_modified  # updated_at: moves with in-place ingestion updates
+    resp.cache_control.public = True
+    resp.cache_control.max_age = MAX_AGE
+    return resp.make_conditional(request)
+
+@bp.get("/stats")
+def stats():
+    return {"snapshot": context_snapshot.snapshot.stats()}
@@ -1,5 +1,7 @@
 from flask import Blueprint, request
+from ..services import discover_cache, enrichment_service, geo_resolver
 from ..services.discover_service import discover
+from ..services.posts_service import SORTS
 
 bp = Blueprint("discover", __name__)
 
@@ -13,13 +15,21 @@ def run_discover():
     message = data.get("message")
     categories = data.get("categories")
     per_category = int((data.get("limits") or {}).get("per_category", 5))
+    sort = data.get("sort", "top")
 
     if not (city or county or state_name):
         return {"error": "geo.city, geo.county, or geo.state_name is required"}, 400
+    if sort not in SORTS:
+        return {"error": f"sort must be one of {', '.join(SORTS)}"}, 400
 
     result = discover(
         city=city, county=county, state_name=state_name,
         message=message, selected_categories=categories,
-        per_category=per_category,
+        per_category=per_category, sort=sort,
     )
     return result
+
+@bp.get("/stats")
+def stats():
+    return {"cache": discover_cache.stats(), "enrichment": enrichment_service.stats(),
+            "geo_resolver": geo_resolver.resolver.stats()}
@@ -1,10 +1,33 @@
 from flask import Blueprint, request
-from ..services.ner_service import analyze
+from ..services import ner_cache
+from ..services.inference_batcher import InferenceOverloaded
+from ..services.ner_service import analyze, analyze_many, batcher_stats, cascade_stats
 
 bp = Blueprint("ner", __name__)
 
+MAX_BATCH = 256
+
+@bp.app_errorhandler(InferenceOverloaded)
+def overloaded(e):
+    # any route that classifies (ner, posts, discover) sheds load the same way
+    return {"error": "classifier overloaded, retry shortly"}, 503, {"Retry-After": "1"}
+
 @bp.post("/analyze")
 def run():
     data = request.get_json(force=True)
     text = data.get("text","")
     return analyze(text)
+
+@bp.post("/analyze_batch")
+def run_batch():
+    data = request.get_json(force=True) or {}
+    texts = data.get("texts")
+    if not isinstance(texts, list):
+        return {"error": "texts must be a list of strings"}, 400
+    if len(texts) > MAX_BATCH:
+        return {"error": f"at most {MAX_BATCH} texts per batch"}, 413
+    return {"results": analyze_many([str(t or "") for t in texts])}
+
+@bp.get("/stats")
+def stats():
+    return {"cache": ner_cache.stats(), "cascade": cascade_stats(), "batcher": batcher_stats()}
@@ -1,4 +1,5 @@
 from flask import Blueprint, request
+from ..external import openstates_client
 from ..external.openstates_client import get_bills, OpenStatesError
 
 bp = Blueprint("openstates_demo", __name__)
@@ -13,3 +14,7 @@ def bills():
         return {"results": items}
     except OpenStatesError as e:
         return {"error": str(e)}, 502
+
+@bp.get("/stats")
+def stats():
+    return {"client": openstates_client.stats()}
@@ -1,10 +1,8 @@
 from flask import Blueprint, request
-from ..services.posts_service import create_post, list_posts, vote_post
+from ..services import vote_buffer
+from ..services.posts_service import SORTS, create_post, list_posts, vote_post
 from ..models.enums import VoteType
 from ..models.civic import CitizenPost
-from ..services.ner_service import analyze
-
-
 
 bp = Blueprint("posts", __name__)
 
@@ -18,15 +16,14 @@ def create():
         county=data.get("county"),
         state_name=data["state_name"],
     )
-    ner = analyze(f"{post.title}\n{post.body}")  # <- get multi-labels for response
     return {
         "id": str(post.id),
         "title": post.title,
         "body": post.body,
         "primary_category": post.category.value,        # enum stored
-        "categories": ner["categories"],                # [{label, score}, ...]
-        "tags": ner["tags"],
-        "entities": ner["entities"],
+        "categories": post.categories,                  # [{label, score}, ...]
+        "tags": post.tags,
+        "entities": post.entities,
         "city": post.city,
         "state_name": post.state_name,
         "score": post.score,
@@ -38,23 +35,49 @@ def list_():
     city = request.args.get("city")
     state = request.args.get("state_name")
     category = request.args.get("category")
-    posts = list_posts(city, state, category)
+    sort = request.args.get("sort", "top")
+    if sort not in SORTS:
+        return {"error": f"sort must be one of {', '.join(SORTS)}"}, 400
+    try:
+        limit = max(1, min(int(request.args.get("limit", "20")), 100))
+    except ValueError:
+        return {"error": "limit must be an integer"}, 400
+    posts, next_cursor = list_posts(city, state, category, limit=limit, cursor=request.args.get("cursor"), sort=sort)
+    # body stays a plain list; the next page is linked through a header
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
     return [{
         "id": str(p.id),
         "title": p.title,
         "body": p.body[:400],
         "category": p.category.value,
+        "categories": p.categories or [],
+        "tags": p.tags or [],
         "city": p.city,
         "state_name": p.state_name,
         "score": p.score,
         "created_at": p.created_at.isoformat(),
-    } for p in posts]
+    } for p in posts], 200, headers
+
+@bp.get("/stats")
+def stats():
+    return {"vote_buffer": vote_buffer.stats()}
 
 @bp.post("/vote")
 def vote():
     data = request.get_json(force=True)
-    post_id = data["post_id"]
-    vt = VoteType(data["vote"])
+    post_id = data.get("post_id")
+    try:
+        vt = VoteType(data.get("vote"))
+    except ValueError:
+        return {"error": f"vote must be one of {', '.join(v.value for v in VoteType)}"}, 400
     token_hash = data.get("voter_token_hash")
-    post = vote_post(post_id, token_hash, vt)
-    return {"id": str(post.id), "score": post.score}
+    try:
+        post = vote_post(post_id, token_hash, vt)
+    except ValueError:
+        return {"error": "invalid post_id"}, 400
+    if post is None:
+        return {"error": "post not found"}, 404
+    out = {"id": str(post.id), "score": post.score}
+    if post.pending:
+        out["pending"] = post.pending  # buffered votes not yet in citizen_posts.score
+    return out
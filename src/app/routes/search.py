@@ -0,0 +1,28 @@
+from flask import Blueprint, request
+from ..services.search_service import KINDS, search
+
+bp = Blueprint("search", __name__)
+
+@bp.get("/")
+def run_search():
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return {"error": "q is required"}, 400
+    kind = request.args.get("type", "all")
+    if kind not in KINDS + ("all",):
+        return {"error": f"type must be one of: all, {', '.join(KINDS)}"}, 400
+    try:
+        limit = int(request.args.get("limit", "20"))
+    except ValueError:
+        return {"error": "limit must be an integer"}, 400
+
+    return search(
+        q,
+        kinds=KINDS if kind == "all" else (kind,),
+        city=request.args.get("city"),
+        county=request.args.get("county"),
+        state_name=request.args.get("state_name"),
+        category=request.args.get("category"),
+        limit=limit,
+        cursor=request.args.get("cursor"),
+    )
@@ -6,7 +6,12 @@ bp = Blueprint("topics", __name__)
 @bp.get("/")
 def index():
     city = request.args.get("city", "Los Angeles")
-    items = list_sources_for_city(city, limit=10)
+    try:
+        limit = max(1, min(int(request.args.get("limit", "10")), 100))
+    except ValueError:
+        return {"error": "limit must be an integer"}, 400
+    items, next_cursor = list_sources_for_city(city, limit=limit, cursor=request.args.get("cursor"))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
     return [{
         "id": str(s.id),
         "title": s.title,
@@ -15,4 +20,4 @@ def index():
         "tags": s.tags or [],
         "url": s.url,
         "source_type": s.source_type.value,
-    } for s in items]
+    } for s in items], 200, headers
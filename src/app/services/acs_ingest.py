@@ -0,0 +1,144 @@
+"""
+Bulk ACS 5-year ingestion into geo_context (`flask context ingest-acs`).
+
+Each state is one wildcard call (for=place:*) that returns every place in
+the state. States are fetched concurrently through AsyncCensusClient, with
+at most `concurrency` requests in flight on one connection pool. Places map
+onto GeoContext columns and are upserted per state in one statement, keyed
+on (lower(city), state_name, as_of). Only the ACS columns are written, so
+crime_index_12mo from other sources survives a re-run, and a new as_of row
+starts with the city's most recent crime index rather than none (so /context,
+which serves the newest row, keeps it until ingest-crime runs again). Places
+whose names reduce to the same city ("X city" and "X CDP") keep the most
+populous one.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import re
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from .. import db
+from ..external.census_client import AsyncCensusClient
+from ..models.civic import GeoContext
+from ..models.state import State
+from . import context_snapshot
+
+log = logging.getLogger(__name__)
+
+# ACS detailed-table variables behind each geo_context column
+POPULATION = "B01003_001E"
+MEDIAN_INCOME = "B19013_001E"
+MEDIAN_RENT = "B25064_001E"
+POVERTY_UNIVERSE = "B17001_001E"
+POVERTY_BELOW = "B17001_002E"
+ACS_VARS = ["NAME", POPULATION, MEDIAN_INCOME, MEDIAN_RENT, POVERTY_UNIVERSE, POVERTY_BELOW]
+
+ACS_COLUMNS = ("population", "median_income_usd", "median_rent_usd", "percent_poverty")
+
+# "Los Angeles city, California" -> "Los Angeles"; place names end in a lowercase designation
+_PLACE_SUFFIX = re.compile(r"\s+(city|town|village|borough|CDP|municipality|city and borough|"
+                           r"consolidated government|metropolitan government|unified government|"
+                           r"urban county|comunidad|zona urbana)(\s*\(.*\))?$")
+
+def place_city(name: str) -> str:
+    place = name.rsplit(",", 1)[0].strip()
+    return _PLACE_SUFFIX.sub("", place).strip()
+
+def _int(v) -> Optional[int]:
+    # the API uses large negative sentinels (-666666666 etc.) for "not available"
+    try:
+        n = int(float(v))
+    except (TypeError, ValueError):
+        return None
+    return n if n >= 0 else None
+
+def to_geo_context(place: Dict, state_name: str, as_of: date) -> Dict:
+    """The geo_context row for one ACS place record."""
+    universe, below = _int(place.get(POVERTY_UNIVERSE)), _int(place.get(POVERTY_BELOW))
+    return {
+        "city": place_city(place["NAME"]),
+        "state_name": state_name,
+        "population": _int(place.get(POPULATION)),
+        "median_income_usd": _int(place.get(MEDIAN_INCOME)),
+        "median_rent_usd": _int(place.get(MEDIAN_RENT)),
+        "percent_poverty": round(100.0 * below / universe, 2) if universe and below is not None else None,
+        "as_of": as_of,
+    }
+
+def _dedupe(rows: List[Dict]) -> List[Dict]:
+    # one row per key: ON CONFLICT cannot touch the same target row twice in a statement
+    best: Dict[Tuple, Dict] = {}
+    for r in rows:
+        key = (r["city"].lower(), r["state_name"], r["as_of"])
+        kept = best.get(key)
+        if kept is not None:
+            if (r["population"] or 0) > (kept["population"] or 0):
+                kept, best[key] = r, r
+            log.info("ACS places collide on %s, %s: keeping population %s", r["city"], r["state_name"],
+                     kept["population"])
+            continue
+        best[key] = r
+    return list(best.values())
+
+def _latest_crime_index(state_names: List[str]) -> Dict[Tuple[str, str], object]:
+    """(lower(city), state_name) -> newest non-null crime_index_12mo."""
+    city = func.lower(GeoContext.city)
+    q = (
+        db.session.query(city, GeoContext.state_name, GeoContext.crime_index_12mo)
+        .filter(GeoContext.state_name.in_(state_names), GeoContext.city.isnot(None),
+                GeoContext.crime_index_12mo.isnot(None))
+        .distinct(city, GeoContext.state_name)
+        .order_by(city, GeoContext.state_name, GeoContext.as_of.desc().nullslast())
+    )
+    return {(c, s): idx for c, s, idx in q.all()}
+
+def upsert_geo_context(rows: List[Dict]) -> int:
+    if not rows:
+        return 0
+    rows = _dedupe(rows)
+    carried = _latest_crime_index(sorted({r["state_name"] for r in rows}))
+    rows = [{**r, "crime_index_12mo": carried.get((r["city"].lower(), r["state_name"]))} for r in rows]
+    table = GeoContext.__table__
+    stmt = insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[func.lower(table.c.city), table.c.state_name, table.c.as_of],
+        set_={**{c: stmt.excluded[c] for c in ACS_COLUMNS}, "updated_at": func.now()},
+    )
+    db.session.execute(stmt)
+    db.session.commit()
+    return len(rows)
+
+async def _fetch_states(fips: Dict[str, str], year: int, api_key: Optional[str], concurrency: int) -> Dict[str, object]:
+    async with AsyncCensusClient(api_key, concurrency=concurrency) as client:
+        results = await asyncio.gather(*(client.acs5_places(ACS_VARS, f, year) for f in fips.values()),
+                                       return_exceptions=True)
+    return dict(zip(fips, results))
+
+def ingest_acs(year: int, api_key: Optional[str], states: Optional[Iterable[str]] = None,
+               concurrency: int = 4) -> Dict:
+    """
+    Pull every place of `states` (default: every state with a FIPS code) for
+    ACS `year` and upsert them. A failed state is reported, not fatal.
+    """
+    q = db.session.query(State.state_name, State.fips_code).filter(State.fips_code.isnot(None))
+    if states:
+        q = q.filter(State.state_name.in_(list(states)))
+    fips = dict(q.all())
+
+    fetched = asyncio.run(_fetch_states(fips, year, api_key, concurrency))
+    as_of = date(year, 12, 31)  # end of the 5-year window
+    out: Dict = {"states": 0, "rows": 0, "failed": {}}
+    for state_name, result in fetched.items():
+        if isinstance(result, Exception):
+            log.warning("ACS fetch failed for %s: %s", state_name, result)
+            out["failed"][state_name] = str(result)
+            continue
+        out["rows"] += upsert_geo_context([to_geo_context(p, state_name, as_of) for p in result if p.get("NAME")])
+        out["states"] += 1
+    context_snapshot.invalidate()  # Core upserts skip the ORM hook
+    return out
@@ -0,0 +1,138 @@
+"""
+In-memory snapshot of the latest geo_context row per (lowercased city, state).
+
+/context used to run a lookup + ORDER BY as_of on every page view for data
+that changes about once a month. The snapshot loads the newest row per
+(city, state) in one DISTINCT ON query and answers every lookup shape the
+route supports (city and/or state, or neither) from dicts built at load time.
+Each entry carries its response payload plus an ETag (hash of the payload)
+and Last-Modified (the row's updated_at, which ingestion sets on every
+write; as_of does not move when rows are updated in place), so clients can
+revalidate with a 304.
+
+The snapshot reloads after a committed ORM write to geo_context, after
+invalidate() (for ingestion that bypasses the ORM), and at least every
+CONTEXT_SNAPSHOT_TTL seconds to pick up writes from other processes. One
+request reloads; concurrent ones wait for it instead of each running the
+query.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import time
+from datetime import date, datetime
+from threading import Lock
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from .. import db
+from ..models.civic import GeoContext
+
+TTL_SECONDS = float(os.getenv("CONTEXT_SNAPSHOT_TTL", "3600"))
+
+class ContextEntry(NamedTuple):
+    payload: Dict
+    etag: str
+    last_modified: Optional[datetime]
+    as_of: Optional[date]
+
+def _payload(g: GeoContext) -> Dict:
+    return {
+        "city": g.city, "state_name": g.state_name, "zipcode": g.zipcode,
+        "crime_index_12mo": float(g.crime_index_12mo) if g.crime_index_12mo is not None else None,
+        "median_rent_usd": g.median_rent_usd,
+        "median_income_usd": g.median_income_usd,
+        "population": g.population,
+        "percent_poverty": float(g.percent_poverty) if g.percent_poverty is not None else None,
+        "as_of": g.as_of.isoformat() if g.as_of else None
+    }
+
+def _entry(g: GeoContext) -> ContextEntry:
+    payload = _payload(g)
+    etag = hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+    return ContextEntry(payload, etag, g.updated_at, g.as_of)
+
+def _newer(a: Optional[ContextEntry], b: ContextEntry) -> ContextEntry:
+    # as_of DESC NULLS LAST
+    if a is None or (b.as_of is not None and (a.as_of is None or b.as_of > a.as_of)):
+        return b
+    return a
+
+class ContextSnapshot:
+    def __init__(self, ttl: float = TTL_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = Lock()
+        self._reload_lock = Lock()
+        # (city, state) lookups; None stands for "not filtered on"
+        self._index: Dict[Tuple[Optional[str], Optional[str]], ContextEntry] = {}
+        self._loaded_at: Optional[float] = None
+        self._counters = {"loads": 0, "hits": 0, "misses": 0}
+
+    def invalidate(self) -> None:
+        """Force a reload on the next lookup."""
+        with self._lock:
+            self._loaded_at = None
+
+    def refresh(self) -> None:
+        rows = (
+            db.session.query(GeoContext)
+            .distinct(func.lower(GeoContext.city), GeoContext.state_name)
+            .order_by(func.lower(GeoContext.city), GeoContext.state_name, GeoContext.as_of.desc().nullslast())
+            .all()
+        )
+        index: Dict[Tuple[Optional[str], Optional[str]], ContextEntry] = {}
+        for g in rows:
+            e = _entry(g)
+            city = (g.city or "").lower() or None
+            # the newest row per (city, state) also competes for every broader lookup
+            for key in {(city, g.state_name), (city, None), (None, g.state_name), (None, None)}:
+                index[key] = _newer(index.get(key), e)
+        with self._lock:
+            self._index = index
+            self._loaded_at = self._clock()
+            self._counters["loads"] += 1
+
+    def _fresh(self) -> bool:
+        return self._loaded_at is not None and self._clock() - self._loaded_at < self.ttl
+
+    def lookup(self, city: Optional[str], state_name: Optional[str]) -> Optional[ContextEntry]:
+        if not self._fresh():
+            with self._reload_lock:
+                if not self._fresh():  # another request may have reloaded while we waited
+                    self.refresh()
+        found = self._index.get(((city or "").lower() or None, state_name or None))
+        with self._lock:
+            self._counters["hits" if found is not None else "misses"] += 1
+        return found
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._index), **self._counters}
+
+snapshot = ContextSnapshot()
+
+def lookup(city: Optional[str], state_name: Optional[str]) -> Optional[ContextEntry]:
+    return snapshot.lookup(city, state_name)
+
+def invalidate() -> None:
+    snapshot.invalidate()
+
+# ---------- refresh on change ----------
+_DIRTY = "context_snapshot_dirty"
+
+@event.listens_for(Session, "after_flush")
+def _collect(session, flush_context):
+    if any(isinstance(o, GeoContext) for o in list(session.new) + list(session.dirty) + list(session.deleted)):
+        session.info[_DIRTY] = True
+
+@event.listens_for(Session, "after_commit")
+def _apply(session):
+    if session.info.pop(_DIRTY, False):
+        snapshot.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(_DIRTY, None)
@@ -0,0 +1,179 @@
+"""
+FBI NIBRS ingestion and geo_context.crime_index_12mo.
+
+Two steps, both `flask context` commands:
+
+* sync-agencies keeps law_enforcement_agencies, the local city -> ORI index,
+  built from one agency-list call per state. City-type agencies get a city
+  name derived from the agency name ("Los Angeles Police Department").
+* ingest-crime fans out one request per (city agency, offense) through
+  AsyncFBIClient (shared connection pool, bounded concurrency, rate limit),
+  then computes every city's index at once with numpy: offenses per capita
+  divided by the state baseline (all offenses / all population over the
+  cities with data), so 1.0 is the state average and >1 is worse. The
+  indexes go onto each city's latest geo_context row in one UPDATE per
+  state. Population comes from that row (see acs_ingest).
+
+FBI_API_BASE points the client at a local stub (external/fbi_stub.py).
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import Float, column, func, update, values
+from sqlalchemy.dialects.postgresql import UUID, insert
+
+from .. import db
+from ..external.fbi_client import AsyncFBIClient
+from ..models.civic import GeoContext, LawEnforcementAgency
+from ..models.state import State
+from . import context_snapshot
+
+log = logging.getLogger(__name__)
+
+OFFENSES = ("homicide", "aggravated-assault", "robbery", "burglary", "motor-vehicle-theft")
+
+_AGENCY_SUFFIX = re.compile(r"\s+(police department|police dept\.?|department of public safety|public safety department|"
+                            r"police|city police department)$", re.IGNORECASE)
+
+def agency_city(agency_name: str) -> str:
+    return _AGENCY_SUFFIX.sub("", agency_name.strip()).strip()
+
+def state_abbrs(states: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """state_name -> postal abbreviation, from the states' OCD ids (".../state:ca/...")."""
+    q = db.session.query(State.state_name, State.ocd_id).filter(State.ocd_id.like("%/state:%"))
+    if states:
+        q = q.filter(State.state_name.in_(list(states)))
+    return {name: ocd.split("/state:", 1)[1].split("/", 1)[0].upper() for name, ocd in q.all()}
+
+# ---------- agencies ----------
+def _agency_row(a: Dict, state_name: str) -> Dict:
+    kind = a.get("agency_type_name")
+    return {
+        "ori": a["ori"],
+        "state_name": state_name,
+        "agency_name": a.get("agency_name") or a["ori"],
+        "agency_type": kind,
+        "city": agency_city(a["agency_name"]) if kind == "City" and a.get("agency_name") else None,
+        "county": a.get("county_name"),
+    }
+
+async def _fetch_agencies(abbrs: Dict[str, str], api_key: Optional[str], concurrency: int, rate: float) -> Dict[str, object]:
+    async with AsyncFBIClient(api_key, concurrency=concurrency, rate=rate) as client:
+        results = await asyncio.gather(*(client.agencies(a) for a in abbrs.values()), return_exceptions=True)
+    return dict(zip(abbrs, results))
+
+def sync_agencies(api_key: Optional[str], states: Optional[Iterable[str]] = None,
+                  concurrency: int = 4, rate: float = 10.0) -> Dict:
+    """Refresh the ORI index for `states` (default: all); a failed state is reported, not fatal."""
+    fetched = asyncio.run(_fetch_agencies(state_abbrs(states), api_key, concurrency, rate))
+    out: Dict = {"states": 0, "agencies": 0, "failed": {}}
+    table = LawEnforcementAgency.__table__
+    for state_name, result in fetched.items():
+        if isinstance(result, Exception):
+            log.warning("agency list failed for %s: %s", state_name, result)
+            out["failed"][state_name] = str(result)
+            continue
+        rows = list({a["ori"]: _agency_row(a, state_name) for a in result if a.get("ori")}.values())
+        if rows:
+            stmt = insert(table).values(rows)
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.ori],
+                set_={c: stmt.excluded[c] for c in ("state_name", "agency_name", "agency_type", "city", "county")},
+            ))
+            db.session.commit()
+        out["states"] += 1
+        out["agencies"] += len(rows)
+    return out
+
+# ---------- crime index ----------
+def compute_index(counts: np.ndarray, city_of: np.ndarray, population: np.ndarray) -> np.ndarray:
+    """
+    counts: (agencies, offenses) reported counts, NaN where a request failed.
+    city_of: city position of each agency row. population: per city.
+    Returns per-city offenses-per-capita over the state rate. A city with any
+    failed count is NaN (a partial sum would understate it) and stays out of
+    the baseline, as do cities without agencies or population.
+    """
+    n = len(population)
+    incomplete = np.isnan(counts).any(axis=1)
+    totals = np.bincount(city_of, weights=np.where(incomplete, 0.0, counts.sum(axis=1)), minlength=n)
+    has_agency = np.bincount(city_of, minlength=n) > 0
+    has_gap = np.bincount(city_of, weights=incomplete, minlength=n) > 0
+    usable = has_agency & ~has_gap & (population > 0)
+    index = np.full(len(population), np.nan)
+    if not usable.any() or totals[usable].sum() == 0:
+        return index
+    baseline = totals[usable].sum() / population[usable].sum()
+    index[usable] = (totals[usable] / population[usable]) / baseline
+    return index
+
+def _latest_context(state_name: str) -> List[Tuple]:
+    """(geo_context id, city_key, population) of the newest row per city in a state."""
+    return (
+        db.session.query(GeoContext.id, func.lower(GeoContext.city), GeoContext.population)
+        .filter(GeoContext.state_name == state_name, GeoContext.city.isnot(None))
+        .distinct(func.lower(GeoContext.city))
+        .order_by(func.lower(GeoContext.city), GeoContext.as_of.desc().nullslast())
+        .all()
+    )
+
+async def _fetch_counts(jobs: List[Tuple[str, str, str]], since: int, until: int, api_key: Optional[str],
+                        concurrency: int, rate: float) -> List[object]:
+    async with AsyncFBIClient(api_key, concurrency=concurrency, rate=rate) as client:
+        return await asyncio.gather(*(client.offense_count(abbr, ori, off, since, until) for abbr, ori, off in jobs),
+                                    return_exceptions=True)
+
+def _write_indexes(ids: List, index: np.ndarray) -> int:
+    pairs = [(i, round(float(x), 3)) for i, x in zip(ids, index) if not np.isnan(x)]
+    if not pairs:
+        return 0
+    v = values(column("id", UUID(as_uuid=True)), column("idx", Float), name="v").data(pairs)
+    db.session.execute(
+        update(GeoContext).where(GeoContext.id == v.c.id).values(crime_index_12mo=v.c.idx, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return len(pairs)
+
+def ingest_crime(api_key: Optional[str], since: int, until: int, states: Optional[Iterable[str]] = None,
+                 offenses: Iterable[str] = OFFENSES, concurrency: int = 8, rate: float = 10.0) -> Dict:
+    """Fetch NIBRS counts for every indexed city agency and write crime_index_12mo."""
+    offenses = list(offenses)
+    abbrs = state_abbrs(states)
+    plan: Dict[str, Tuple[List, np.ndarray, np.ndarray, List[str]]] = {}
+    jobs: List[Tuple[str, str, str]] = []
+    for state_name, abbr in abbrs.items():
+        ctx = _latest_context(state_name)
+        pos = {key: i for i, (_, key, _) in enumerate(ctx)}
+        agencies = [(ori, pos[c.lower()]) for ori, c in
+                    db.session.query(LawEnforcementAgency.ori, LawEnforcementAgency.city)
+                    .filter(LawEnforcementAgency.state_name == state_name, LawEnforcementAgency.city.isnot(None))
+                    .order_by(LawEnforcementAgency.ori)
+                    if c.lower() in pos]
+        if not agencies:
+            continue
+        population = np.array([p or 0 for _, _, p in ctx], dtype=float)
+        plan[state_name] = ([i for i, _, _ in ctx], np.array([c for _, c in agencies]), population,
+                            [ori for ori, _ in agencies])
+        jobs += [(abbr, ori, off) for ori, _ in agencies for off in offenses]
+
+    results = asyncio.run(_fetch_counts(jobs, since, until, api_key, concurrency, rate)) if jobs else []
+    failed = sum(isinstance(r, Exception) for r in results)
+    flat = np.array([np.nan if isinstance(r, Exception) else r for r in results], dtype=float)
+
+    out = {"states": 0, "cities": 0, "requests": len(jobs), "failed_requests": failed}
+    offset = 0
+    for state_name, (ids, city_of, population, oris) in plan.items():
+        n = len(oris) * len(offenses)
+        counts = flat[offset:offset + n].reshape(len(oris), len(offenses))
+        offset += n
+        out["cities"] += _write_indexes(ids, compute_index(counts, city_of, population))
+        out["states"] += 1
+    if failed:
+        log.warning("%d of %d NIBRS requests failed", failed, len(jobs))
+    context_snapshot.invalidate()  # Core update skips the ORM hook
+    return out
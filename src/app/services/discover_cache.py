@@ -0,0 +1,138 @@
+"""
+Response cache for discover().
+
+Entries are keyed by normalized geo (lowercased city, county via
+_normalize_county, state), the requested categories, per_category and sort, and
+live for DISCOVER_CACHE_TTL seconds in a bounded TTLCache. Committed ORM
+writes to posts, votes and sources drop the entries whose geo they touch, so
+a new post shows up on the next request instead of after the TTL. Writes that
+bypass the session (raw SQL, COPY) are only bounded by the TTL; call
+invalidate_all() after those. The cache is per process: another worker's
+writes reach this one only through the TTL.
+"""
+from __future__ import annotations
+import os
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from ..cache import TTLCache
+from ..models.civic import CitizenPost, PostVote
+from ..models.governance import Body, Jurisdiction, Source
+from .geo_resolver import GeoKey, geo_key
+
+TTL_SECONDS = float(os.getenv("DISCOVER_CACHE_TTL", "30"))
+MAX_ENTRIES = int(os.getenv("DISCOVER_CACHE_SIZE", "512"))
+
+_cache = TTLCache(MAX_ENTRIES, TTL_SECONDS)
+_invalidations = {"geo": 0, "all": 0, "entries": 0}
+
+
+def cache_key(city: Optional[str], county: Optional[str], state_name: Optional[str],
+              categories: Optional[Iterable[str]], per_category: int, sort: str = "top") -> Hashable:
+    # categories keep their order: it is the order of the returned sections
+    cats = tuple(categories) if categories is not None else None
+    return (*geo_key(city, county, state_name), cats, per_category, sort)
+
+def get(key: Hashable) -> Optional[Dict]:
+    return _cache.get(key)
+
+def put(key: Hashable, value: Dict) -> None:
+    _cache.put(key, value)
+
+# ---------- invalidation ----------
+def _post_geo_hits(key: Hashable, posts: Set[GeoKey]) -> bool:
+    # discover unions city OR county OR state, with exact (case-insensitive) post matches
+    city, county, state = key[:3]
+    return any((city and city == pc) or (county and county == pco) or (state and state == ps)
+               for pc, pco, ps in posts)
+
+def _jurisdiction_hits(key: Hashable, jurisdictions: Set[Tuple[str, str, str]]) -> bool:
+    # mirrors _jurisdiction_clauses: substring (ILIKE %x%) match on name / state_name
+    city, county, state = key[:3]
+    for level, name, jstate in jurisdictions:
+        if city and level == "city" and city in name:
+            return True
+        if county and level == "county" and county in name:
+            return True
+        if state and ((level == "state" and state in name) or state in jstate):
+            return True
+    return False
+
+def invalidate_geo(posts: Iterable[GeoKey] = (), jurisdictions: Iterable[Tuple[str, str, str]] = ()) -> int:
+    """Drop entries that could include a post at one of `posts` or a source under one of `jurisdictions`."""
+    posts = set(posts)  # GeoKeys from geo_key()
+    jurisdictions = {((l or "").lower(), (n or "").lower(), (s or "").lower()) for l, n, s in jurisdictions}
+    if not posts and not jurisdictions:
+        return 0
+    n = _cache.pop_where(lambda k: _post_geo_hits(k, posts) or _jurisdiction_hits(k, jurisdictions))
+    _invalidations["geo"] += 1
+    _invalidations["entries"] += n
+    return n
+
+def invalidate_all() -> None:
+    _invalidations["all"] += 1
+    _invalidations["entries"] += len(_cache)
+    _cache.clear()
+
+def stats() -> Dict:
+    return {**_cache.stats(), "invalidations": dict(_invalidations)}
+
+# ---------- session hooks ----------
+# after_flush records what the flush touched (geo values are still readable,
+# including pre-update history); after_commit applies it. A rollback discards it.
+_PENDING = "discover_cache_pending"
+
+def _post_geos(post: CitizenPost) -> Set[GeoKey]:
+    state = inspect(post)
+    geos = {geo_key(post.city, post.county, post.state_name)}
+    if state.persistent:
+        old = {a: state.attrs[a].history.deleted for a in ("city", "county", "state_name")}
+        if any(old.values()):
+            geos.add(geo_key((old["city"] or [post.city])[0], (old["county"] or [post.county])[0],
+                             (old["state_name"] or [post.state_name])[0]))
+    return geos
+
+@event.listens_for(Session, "after_flush")
+def _collect(session, flush_context):
+    pending = session.info.setdefault(_PENDING, {"posts": set(), "jurisdictions": set(), "all": False})
+    post_ids, body_ids = set(), set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, CitizenPost):
+            pending["posts"] |= _post_geos(obj)
+        elif isinstance(obj, PostVote):
+            post_ids.add(obj.post_id)
+        elif isinstance(obj, Source):
+            body_ids.add(obj.body_id)
+            body_ids.update(inspect(obj).attrs.body_id.history.deleted)
+        elif isinstance(obj, (Body, Jurisdiction)):
+            # geo matching itself changed
+            pending["all"] = True
+
+    conn = session.connection()
+    post_ids.discard(None)
+    body_ids.discard(None)
+    if post_ids:
+        rows = conn.execute(select(CitizenPost.city, CitizenPost.county, CitizenPost.state_name)
+                            .where(CitizenPost.id.in_(post_ids))).all()
+        pending["posts"].update(geo_key(*r) for r in rows)
+    if body_ids:
+        rows = conn.execute(select(Jurisdiction.level, Jurisdiction.name, Jurisdiction.state_name)
+                            .join(Body, Body.jurisdiction_id == Jurisdiction.id)
+                            .where(Body.id.in_(body_ids))).all()
+        pending["jurisdictions"].update((getattr(l, "value", l), n, s) for l, n, s in rows)
+
+@event.listens_for(Session, "after_commit")
+def _apply(session):
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    if pending["all"]:
+        invalidate_all()
+    else:
+        invalidate_geo(pending["posts"], pending["jurisdictions"])
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(_PENDING, None)
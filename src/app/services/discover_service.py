@@ -1,14 +1,18 @@
 from __future__ import annotations
 from typing import List, Dict, Optional
-from threading import Thread
 
-from sqlalchemy import or_, and_
+from flask import current_app
+from sqlalchemy import String, cast, func, or_, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, array
 
 from .. import db
-from ..models.governance import Source, Body, Jurisdiction
+from ..models.governance import Source
 from ..models.civic import CitizenPost
+from ..models.rollups import JurisdictionCategoryCount, PostGeoCategoryCount, REBUILD_ROLLUPS_SQL
 from ..models.enums import SourceType, Category
 from .ner_service import analyze as ner_analyze
+from . import discover_cache, enrichment_service, geo_resolver
+from .geo_resolver import normalize_county as _normalize_county
 
 CANDIDATE_LABELS = [
     "food_access","road_safety","crime","housing",
@@ -16,59 +20,60 @@ CANDIDATE_LABELS = [
 ]
 
 # ---------- GEO HELPERS ----------
-def _normalize_county(county: Optional[str]) -> Optional[str]:
-    if not county: return None
-    c = county.strip()
-    return c if c.lower().endswith("county") else f"{c} County"
-
 def _geo_source_query(city: Optional[str], county: Optional[str], state_name: Optional[str]):
     """
-    Union filter across city / county / state using Jurisdiction.
-    Matches by:
-      - city:  Jurisdiction.level = 'city'   AND Jurisdiction.name ILIKE %city%
-      - county:Jurisdiction.level = 'county' AND Jurisdiction.name ILIKE %county%
-      - state: Jurisdiction.level = 'state'  AND Jurisdiction.name ILIKE %state_name%
+    Union filter across city / county / state, as body_id IN (...) over the
+    bodies of the jurisdictions GeoResolver matches (see geo_resolver for the
+    matching rules).
     """
-    county = _normalize_county(county)
-
-    q = db.session.query(Source).join(Body, Body.id == Source.body_id).join(
-        Jurisdiction, Jurisdiction.id == Body.jurisdiction_id
-    )
-
-    clauses = []
-    if city:
-        clauses.append(and_(Jurisdiction.level == "city", Jurisdiction.name.ilike(f"%{city}%")))
-    if county:
-        clauses.append(and_(Jurisdiction.level == "county", Jurisdiction.name.ilike(f"%{county}%")))
-    if state_name:
-        # match either jurisdiction name or state_name field
-        clauses.append(and_(Jurisdiction.level == "state", Jurisdiction.name.ilike(f"%{state_name}%")))
-        clauses.append(Jurisdiction.state_name.ilike(f"%{state_name}%"))
-
-    return q.filter(or_(*clauses)) if clauses else q.filter(False)
+    body_ids = geo_resolver.resolve(city, county, state_name).body_ids
+    q = db.session.query(Source)
+    return q.filter(Source.body_id.in_(body_ids)) if body_ids else q.filter(False)
 
 def _geo_posts_query(city: Optional[str], county: Optional[str], state_name: Optional[str]):
     county = _normalize_county(county)
     clauses = []
-    if city: clauses.append(CitizenPost.city.ilike(city))
-    if county: clauses.append(CitizenPost.county.ilike(county))
-    if state_name: clauses.append(CitizenPost.state_name.ilike(state_name))
+    # lower(col) = lower(value) is ILIKE without wildcards, and hits the *_key expression indexes
+    if city: clauses.append(func.lower(CitizenPost.city) == city.lower())
+    if county: clauses.append(func.lower(CitizenPost.county) == county.lower())
+    if state_name: clauses.append(func.lower(CitizenPost.state_name) == state_name.lower())
     return CitizenPost.query.filter(or_(*clauses)) if clauses else CitizenPost.query.filter(False)
 
 # ---------- TOP CATEGORIES ----------
-def _top_categories_for_geo(city: Optional[str], county: Optional[str], state_name: Optional[str], limit: int = 3) -> List[Dict]:
-    counts = {c: 0 for c in CANDIDATE_LABELS}
+# Counts come from the trigger-maintained rollup tables (models/rollups.py):
+# the per-jurisdiction source counts are summed over the matching
+# jurisdictions, post counts over the matching (state, city, county) keys.
+def _source_category_counts(city: Optional[str], county: Optional[str], state_name: Optional[str]) -> List:
+    jurisdiction_ids = geo_resolver.resolve(city, county, state_name).jurisdiction_ids
+    if not jurisdiction_ids:
+        return []
+    return (
+        db.session.query(JurisdictionCategoryCount.category, func.sum(JurisdictionCategoryCount.source_count))
+        .filter(JurisdictionCategoryCount.jurisdiction_id.in_(jurisdiction_ids),
+                JurisdictionCategoryCount.category.in_(CANDIDATE_LABELS))
+        .group_by(JurisdictionCategoryCount.category)
+        .all()
+    )
 
-    # Gov: count tags within geo
-    for (tags,) in _geo_source_query(city, county, state_name).with_entities(Source.tags).all():
-        if not tags: continue
-        for c in CANDIDATE_LABELS:
-            if c in tags: counts[c] += 1
+def _post_category_counts(city: Optional[str], county: Optional[str], state_name: Optional[str]) -> List:
+    county = _normalize_county(county)
+    clauses = []
+    if city: clauses.append(PostGeoCategoryCount.city_key == city.lower())
+    if county: clauses.append(PostGeoCategoryCount.county_key == county.lower())
+    if state_name: clauses.append(PostGeoCategoryCount.state_key == state_name.lower())
+    if not clauses:
+        return []
+    return (
+        db.session.query(PostGeoCategoryCount.category, func.sum(PostGeoCategoryCount.post_count))
+        .filter(or_(*clauses))
+        .group_by(PostGeoCategoryCount.category)
+        .all()
+    )
 
-    # Posts: count primary enum within geo
-    for (cat_enum,) in _geo_posts_query(city, county, state_name).with_entities(CitizenPost.category).all():
-        c = getattr(cat_enum, "value", str(cat_enum))
-        if c in counts: counts[c] += 1
+def _top_categories_for_geo(city: Optional[str], county: Optional[str], state_name: Optional[str], limit: int = 3) -> List[Dict]:
+    counts = {c: 0 for c in CANDIDATE_LABELS}
+    for c, n in _source_category_counts(city, county, state_name) + _post_category_counts(city, county, state_name):
+        if c in counts: counts[c] += int(n or 0)
 
     ranked = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)
     top = [{"label": l, "count": n} for l, n in ranked[:limit] if n > 0]
@@ -76,12 +81,21 @@ def _top_categories_for_geo(city: Optional[str], county: Optional[str], state_na
         top = [{"label":"crime","count":0},{"label":"housing","count":0},{"label":"transport","count":0}]
     return top
 
+def rebuild_category_rollups() -> Dict[str, int]:
+    """Recount both rollup tables from sources/citizen_posts (repair after manual edits)."""
+    db.session.execute(text(REBUILD_ROLLUPS_SQL))
+    db.session.commit()
+    return {
+        "jurisdiction_category_counts": db.session.query(func.count()).select_from(JurisdictionCategoryCount).scalar(),
+        "post_geo_category_counts": db.session.query(func.count()).select_from(PostGeoCategoryCount).scalar(),
+    }
+
 # ---------- SECTIONS ----------
-def _gov_actions_for(city: Optional[str], county: Optional[str], state_name: Optional[str], category: str, limit: int) -> List[Dict]:
-    q = _geo_source_query(city, county, state_name).filter(Source.tags != None)  # noqa: E711
-    q = q.filter(Source.tags.any(category))
-    items = q.order_by(Source.meeting_datetime.desc().nullslast(), Source.created_at.desc()).limit(limit).all()
-    return [{
+# Each section list is the top-N per category. Instead of one query per
+# category (2×N round trips), rank rows per category with ROW_NUMBER() and
+# fetch every requested category in a single query per list.
+def _source_dict(s: Source) -> Dict:
+    return {
         "id": str(s.id),
         "title": s.title,
         "summary": s.summary,
@@ -89,41 +103,92 @@ def _gov_actions_for(city: Optional[str], county: Optional[str], state_name: Opt
         "tags": s.tags or [],
         "url": s.url,
         "source_type": s.source_type.value if s.source_type else None,
-    } for s in items]
-
-def _citizen_issues_for(city: Optional[str], county: Optional[str], state_name: Optional[str], category: str, limit: int) -> List[Dict]:
-    q = _geo_posts_query(city, county, state_name)
-    try:
-        cat_enum = Category(category)
-        q = q.filter(CitizenPost.category == cat_enum)
-    except Exception:
-        return []
-    posts = q.order_by(CitizenPost.score.desc(), CitizenPost.created_at.desc()).limit(limit).all()
-    return [{
+    }
+
+def _post_dict(p: CitizenPost) -> Dict:
+    return {
         "id": str(p.id),
         "title": p.title,
         "score": p.score,
         "created_at": p.created_at.isoformat(),
         "primary_category": p.category.value if hasattr(p.category,'value') else str(p.category),
-    } for p in posts]
+        "tags": p.tags or [],
+    }
+
+def _gov_actions_by_category(city: Optional[str], county: Optional[str], state_name: Optional[str], categories: List[str], limit: int) -> Dict[str, List[Dict]]:
+    if not categories:
+        return {}
+    cats = select(func.unnest(cast(categories, ARRAY(String))).label("cat")).subquery("cats")
+    rn = func.row_number().over(
+        partition_by=cats.c.cat,
+        order_by=(Source.meeting_datetime.desc().nullslast(), Source.created_at.desc(), Source.id),
+    ).label("rn")
+    ranked = (
+        _geo_source_query(city, county, state_name)
+        .join(cats, Source.tags.contains(array([cats.c.cat])))
+        .with_entities(Source.id.label("source_id"), cats.c.cat, rn)
+        .subquery("ranked")
+    )
+    rows = (
+        db.session.query(Source, ranked.c.cat)
+        .join(ranked, ranked.c.source_id == Source.id)
+        .filter(ranked.c.rn <= limit)
+        .order_by(ranked.c.cat, ranked.c.rn)
+        .all()
+    )
+    out: Dict[str, List[Dict]] = {}
+    for s, cat in rows:
+        out.setdefault(cat, []).append(_source_dict(s))
+    return out
 
-def _sections(city: Optional[str], county: Optional[str], state_name: Optional[str], categories: List[str], per_category: int) -> List[Dict]:
+def _citizen_issues_by_category(city: Optional[str], county: Optional[str], state_name: Optional[str], categories: List[str], limit: int,
+                                sort: str = "top") -> Dict[str, List[Dict]]:
+    cat_enums = [Category(c) for c in categories if c in Category.__members__]
+    if not cat_enums:
+        return {}
+    if sort == "trending":
+        order_by = (CitizenPost.hot_rank.desc(), CitizenPost.id)
+    else:
+        order_by = (CitizenPost.score.desc(), CitizenPost.created_at.desc(), CitizenPost.id)
+    rn = func.row_number().over(partition_by=CitizenPost.category, order_by=order_by).label("rn")
+    ranked = (
+        _geo_posts_query(city, county, state_name)
+        .filter(CitizenPost.category.in_(cat_enums))
+        .with_entities(CitizenPost.id.label("post_id"), rn)
+        .subquery("ranked")
+    )
+    posts = (
+        db.session.query(CitizenPost)
+        .join(ranked, ranked.c.post_id == CitizenPost.id)
+        .filter(ranked.c.rn <= limit)
+        .order_by(CitizenPost.category, ranked.c.rn)
+        .all()
+    )
+    out: Dict[str, List[Dict]] = {}
+    for p in posts:
+        out.setdefault(p.category.value, []).append(_post_dict(p))
+    return out
+
+def _sections(city: Optional[str], county: Optional[str], state_name: Optional[str], categories: List[str], per_category: int,
+              sort: str = "top") -> List[Dict]:
+    unique = list(dict.fromkeys(categories))
+    gov = _gov_actions_by_category(city, county, state_name, unique, per_category)
+    issues = _citizen_issues_by_category(city, county, state_name, unique, per_category, sort)
     return [{
         "category": cat,
-        "government_actions": _gov_actions_for(city, county, state_name, cat, per_category),
-        "citizen_issues": _citizen_issues_for(city, county, state_name, cat, per_category),
+        "government_actions": gov.get(cat, []),
+        "citizen_issues": issues.get(cat, []),
     } for cat in categories]
 
 # ---------- CLASSIFICATION ----------
 def _fast_classify(text: str) -> Dict:
     # Use env flags to force rules-only if desired; or extend analyze(use_zero_shot=...)
-    return ner_analyze(text)
+    # sections only need labels, so skip spaCy entity extraction
+    return ner_analyze(text, entities=False)
 
 def _slow_enrich_async(post_id: Optional[str], text: str):
-    def _job():
-        _ = ner_analyze(text)  # run with ZERO_SHOT=1 in env if you want real enrichment
-        # TODO: persist labels/entities later (JSONB column) if desired
-    Thread(target=_job, daemon=True).start()
+    # bounded pool; full analysis (run with ZERO_SHOT=1 for real enrichment) lands in enrichments
+    enrichment_service.enqueue(current_app._get_current_object(), post_id, text)
 
 # ---------- PUBLIC ----------
 def discover(
@@ -133,26 +198,33 @@ def discover(
     message: Optional[str],
     selected_categories: Optional[List[str]],
     per_category: int = 5,
+    sort: str = "top",
 ) -> Dict:
     out: Dict = {"geo": {"city": city, "county": county, "state_name": state_name}}
 
-    # 1) Explicit categories
-    if selected_categories:
-        cats = [c for c in selected_categories if c in CANDIDATE_LABELS]
-        out["sections"] = _sections(city, county, state_name, cats, per_category)
-        return out
-
     # 2) Message -> fast classify -> sections for those labels (geo-filtered)
-    if message and message.strip():
+    # (not cached: the response echoes the classification and enqueues enrichment)
+    if not selected_categories and message and message.strip():
         fast = _fast_classify(message)
         labels = [c["label"] for c in fast.get("categories", [])][:3] or ["crime","housing","transport"]
         out["fast_classification"] = fast
-        out["sections"] = _sections(city, county, state_name, labels, per_category)
+        out["sections"] = _sections(city, county, state_name, labels, per_category, sort)
         _slow_enrich_async(None, message)
         return out
 
+    cats = [c for c in selected_categories if c in CANDIDATE_LABELS] if selected_categories else None
+    key = discover_cache.cache_key(city, county, state_name, cats, per_category, sort)
+    cached = discover_cache.get(key)
+    if cached is not None:
+        return {**out, **cached}
+
+    # 1) Explicit categories
+    if cats is not None:
+        body = {"sections": _sections(city, county, state_name, cats, per_category, sort)}
     # 3) Geo only -> top categories -> sections
-    top = _top_categories_for_geo(city, county, state_name, limit=3)
-    out["top_categories"] = top
-    out["sections"] = _sections(city, county, state_name, [t["label"] for t in top], per_category)
-    return out
+    else:
+        top = _top_categories_for_geo(city, county, state_name, limit=3)
+        body = {"top_categories": top,
+                "sections": _sections(city, county, state_name, [t["label"] for t in top], per_category, sort)}
+    discover_cache.put(key, body)
+    return {**out, **body}
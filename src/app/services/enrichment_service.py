@@ -0,0 +1,127 @@
+"""
+Bounded background enrichment (slow-path classification) for discover and posts.
+
+A fixed pool of worker threads drains a bounded queue. When the queue is full
+the shed policy decides what is lost: "drop_newest" rejects the incoming job,
+"drop_oldest" evicts the longest-waiting one. Results (labels, scores, tags,
+entities) are stored in the enrichments table.
+"""
+from __future__ import annotations
+import hashlib
+import logging
+import os
+import queue
+import time
+from collections import deque
+from threading import Lock, Thread
+from typing import Dict, List, Optional
+
+from flask import Flask
+
+from .. import db
+from ..models.civic import Enrichment
+from .ner_service import _normalize, analyze
+
+log = logging.getLogger(__name__)
+
+WORKERS = int(os.getenv("ENRICH_WORKERS", "2"))
+MAX_QUEUE = int(os.getenv("ENRICH_MAX_QUEUE", "100"))
+SHED_POLICY = os.getenv("ENRICH_SHED_POLICY", "drop_newest")  # drop_newest | drop_oldest
+
+class EnrichmentPool:
+    def __init__(self, workers: int = WORKERS, max_queue: int = MAX_QUEUE, policy: str = SHED_POLICY):
+        if policy not in ("drop_newest", "drop_oldest"):
+            raise ValueError(f"unknown shed policy {policy!r}")
+        self.workers = workers
+        self.policy = policy
+        self._q: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._threads: List[Thread] = []
+        self._lock = Lock()
+        self._latencies: deque = deque(maxlen=512)  # seconds, enqueue -> persisted
+        self._counts = {"enqueued": 0, "processed": 0, "failed": 0, "dropped": 0}
+
+    def submit(self, app: Flask, post_id: Optional[str], text: str) -> bool:
+        """Queue a job; returns False if it (or, for drop_oldest, an older job) was shed."""
+        self._ensure_started()
+        job = (app, post_id, text, time.monotonic())
+        with self._lock:
+            self._counts["enqueued"] += 1
+            try:
+                self._q.put_nowait(job)
+                return True
+            except queue.Full:
+                self._counts["dropped"] += 1
+                if self.policy == "drop_newest":
+                    return False
+            try:
+                self._q.get_nowait()  # drop_oldest: make room for the new job
+                self._q.task_done()
+            except queue.Empty:
+                pass
+            self._q.put_nowait(job)
+            return False
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._lock:
+            if not self._threads:
+                self._threads = [Thread(target=self._run, name=f"enrich-{i}", daemon=True) for i in range(self.workers)]
+                for t in self._threads:
+                    t.start()
+
+    def _run(self) -> None:
+        while True:
+            app, post_id, text, enqueued = self._q.get()
+            try:
+                with app.app_context():
+                    _enrich(post_id, text, enqueued)
+                with self._lock:
+                    self._counts["processed"] += 1
+                    self._latencies.append(time.monotonic() - enqueued)
+            except Exception:
+                log.exception("enrichment failed (post_id=%s)", post_id)
+                with self._lock:
+                    self._counts["failed"] += 1
+            finally:
+                self._q.task_done()
+
+    def join(self) -> None:
+        """Block until every queued job has been processed (tests / shutdown)."""
+        self._q.join()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+            lat = sorted(self._latencies)
+        pct = lambda q: round(lat[min(len(lat) - 1, int(q * len(lat)))] * 1000, 1) if lat else None
+        return {
+            "workers": self.workers,
+            "policy": self.policy,
+            "queue_depth": self._q.qsize(),
+            "max_queue": self._q.maxsize,
+            **counts,
+            "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "max": pct(1.0)},
+        }
+
+def _enrich(post_id: Optional[str], text: str, enqueued: float) -> None:
+    out = analyze(text)
+    db.session.add(Enrichment(
+        post_id=post_id,
+        text_hash=hashlib.sha256(_normalize(text).encode("utf-8")).hexdigest(),
+        primary_category=out["primary_category"],
+        categories=out["categories"],
+        tags=out["tags"],
+        entities=out["entities"],
+        tier=out["tier"],
+        latency_ms=int((time.monotonic() - enqueued) * 1000),
+    ))
+    db.session.commit()
+
+pool = EnrichmentPool()
+
+def enqueue(app: Flask, post_id: Optional[str], text: str) -> bool:
+    return pool.submit(app, post_id, text)
+
+def stats() -> Dict:
+    return pool.stats()
@@ -0,0 +1,145 @@
+"""
+In-memory (city, county, state) -> jurisdiction/body id resolution.
+
+Jurisdictions and bodies are a small, nearly static set, so instead of
+joining Source -> Body -> Jurisdiction and pattern-matching names on every
+request, the resolver loads them once and answers lookups from memory.
+Matching mirrors the SQL it replaces: a city (county) matches city (county)
+jurisdictions whose name contains it, a state matches state jurisdictions by
+name and any jurisdiction by state_name, all case-insensitive.
+
+Results, including empty ones (unknown geos), are memoized per normalized
+key. The index reloads after a committed ORM write to jurisdictions or
+bodies, and at least every GEO_RESOLVER_TTL seconds to pick up writes from
+other processes.
+"""
+from __future__ import annotations
+import os
+import time
+from threading import Lock
+from typing import Callable, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .. import db
+from ..cache import LRUCache
+from ..models.governance import Body, Jurisdiction
+
+TTL_SECONDS = float(os.getenv("GEO_RESOLVER_TTL", "300"))
+MEMO_SIZE = int(os.getenv("GEO_RESOLVER_MEMO_SIZE", "2048"))
+
+# (city, county, state), lowercased, county normalized; None for missing parts
+GeoKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
+def normalize_county(county: Optional[str]) -> Optional[str]:
+    if not county: return None
+    c = county.strip()
+    return c if c.lower().endswith("county") else f"{c} County"
+
+def _norm(v: Optional[str]) -> Optional[str]:
+    v = (v or "").strip().lower()
+    return v or None
+
+def geo_key(city: Optional[str], county: Optional[str], state_name: Optional[str]) -> GeoKey:
+    return (_norm(city), _norm(normalize_county(county)), _norm(state_name))
+
+class ResolvedGeo(NamedTuple):
+    jurisdiction_ids: FrozenSet
+    body_ids: FrozenSet
+
+class _Jurisdiction(NamedTuple):
+    id: object
+    level: str
+    name: str          # lowercased
+    state_name: str    # lowercased
+    body_ids: Tuple
+
+EMPTY = ResolvedGeo(frozenset(), frozenset())
+
+class GeoResolver:
+    def __init__(self, ttl: float = TTL_SECONDS, memo_size: int = MEMO_SIZE,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = Lock()
+        self._index: List[_Jurisdiction] = []
+        self._loaded_at: Optional[float] = None
+        self._memo = LRUCache(memo_size)
+        self._counters = {"loads": 0, "negative_hits": 0}
+
+    def invalidate(self) -> None:
+        """Force a reload on the next lookup."""
+        with self._lock:
+            self._loaded_at = None
+            self._memo.clear()
+
+    def refresh(self) -> None:
+        rows = db.session.execute(
+            select(Jurisdiction.id, Jurisdiction.level, Jurisdiction.name, Jurisdiction.state_name, Body.id)
+            .outerjoin(Body, Body.jurisdiction_id == Jurisdiction.id)
+        ).all()
+        by_id: Dict = {}
+        for jid, level, name, state_name, body_id in rows:
+            j = by_id.setdefault(jid, (getattr(level, "value", level), (name or "").lower(), (state_name or "").lower(), []))
+            if body_id is not None:
+                j[3].append(body_id)
+        index = [_Jurisdiction(jid, level, name, state, tuple(bodies)) for jid, (level, name, state, bodies) in by_id.items()]
+        with self._lock:
+            self._index = index
+            self._loaded_at = self._clock()
+            self._memo.clear()
+            self._counters["loads"] += 1
+
+    def _fresh(self) -> bool:
+        return self._loaded_at is not None and self._clock() - self._loaded_at < self.ttl
+
+    def _match(self, key: GeoKey) -> ResolvedGeo:
+        city, county, state = key
+        hits = [j for j in self._index if
+                (city and j.level == "city" and city in j.name)
+                or (county and j.level == "county" and county in j.name)
+                or (state and ((j.level == "state" and state in j.name) or state in j.state_name))]
+        if not hits:
+            return EMPTY
+        return ResolvedGeo(frozenset(j.id for j in hits), frozenset(b for j in hits for b in j.body_ids))
+
+    def resolve(self, city: Optional[str], county: Optional[str], state_name: Optional[str]) -> ResolvedGeo:
+        key = geo_key(city, county, state_name)
+        if not any(key):
+            return EMPTY
+        if not self._fresh():
+            self.refresh()
+        found = self._memo.get(key)
+        if found is None:
+            found = self._match(key)
+            self._memo.put(key, found)
+        elif not found.jurisdiction_ids:
+            with self._lock:
+                self._counters["negative_hits"] += 1
+        return found
+
+    def stats(self) -> Dict:
+        return {"jurisdictions": len(self._index), "memo": self._memo.stats(), **self._counters}
+
+resolver = GeoResolver()
+
+def resolve(city: Optional[str], county: Optional[str], state_name: Optional[str]) -> ResolvedGeo:
+    return resolver.resolve(city, county, state_name)
+
+# ---------- refresh on change ----------
+_DIRTY = "geo_resolver_dirty"
+
+@event.listens_for(Session, "after_flush")
+def _collect(session, flush_context):
+    if any(isinstance(o, (Jurisdiction, Body)) for o in list(session.new) + list(session.dirty) + list(session.deleted)):
+        session.info[_DIRTY] = True
+
+@event.listens_for(Session, "after_commit")
+def _apply(session):
+    if session.info.pop(_DIRTY, False):
+        resolver.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop(_DIRTY, None)
@@ -0,0 +1,127 @@
+"""
+Micro-batching worker for model inference.
+
+Request threads submit single items; one worker thread collects whatever
+arrives within max_wait_ms (up to max_batch items) and runs them through the
+model as one batch. The queue is bounded: when it stays full for longer than
+submit_timeout, submit() raises InferenceOverloaded instead of piling up work.
+"""
+from __future__ import annotations
+import logging
+import queue
+import time
+from concurrent.futures import Future
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+log = logging.getLogger(__name__)
+
+
+class InferenceOverloaded(Exception):
+    pass
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch: int = 16,
+        max_wait_ms: float = 5.0,
+        max_queue: int = 256,
+        submit_timeout: float = 0.1,
+        name: str = "micro-batcher",
+    ):
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.submit_timeout = submit_timeout
+        self.name = name
+        self._q: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[Thread] = None
+        self._start_lock = Lock()
+        self._stats_lock = Lock()
+        self._stats = {"batches": 0, "items": 0, "rejected": 0, "errors": 0, "max_batch_seen": 0}
+
+    # ---------- producer side ----------
+    def submit(self, item: Any) -> Future:
+        self._ensure_started()
+        fut: Future = Future()
+        try:
+            self._q.put((item, fut), timeout=self.submit_timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["rejected"] += 1
+            raise InferenceOverloaded(f"{self.name} queue full ({self._q.maxsize})")
+        return fut
+
+    def submit_many(self, items: Sequence[Any]) -> List[Future]:
+        futures: List[Future] = []
+        try:
+            for i in items:
+                futures.append(self.submit(i))
+        except InferenceOverloaded:
+            # all or nothing: don't leave the part that got in running for nobody
+            for f in futures:
+                f.cancel()
+            raise
+        return futures
+
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        return self.submit(item).result(timeout)
+
+    # ---------- worker side ----------
+    def _ensure_started(self) -> None:
+        # started lazily so each (forked) gunicorn worker gets its own thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List:
+        batch = [self._q.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._q.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            live = [(i, f) for i, f in batch if f.set_running_or_notify_cancel()]
+            if not live:
+                continue
+            items = [i for i, _ in live]
+            futures = [f for _, f in live]
+            try:
+                results = list(self.fn(items))
+                if len(results) != len(futures):
+                    raise RuntimeError(f"{self.name} returned {len(results)} results for {len(items)} items")
+                for f, r in zip(futures, results):
+                    f.set_result(r)
+                ok = True
+            except Exception as e:  # hand the failure to every waiting caller
+                log.exception("%s batch of %d failed", self.name, len(items))
+                for f in futures:
+                    f.set_exception(e)
+                ok = False
+            with self._stats_lock:
+                self._stats["batches"] += 1
+                self._stats["items"] += len(items)
+                self._stats["max_batch_seen"] = max(self._stats["max_batch_seen"], len(items))
+                if not ok:
+                    self._stats["errors"] += 1
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            s = dict(self._stats)
+        s["queue_depth"] = self._q.qsize()
+        s["avg_batch"] = round(s["items"] / s["batches"], 2) if s["batches"] else None
+        return s
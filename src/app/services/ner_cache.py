@@ -0,0 +1,128 @@
+"""
+Content-addressed cache for ner_service analysis results.
+
+Tier 1 is a bounded in-process LRU (one per worker). Tier 2, enabled with
+NER_CACHE_DB=1, is the classification_cache table, so every gunicorn worker
+shares results. Keys are sha256(version + normalized text); the version is a
+fingerprint of RULES and the models, so editing either makes old entries
+unreachable. Processes on different versions (a rolling deploy, or the web
+app and the enrichment worker with different ZERO_SHOT settings) share the
+table, so nothing is deleted on the request path; `flask ner purge-cache`
+runs purge_stale() to drop other versions' entries once they are old.
+"""
+from __future__ import annotations
+import hashlib
+import logging
+import os
+from threading import Lock
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from flask import has_app_context
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from .. import db
+from ..cache import LRUCache
+from ..models.cache import ClassificationCache
+
+log = logging.getLogger(__name__)
+
+USE_DB_TIER = os.getenv("NER_CACHE_DB", "0") == "1"
+
+_lru = LRUCache(int(os.getenv("NER_CACHE_SIZE", "4096")))
+_lock = Lock()
+_counters = {"db_hits": 0, "misses": 0, "db_errors": 0}
+
+def cache_key(text: str, version: str, namespace: str = "") -> str:
+    return hashlib.sha256(f"{version}\x00{namespace}\x00{text}".encode("utf-8")).hexdigest()
+
+def _bump(name: str, n: int = 1) -> None:
+    with _lock:
+        _counters[name] += n
+
+def _db_enabled() -> bool:
+    return USE_DB_TIER and has_app_context()
+
+# ---------- DB tier ----------
+def _db_get_many(keys: List[str], version: str) -> Dict[str, Dict]:
+    if not keys or not _db_enabled():
+        return {}
+    try:
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                select(ClassificationCache.key, ClassificationCache.result)
+                .where(ClassificationCache.key.in_(keys))
+            ).all()
+        return {k: r for k, r in rows}
+    except SQLAlchemyError as e:
+        _bump("db_errors")
+        log.warning("classification cache read failed: %s", e)
+        return {}
+
+def _db_put_many(entries: Dict[str, Dict], version: str) -> None:
+    if not entries or not _db_enabled():
+        return
+    rows = [{"key": k, "version": version, "result": r} for k, r in entries.items()]
+    try:
+        # separate transaction so a cache write never touches the caller's session
+        with db.engine.begin() as conn:
+            conn.execute(pg_insert(ClassificationCache).values(rows).on_conflict_do_nothing())
+    except SQLAlchemyError as e:
+        _bump("db_errors")
+        log.warning("classification cache write failed: %s", e)
+
+def purge_stale(keep: Iterable[str], older_than_days: float) -> int:
+    """Delete shared entries of versions not in `keep` written more than `older_than_days` ago."""
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    with db.engine.begin() as conn:
+        res = conn.execute(delete(ClassificationCache).where(
+            ClassificationCache.version.notin_(list(keep)), ClassificationCache.created_at < cutoff))
+    return res.rowcount or 0
+
+# ---------- Public ----------
+def get_many(texts: List[str], version: str, namespace: str = "") -> List[Optional[Dict]]:
+    """namespace separates result shapes computed under the same version (e.g. without entities)."""
+    keys = [cache_key(t, version, namespace) for t in texts]
+    found: Dict[str, Dict] = {}
+    for k in keys:
+        hit = _lru.get(k)
+        if hit is not None:
+            found[k] = hit
+    from_db = _db_get_many([k for k in dict.fromkeys(keys) if k not in found], version)
+    for k, r in from_db.items():
+        _lru.put(k, r)
+    found.update(from_db)
+    _bump("db_hits", sum(1 for k in keys if k in from_db))
+    _bump("misses", sum(1 for k in keys if k not in found))
+    return [found.get(k) for k in keys]
+
+def get(text: str, version: str, namespace: str = "") -> Optional[Dict]:
+    return get_many([text], version, namespace)[0]
+
+def put_many(results: Dict[str, Dict], version: str, namespace: str = "") -> None:
+    """results: {normalized text: raw analysis}."""
+    entries = {cache_key(t, version, namespace): r for t, r in results.items()}
+    for k, r in entries.items():
+        _lru.put(k, r)
+    _db_put_many(entries, version)
+
+def put(text: str, version: str, result: Dict, namespace: str = "") -> None:
+    put_many({text: result}, version, namespace)
+
+def clear() -> None:
+    """Drop the in-process tier (the shared table is version-scoped, see purge_stale)."""
+    _lru.clear()
+
+def stats() -> Dict:
+    with _lock:
+        counters = dict(_counters)
+    lru = _lru.stats()
+    lookups = lru["hits"] + counters["db_hits"] + counters["misses"]
+    return {
+        "lru": lru,
+        "db_tier": USE_DB_TIER,
+        **counters,
+        "hit_rate": round((lru["hits"] + counters["db_hits"]) / lookups, 4) if lookups else None,
+    }
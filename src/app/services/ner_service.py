@@ -1,77 +1,189 @@
 from __future__ import annotations
 from functools import lru_cache
-import os, re
-from typing import Dict, List, Tuple
+from threading import Lock
+import hashlib, os, re
+from typing import Dict, Iterable, List, Tuple
 
 import spacy
 
+from . import ner_cache
+from .inference_batcher import MicroBatcher
+from .rule_engine import PhraseMatcher
+
 # env toggles
 USE_ZERO_SHOT = os.getenv("ZERO_SHOT", "1") == "1" and os.getenv("LLM_MOCK", "1") != "1"
+BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "32"))   # texts per nlp.pipe / zero-shot batch
+N_PROCESS = int(os.getenv("NER_N_PROCESS", "1"))      # spaCy worker processes for analyze_many
+
+# micro-batching: concurrent zero_shot_scores calls share one model batch
+USE_BATCHER = os.getenv("NER_BATCHER", "0") == "1"
+BATCHER_MAX_BATCH = int(os.getenv("NER_BATCHER_MAX_BATCH", "16"))
+BATCHER_MAX_WAIT_MS = float(os.getenv("NER_BATCHER_MAX_WAIT_MS", "5"))
+BATCHER_MAX_QUEUE = int(os.getenv("NER_BATCHER_MAX_QUEUE", "256"))
+BATCHER_SUBMIT_TIMEOUT = float(os.getenv("NER_BATCHER_SUBMIT_TIMEOUT", "0.1"))  # seconds before InferenceOverloaded
+ZERO_SHOT_TIMEOUT = float(os.getenv("ZERO_SHOT_TIMEOUT", "30"))
+
+# cascade: skip zero-shot when the rules alone are decisive
+CASCADE = os.getenv("NER_CASCADE", "0") == "1"
+CASCADE_MIN_CONFIDENCE = float(os.getenv("NER_CASCADE_MIN_CONFIDENCE", "0.80"))  # best rule weight needed
+CASCADE_MIN_LABELS = int(os.getenv("NER_CASCADE_MIN_LABELS", "1"))                # rule labels needed
+
+SPACY_MODEL = "en_core_web_sm"
+# extract_entities only reads doc.ents: don't load components NER doesn't need
+SPACY_EXCLUDE = ("tagger", "parser", "attribute_ruler", "lemmatizer", "senter")
+SPACY_FULL_PIPELINE = os.getenv("NER_FULL_PIPELINE", "0") == "1"
+ZERO_SHOT_MODEL = os.getenv("ZERO_SHOT_MODEL", "facebook/bart-large-mnli")
+ZERO_SHOT_DISTILLED_MODEL = os.getenv("ZERO_SHOT_DISTILLED_MODEL", "valhalla/distilbart-mnli-12-1")
+# fp32 | int8 (dynamic quantization of Linear layers, CPU) | distilled | distilled-int8
+ZERO_SHOT_VARIANT = os.getenv("ZERO_SHOT_VARIANT", "fp32")
+ZERO_SHOT_VARIANTS = ("fp32", "int8", "distilled", "distilled-int8")
 
 CANDIDATE_LABELS = [
     "food_access", "road_safety", "crime", "housing",
     "zoning", "transport", "budget", "health"
 ]
+_LABEL_ORDER = {l: i for i, l in enumerate(CANDIDATE_LABELS)}
 
 # ---------- RULES ----------
-# regex → (label, weight)
-RULES: List[Tuple[re.Pattern, str, float]] = [
-    (re.compile(r"\b(food desert|grocery|produce|supermarket|fresh food|food bank)\b", re.I), "food_access", 0.85),
-    (re.compile(r"\b(pothole|speeding|crosswalk|traffic light|unsafe road|collision|accident)\b", re.I), "road_safety", 0.80),
-    (re.compile(r"\b(homicide|shooting|robbery|assault|crime|car break[- ]?in|theft)\b", re.I), "crime", 0.85),
-    (re.compile(r"\b(rent hike|eviction|landlord|affordable housing|shelter|homeless encampment)\b", re.I), "housing", 0.80),
-    (re.compile(r"\b(zoning|rezon(e|ing)|variance|land use|setback|upzone)\b", re.I), "zoning", 0.75),
-    (re.compile(r"\b(bus|transit|metro|subway|train|station|bike lane|sidewalk)\b", re.I), "transport", 0.75),
-    (re.compile(r"\b(budget|appropriation|bond measure|levy|tax|funding cut|funding increase)\b", re.I), "budget", 0.75),
-    (re.compile(r"\b(clinic|hospital|urgent care|public health|mental health|overdose)\b", re.I), "health", 0.70),
+# (label, weight, phrases); phrases match case-insensitively on word boundaries
+RULES: List[Tuple[str, float, List[str]]] = [
+    ("food_access", 0.85, ["food desert", "grocery", "produce", "supermarket", "fresh food", "food bank"]),
+    ("road_safety", 0.80, ["pothole", "speeding", "crosswalk", "traffic light", "unsafe road", "collision", "accident"]),
+    ("crime", 0.85, ["homicide", "shooting", "robbery", "assault", "crime",
+                     "car break-in", "car break in", "car breakin", "theft"]),
+    ("housing", 0.80, ["rent hike", "eviction", "landlord", "affordable housing", "shelter", "homeless encampment"]),
+    ("zoning", 0.75, ["zoning", "rezone", "rezoning", "variance", "land use", "setback", "upzone"]),
+    ("transport", 0.75, ["bus", "transit", "metro", "subway", "train", "station", "bike lane", "sidewalk"]),
+    ("budget", 0.75, ["budget", "appropriation", "bond measure", "levy", "tax", "funding cut", "funding increase"]),
+    ("health", 0.70, ["clinic", "hospital", "urgent care", "public health", "mental health", "overdose"]),
 ]
 
+@lru_cache(maxsize=1)
+def _rule_matcher() -> PhraseMatcher:
+    return PhraseMatcher(RULES)
+
 # ---------- spaCy NER-lite ----------
+def load_nlp(full: bool = SPACY_FULL_PIPELINE):
+    """en_core_web_sm trimmed to what NER needs (full=True loads every component)."""
+    if full:
+        return spacy.load(SPACY_MODEL)
+    nlp = spacy.load(SPACY_MODEL, exclude=list(SPACY_EXCLUDE))
+    # the sm pipeline's ner has its own embedding layer; drop the shared tok2vec
+    # too unless this model version wires ner to it as a listener
+    if "tok2vec" in nlp.pipe_names and "ner" not in getattr(nlp.get_pipe("tok2vec"), "listening_components", []):
+        nlp.remove_pipe("tok2vec")
+    return nlp
+
 @lru_cache(maxsize=1)
 def _nlp():
-    return spacy.load("en_core_web_sm")
+    return load_nlp()
 
 ENT_KEYS = ("GPE","LOC","FAC","ORG","DATE","TIME","MONEY","CARDINAL")
+STREET_RX = re.compile(r"\b([A-Z][a-z]+ (St|Ave|Blvd|Rd|Road|Street|Avenue|Boulevard))\b")
 
 def extract_entities(text: str) -> Dict[str, List[str]]:
-    doc = _nlp()(text)
+    return _entities_from_doc(_nlp()(text), text)
+
+def extract_entities_many(texts: Iterable[str], batch_size: int = BATCH_SIZE, n_process: int = N_PROCESS) -> List[Dict[str, List[str]]]:
+    """Entity-only fast path: no rules, no zero-shot, texts streamed through nlp.pipe."""
+    texts = list(texts)
+    docs = _nlp().pipe(texts, batch_size=batch_size, n_process=n_process)
+    return [_entities_from_doc(doc, text) for doc, text in zip(docs, texts)]
+
+def _entities_from_doc(doc, text: str) -> Dict[str, List[str]]:
     ents: Dict[str, List[str]] = {}
     for ent in doc.ents:
         if ent.label_ in ENT_KEYS:
             ents.setdefault(ent.label_, []).append(ent.text)
-    streets = re.findall(r"\b([A-Z][a-z]+ (St|Ave|Blvd|Rd|Road|Street|Avenue|Boulevard))\b", text)
+    streets = STREET_RX.findall(text)
     if streets:
         ents["STREET"] = list({s[0] for s in streets})
     return ents
 
 # ---------- Zero-shot (multi-label) ----------
+def _variant_model(variant: str) -> str:
+    if variant not in ZERO_SHOT_VARIANTS:
+        raise ValueError(f"ZERO_SHOT_VARIANT must be one of {ZERO_SHOT_VARIANTS}, got {variant!r}")
+    return ZERO_SHOT_DISTILLED_MODEL if variant.startswith("distilled") else ZERO_SHOT_MODEL
+
+def zero_shot_model_id(variant: str = ZERO_SHOT_VARIANT) -> str:
+    """Model name plus quantization, e.g. "facebook/bart-large-mnli+int8"."""
+    model = _variant_model(variant)
+    return f"{model}+int8" if variant.endswith("int8") else model
+
+def load_zero_shot(variant: str = ZERO_SHOT_VARIANT):
+    """Build the CPU zero-shot pipeline for a variant (also used by the offline eval script)."""
+    model = _variant_model(variant)
+    threads = int(os.getenv("ZERO_SHOT_TORCH_THREADS", "0"))  # 0 = torch default
+    import torch
+    if threads:
+        torch.set_num_threads(threads)
+    from transformers import pipeline
+    pipe = pipeline("zero-shot-classification", model=model, device=-1)
+    if variant.endswith("int8"):
+        from torch.ao.quantization import quantize_dynamic
+        pipe.model = quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipe
+
 @lru_cache(maxsize=1)
 def _zero_shot():
     if not USE_ZERO_SHOT:
         return None
-    from transformers import pipeline
-    return pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+    return load_zero_shot(ZERO_SHOT_VARIANT)
+
+def _zero_shot_direct(texts: List[str], batch_size: int = BATCH_SIZE) -> List[Dict[str, float]]:
+    z = _zero_shot()
+    if not z or not texts:
+        return [{} for _ in texts]
+    outs = z(list(texts), CANDIDATE_LABELS, multi_label=True, batch_size=batch_size)
+    if isinstance(outs, dict):  # pipeline unwraps single-item lists
+        outs = [outs]
+    return [{label: float(score) for label, score in zip(o["labels"], o["scores"])} for o in outs]
+
+@lru_cache(maxsize=1)
+def _batcher() -> MicroBatcher:
+    return MicroBatcher(
+        lambda texts: _zero_shot_direct(texts, BATCHER_MAX_BATCH),
+        max_batch=BATCHER_MAX_BATCH,
+        max_wait_ms=BATCHER_MAX_WAIT_MS,
+        max_queue=BATCHER_MAX_QUEUE,
+        submit_timeout=BATCHER_SUBMIT_TIMEOUT,
+        name="zero-shot-batcher",
+    )
+
+def batcher_stats() -> Dict:
+    return {"enabled": USE_BATCHER, **(_batcher().stats() if USE_BATCHER else {})}
 
 def zero_shot_scores(text: str) -> Dict[str, float]:
     """
     Returns per-label score for all CANDIDATE_LABELS using multi_label=True.
-    If disabled, returns {}.
+    If disabled, returns {}. With NER_BATCHER=1 the call is queued and answered
+    by the shared micro-batching worker (may raise InferenceOverloaded).
     """
-    z = _zero_shot()
-    if not z:
+    if not USE_ZERO_SHOT:
         return {}
-    out = z(text, CANDIDATE_LABELS, multi_label=True)  # returns sorted labels & scores
-    labels = out["labels"]
-    scores = out["scores"]
-    return {label: float(score) for label, score in zip(labels, scores)}
+    if USE_BATCHER:
+        return _batcher().submit(text).result(ZERO_SHOT_TIMEOUT)
+    return _zero_shot_direct([text])[0]
+
+def zero_shot_scores_many(texts: List[str], batch_size: int = BATCH_SIZE) -> List[Dict[str, float]]:
+    """
+    Batched zero_shot_scores: one pipeline call for the whole list, so the model
+    sees real batches instead of batch size 1. Same output per item.
+    """
+    if not USE_ZERO_SHOT or not texts:
+        return [{} for _ in texts]
+    if USE_BATCHER:
+        return [f.result(ZERO_SHOT_TIMEOUT) for f in _batcher().submit_many(texts)]
+    return _zero_shot_direct(texts, batch_size)
 
 # ---------- Rule scores (multi-label) ----------
 def rule_scores(text: str) -> Dict[str, float]:
-    best: Dict[str, float] = {}
-    for rx, label, weight in RULES:
-        if rx.search(text):
-            best[label] = max(best.get(label, 0.0), weight)
-    return best  # e.g., {"crime": 0.85, "transport": 0.75}
+    return _rule_matcher().scores(text)  # e.g., {"crime": 0.85, "transport": 0.75}
+
+def rule_matches(text: str) -> Dict[str, List[str]]:
+    """Which phrases fired, per label: {"crime": ["shooting", "car break-in"]}."""
+    return _rule_matcher().matches(text)
 
 # ---------- Fusion ----------
 def fuse_scores(rule_map: Dict[str, float], zs_map: Dict[str, float]) -> Dict[str, float]:
@@ -87,11 +199,88 @@ def fuse_scores(rule_map: Dict[str, float], zs_map: Dict[str, float]) -> Dict[st
         fused.setdefault(l, 0.0)
     return fused
 
+# ---------- Cascade ----------
+_tier_lock = Lock()
+_tier_counts = {"rules": 0, "zero_shot": 0}
+
+def _rules_decisive(rmap: Dict[str, float]) -> bool:
+    return (
+        CASCADE
+        and len(rmap) >= CASCADE_MIN_LABELS
+        and max(rmap.values(), default=0.0) >= CASCADE_MIN_CONFIDENCE
+    )
+
+def _rules_pass(text: str) -> Dict:
+    rmap, rmatches = _rule_matcher().scan(text)
+    return {"rule_scores": rmap, "rule_matches": rmatches, "zero_shot_scores": {}, "tier": "rules"}
+
+def _needs_zero_shot(raw: Dict) -> bool:
+    return USE_ZERO_SHOT and not _rules_decisive(raw["rule_scores"])
+
+def _count_tiers(raws: List[Dict]) -> None:
+    with _tier_lock:
+        for raw in raws:
+            _tier_counts[raw["tier"]] += 1
+
+def cascade_stats() -> Dict:
+    """How many analyses each tier answered (cache hits count under their original tier)."""
+    with _tier_lock:
+        counts = dict(_tier_counts)
+    total = sum(counts.values())
+    return {
+        "enabled": CASCADE,
+        "min_confidence": CASCADE_MIN_CONFIDENCE,
+        "min_labels": CASCADE_MIN_LABELS,
+        **counts,
+        "rules_share": round(counts["rules"] / total, 4) if total else None,
+    }
+
+# ---------- Cache plumbing ----------
+_RESULT_FORMAT = 3  # bump when the cached raw-analysis layout changes
+
+def _normalize(text: str) -> str:
+    return " ".join((text or "").split())
+
+@lru_cache(maxsize=1)
+def model_version() -> str:
+    """
+    Fingerprint of everything that shapes an analysis: RULES, labels, entity
+    config, cascade settings and the models in use. Cached results are keyed
+    on it, so changing any of these invalidates them.
+    """
+    h = hashlib.sha256()
+    h.update(f"format={_RESULT_FORMAT}\n".encode())
+    for label, weight, phrases in RULES:
+        h.update(f"{label}|{weight}|{phrases}\n".encode())
+    h.update(f"{CANDIDATE_LABELS}|{ENT_KEYS}|{STREET_RX.pattern}|{SPACY_MODEL}|".encode())
+    h.update(f"cascade={CASCADE}:{CASCADE_MIN_CONFIDENCE}:{CASCADE_MIN_LABELS}|".encode())
+    h.update((zero_shot_model_id() if USE_ZERO_SHOT else "rules-only").encode())
+    return h.hexdigest()[:16]
+
+def _raw_analysis_many(texts: List[str], batch_size: int, n_process: int, entities: bool = True) -> List[Dict]:
+    """
+    Uncached pass over already-normalized texts: rules for all, zero-shot (in
+    batches) only where the cascade says the rules weren't decisive, entities
+    (unless skipped) streamed through nlp.pipe.
+    """
+    raws = [_rules_pass(t) for t in texts]
+    pending = [i for i, raw in enumerate(raws) if _needs_zero_shot(raw)]
+    for start in range(0, len(pending), batch_size):
+        idx = pending[start:start + batch_size]
+        for i, zmap in zip(idx, zero_shot_scores_many([texts[i] for i in idx], batch_size)):
+            raws[i]["zero_shot_scores"] = zmap
+            raws[i]["tier"] = "zero_shot"
+    ents = extract_entities_many(texts, batch_size, n_process) if entities else [{} for _ in texts]
+    for raw, e in zip(raws, ents):
+        raw["entities"] = e
+    return raws
+
 # ---------- Public API ----------
 def analyze(
     text: str,
     threshold: float = 0.50,   # labels at/above this are returned
-    top_k: int = 3              # if none meet threshold, return top_k anyway
+    top_k: int = 3,             # if none meet threshold, return top_k anyway
+    entities: bool = True,      # False skips spaCy entirely (entities comes back {})
 ) -> Dict:
     """
     Multi-label analysis.
@@ -99,17 +288,51 @@ def analyze(
       {
         "primary_category": <top label>,
         "categories": [{"label":..., "score":...}, ...],   # sorted desc
+        "tier": "rules" | "zero_shot",                     # which tier answered
         "tags": [...],
         "entities": {...}
       }
     """
-    text = (text or "").strip()
-    rmap = rule_scores(text)
-    zmap = zero_shot_scores(text) if USE_ZERO_SHOT else {}
+    raw = _cached_raws([_normalize(text)], BATCH_SIZE, 1, entities)[0]
+    return _build_result(raw, threshold, top_k)
+
+def analyze_many(
+    texts: Iterable[str],
+    threshold: float = 0.50,
+    top_k: int = 3,
+    batch_size: int = BATCH_SIZE,
+    n_process: int = N_PROCESS,
+    entities: bool = True,
+) -> List[Dict]:
+    """
+    Batched analyze(): same output as [analyze(t) for t in texts], item for item.
+    Cache misses are streamed through nlp.pipe (optionally across n_process
+    workers) and the zero-shot model gets batch_size texts per call.
+    """
+    raws = _cached_raws([_normalize(t) for t in texts], batch_size, n_process, entities)
+    return [_build_result(r, threshold, top_k) for r in raws]
+
+def _cached_raws(texts: List[str], batch_size: int, n_process: int, entities: bool) -> List[Dict]:
+    version = model_version()
+    namespace = "" if entities else "no-entities"
+    raws = ner_cache.get_many(texts, version, namespace)
+    missing = list(dict.fromkeys(t for t, r in zip(texts, raws) if r is None))
+    if missing:
+        computed = dict(zip(missing, _raw_analysis_many(missing, batch_size, n_process, entities)))
+        ner_cache.put_many(computed, version, namespace)
+        raws = [r if r is not None else computed[t] for t, r in zip(texts, raws)]
+    _count_tiers(raws)
+    return raws
+
+def _build_result(raw: Dict, threshold: float, top_k: int) -> Dict:
+    # raw may be a shared cache entry: copy anything handed back to callers
+    rmap, zmap = raw["rule_scores"], raw["zero_shot_scores"]
+    ents = {k: list(v) for k, v in raw["entities"].items()}
     fused = fuse_scores(rmap, zmap)
 
-    # sort labels by score desc
-    sorted_items = sorted(fused.items(), key=lambda kv: kv[1], reverse=True)
+    # sort labels by score desc; ties keep CANDIDATE_LABELS order so results don't
+    # depend on dict order (cache entries come back from JSONB with sorted keys)
+    sorted_items = sorted(fused.items(), key=lambda kv: (-kv[1], _LABEL_ORDER.get(kv[0], len(_LABEL_ORDER))))
 
     # pick labels >= threshold; else fallback to top_k
     picked = [(l, s) for l, s in sorted_items if s >= threshold]
@@ -118,7 +341,6 @@ def analyze(
 
     primary_label, primary_score = picked[0] if picked else ("health", 0.5)
 
-    ents = extract_entities(text)
     tags = {l for l, _ in picked}  # just the selected labels; add rule hits if you like
     # include any rule hits explicitly
     tags.update(rmap.keys())
@@ -127,10 +349,12 @@ def analyze(
         "primary_category": primary_label,
         "categories": [{"label": l, "score": round(float(s), 3)} for l, s in picked],
         "confidence": round(float(primary_score), 3),
+        "tier": raw["tier"],                          # "rules" | "zero_shot"
         "tags": sorted(tags),
         "entities": ents,
         "debug": {
-            "rule_scores": rmap if os.getenv("NER_DEBUG", "0") == "1" else None,
-            "zero_shot_scores": zmap if os.getenv("NER_DEBUG", "0") == "1" else None,
+            "rule_scores": dict(rmap) if os.getenv("NER_DEBUG", "0") == "1" else None,
+            "rule_matches": dict(raw["rule_matches"]) if os.getenv("NER_DEBUG", "0") == "1" else None,
+            "zero_shot_scores": dict(zmap) if os.getenv("NER_DEBUG", "0") == "1" else None,
         }
     }
@@ -0,0 +1,59 @@
+"""
+Opaque keyset cursors.
+
+A cursor is the sort key of the last row a client saw, serialized as
+url-safe base64 JSON. Clients pass it back unchanged; the next page is the
+rows strictly after that key in the listing's order, so pages stay stable
+under inserts and cost the same at any depth (no OFFSET).
+"""
+from __future__ import annotations
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+class InvalidCursor(ValueError):
+    pass
+
+def _encode_value(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return {"dt": v.isoformat()}
+    if isinstance(v, uuid.UUID):
+        return {"uuid": str(v)}
+    if hasattr(v, "value"):  # enums
+        return v.value
+    return v
+
+def _decode_value(v: Any) -> Any:
+    if isinstance(v, dict):
+        if "dt" in v:
+            return datetime.fromisoformat(v["dt"])
+        if "uuid" in v:
+            return uuid.UUID(v["uuid"])
+    return v
+
+def encode_cursor(values: Sequence[Any], kind: str) -> str:
+    raw = json.dumps({"k": kind, "v": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(token: Optional[str], kind: str, size: int) -> Optional[List[Any]]:
+    """Sort-key values from `token`, or None for the first page. Raises InvalidCursor."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        values = [_decode_value(v) for v in data["v"]]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("malformed cursor") from e
+    if data.get("k") != kind or len(values) != size:
+        raise InvalidCursor("cursor does not belong to this listing")
+    return values
+
+def page(rows: List[Any], limit: int, key: Callable[[Any], Sequence[Any]], kind: str) -> Tuple[List[Any], Optional[str]]:
+    """Trim a limit+1 fetch to `limit` rows plus the cursor for the next page (None on the last page)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]), kind)
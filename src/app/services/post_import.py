@@ -0,0 +1,171 @@
+"""
+Streaming bulk import of citizen posts (`flask posts import`).
+
+Rows are read lazily from NDJSON or CSV, validated, classified in batches
+with analyze_many() and written as one multi-row INSERT per batch, committed
+batch by batch. Invalid rows go to a reject file as NDJSON
+({"row", "error", "data"}) instead of failing the import; they are written
+with the batch they were read in, after its commit, so a resumed import does
+not repeat them.
+
+Imports are resumable: every post id is derived from (source, row number), so
+re-running the same file inserts nothing twice (ON CONFLICT DO NOTHING), and
+`start_after` skips rows an earlier run already committed without classifying
+them again. The writes bypass the ORM, so the discover cache is cleared at
+the end.
+"""
+from __future__ import annotations
+import csv
+import hashlib
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, IO, Iterator, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+
+from .. import db
+from ..models.civic import CitizenPost
+from ..models.state import State
+from . import discover_cache
+from .ner_service import analyze_many
+from .posts_service import post_from_analysis
+
+BATCH_SIZE = 500
+FORMATS = ("ndjson", "csv")
+
+_IMPORT_NS = uuid.UUID("5b0c5e0e-9a64-4b9f-8f0c-3d0c2f6a1e77")
+_REQUIRED = ("title", "body", "city", "state_name")
+_MAX_LEN = {c.name: c.type.length for c in CitizenPost.__table__.columns
+            if c.name in ("title", "city", "county", "state_name")}
+
+class RejectedRow(ValueError):
+    pass
+
+def source_for(path: str, head_bytes: int = 65536) -> str:
+    """
+    Default import source: file name plus a hash of the first `head_bytes`.
+    A different export under the same name gets new post ids, while a file
+    that only grew at the end (same leading rows) keeps them.
+    """
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read(head_bytes)).hexdigest()[:16]
+    return f"{os.path.basename(path)}:{digest}"
+
+def read_rows(stream: IO[str], fmt: str) -> Iterator[Tuple[int, object]]:
+    """(row number, parsed row) pairs; a row that fails to parse comes back as a RejectedRow."""
+    if fmt == "csv":
+        for n, row in enumerate(csv.DictReader(stream), 1):
+            yield n, row
+        return
+    n = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        n += 1
+        try:
+            yield n, json.loads(line)
+        except ValueError as e:
+            yield n, RejectedRow(f"invalid json: {e}")
+
+def validate(row, states: set) -> Dict:
+    """The CitizenPost fields of a raw row; raises RejectedRow."""
+    if isinstance(row, RejectedRow):
+        raise row
+    if not isinstance(row, dict):
+        raise RejectedRow("row is not an object")
+    out = {k: str(row.get(k) or "").strip() or None for k in (*_REQUIRED, "county")}
+    missing = [k for k in _REQUIRED if not out[k]]
+    if missing:
+        raise RejectedRow(f"missing {', '.join(missing)}")
+    for k, n in _MAX_LEN.items():
+        if out[k] and len(out[k]) > n:
+            raise RejectedRow(f"{k} longer than {n}")
+    if out["state_name"] not in states:
+        raise RejectedRow(f"unknown state_name {out['state_name']!r}")
+    try:
+        out["score"] = int(row.get("score") or 0)
+        out["created_at"] = datetime.fromisoformat(row["created_at"]) if row.get("created_at") else datetime.now()
+    except (TypeError, ValueError) as e:
+        raise RejectedRow(f"bad score/created_at: {e}") from e
+    return out
+
+def _insert_batch(batch: List[Tuple[int, Dict]], source: str, entities: bool) -> int:
+    results = analyze_many([f"{f['title']}\n{f['body']}" for _, f in batch], entities=entities)
+    rows = []
+    for (n, f), ner in zip(batch, results):
+        post = post_from_analysis(f["title"], f["body"], f["city"], f["county"], f["state_name"], ner)
+        rows.append({
+            "id": uuid.uuid5(_IMPORT_NS, f"{source}:{n}"),
+            "title": post.title, "body": post.body, "category": post.category,
+            "categories": post.categories, "tags": post.tags, "entities": post.entities if entities else None,
+            "city": post.city, "county": post.county, "state_name": post.state_name,
+            "score": f["score"], "created_at": f["created_at"],
+        })
+    table = CitizenPost.__table__
+    inserted = db.session.execute(
+        insert(table).values(rows).on_conflict_do_nothing(index_elements=[table.c.id]).returning(table.c.id)
+    ).all()
+    db.session.commit()
+    return len(inserted)
+
+def import_posts(
+    stream: IO[str],
+    fmt: str,
+    source: str,
+    rejects: Optional[IO[str]] = None,
+    batch_size: int = BATCH_SIZE,
+    start_after: int = 0,
+    entities: bool = True,
+    on_batch: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """
+    Import every row of `stream` after row `start_after`. `source` names the
+    input in the derived post ids (keep it stable across resumes). on_batch
+    gets the running stats after each commit; stats["row"] is the last
+    committed row, the value to resume from.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r}")
+    states = {s for (s,) in db.session.query(State.state_name)}
+    stats = {"row": start_after, "read": 0, "inserted": 0, "duplicates": 0, "rejected": 0,
+             "seconds": 0.0, "rows_per_sec": 0.0}
+    t0 = time.perf_counter()
+    batch: List[Tuple[int, Dict]] = []
+    rejected: List[str] = []
+
+    def flush(last_row: int) -> None:
+        if batch:
+            inserted = _insert_batch(batch, source, entities)
+            stats["inserted"] += inserted
+            stats["duplicates"] += len(batch) - inserted
+            batch.clear()
+        if rejected and rejects is not None:
+            rejects.writelines(rejected)
+            rejects.flush()
+        rejected.clear()
+        stats["row"] = last_row
+        stats["seconds"] = round(time.perf_counter() - t0, 2)
+        stats["rows_per_sec"] = round(stats["read"] / max(stats["seconds"], 1e-9), 1)
+        if on_batch:
+            on_batch(dict(stats))
+
+    n = start_after
+    for n, row in read_rows(stream, fmt):
+        if n <= start_after:
+            continue
+        stats["read"] += 1
+        try:
+            batch.append((n, validate(row, states)))
+        except RejectedRow as e:
+            stats["rejected"] += 1
+            if rejects is not None:
+                rejected.append(json.dumps({"row": n, "error": str(e), "data": row if isinstance(row, dict) else None},
+                                           default=str) + "\n")
+        if len(batch) >= batch_size:
+            flush(n)
+    flush(n)
+    discover_cache.invalidate_all()
+    return stats
@@ -1,44 +1,171 @@
+import uuid
+from datetime import datetime
+from typing import NamedTuple
+
+from flask import current_app
+from sqlalchemy import bindparam, func, text, tuple_
+from sqlalchemy.dialects.postgresql import UUID
+
 from .. import db
 from ..models.civic import CitizenPost, PostVote, IssueTopicMatch
 from ..models.enums import VoteType, Category
-from .ner_service import analyze
+from .ner_service import analyze, analyze_many
+from . import discover_cache, vote_buffer
+from .geo_resolver import geo_key
+from .pagination import decode_cursor, page
+
+def post_from_analysis(title: str, body: str, city: str, county: str | None, state_name: str, ner: dict) -> CitizenPost:
+    """An unsaved CitizenPost carrying the stored parts of an analyze() result."""
+    return CitizenPost(title=title, body=body, category=Category(ner["primary_category"]),
+                       categories=ner["categories"], tags=ner["tags"], entities=ner["entities"],
+                       city=city, county=county, state_name=state_name)
 
 def create_post(title: str, body: str, city: str, county: str | None, state_name: str):
-    ner = analyze(f"{title}\n{body}")
-    primary = Category(ner["category"])
-    post = CitizenPost(title=title, body=body, category=category, city=city, county=county, state_name=state_name)
+    post = post_from_analysis(title, body, city, county, state_name, analyze(f"{title}\n{body}"))
     db.session.add(post)
-    db.session.flush()  # get post.id
+    db.session.commit()
 
     # baseline tag-overlap matcher stub: match after topics exist; for now empty
     return post
 
-def list_posts(city: str | None, state_name: str | None, category: str | None, limit: int = 20):
+def backfill_analysis(batch_size: int = 200, entities: bool = True, on_batch=None) -> int:
+    """
+    Store categories/tags/entities on posts created before those columns
+    existed (categories IS NULL), batch_size posts per analyze_many() call and
+    commit. The primary category is left as is. Returns the number of posts
+    updated; on_batch gets the running count after each commit.
+    """
+    table = CitizenPost.__table__
+    stmt = (table.update().where(table.c.id == bindparam("b_id"))
+            .values(categories=bindparam("b_categories"), tags=bindparam("b_tags"), entities=bindparam("b_entities")))
+    done, after = 0, None
+    while True:
+        q = (db.session.query(CitizenPost.id, CitizenPost.title, CitizenPost.body)
+             .filter(CitizenPost.categories.is_(None)).order_by(CitizenPost.id))
+        if after is not None:
+            q = q.filter(CitizenPost.id > after)  # posts that failed to change are not retried forever
+        rows = q.limit(batch_size).all()
+        if not rows:
+            break
+        results = analyze_many([f"{title}\n{body}" for _, title, body in rows], entities=entities)
+        db.session.execute(stmt, [{"b_id": pid, "b_categories": ner["categories"], "b_tags": ner["tags"],
+                                   "b_entities": ner["entities"] if entities else None}
+                                  for (pid, _, _), ner in zip(rows, results)])
+        db.session.commit()
+        done += len(rows)
+        after = rows[-1].id
+        if on_batch:
+            on_batch(done)
+    if done:
+        discover_cache.invalidate_all()  # Core updates skip the ORM hooks
+    return done
+
+SORTS = ("top", "trending")
+
+def list_posts(city: str | None, state_name: str | None, category: str | None, limit: int = 20,
+               cursor: str | None = None, sort: str = "top"):
+    """
+    One page of posts, best first: (score, created_at, id) descending, or
+    (hot_rank, id) descending for sort="trending".
+    Returns (posts, next_cursor); raises pagination.InvalidCursor.
+    """
+    if sort not in SORTS:
+        raise ValueError(f"unknown sort {sort!r}")
+    if sort == "trending":
+        kind, cols = "posts_trending", (CitizenPost.hot_rank, CitizenPost.id)
+    else:
+        kind, cols = "posts", (CitizenPost.score, CitizenPost.created_at, CitizenPost.id)
+    after = decode_cursor(cursor, kind, len(cols))
     q = CitizenPost.query
-    if city: q = q.filter(CitizenPost.city.ilike(city))
+    if city: q = q.filter(func.lower(CitizenPost.city) == city.lower())
     if state_name: q = q.filter(CitizenPost.state_name == state_name)
     if category: q = q.filter(CitizenPost.category == Category(category))
-    return q.order_by(CitizenPost.score.desc(), CitizenPost.created_at.desc()).limit(limit).all()
-
-def vote_post(post_id, voter_token_hash: str | None, vote: VoteType):
-    # enforce once-per-token
-    if voter_token_hash:
-        existing = PostVote.query.filter_by(post_id=post_id, voter_token_hash=voter_token_hash).first()
-        if existing:
-            # if same vote, ignore; if opposite, flip score by 2
-            if existing.vote == vote:
-                return
-            delta = 2 if vote == VoteType.up else -2
-            existing.vote = vote
-        else:
-            db.session.add(PostVote(post_id=post_id, voter_token_hash=voter_token_hash, vote=vote))
-            delta = 1 if vote == VoteType.up else -1
-    else:
-        # anonymous with no token: still allow, but no dedupe (dev-only)
-        db.session.add(PostVote(post_id=post_id, vote=vote))
-        delta = 1 if vote == VoteType.up else -1
+    if after: q = q.filter(tuple_(*cols) < tuple_(*after))
+    rows = q.order_by(*(c.desc() for c in cols)).limit(limit + 1).all()
+    return page(rows, limit, lambda p: tuple(getattr(p, c.key) for c in cols), kind)
+
+class VoteResult(NamedTuple):
+    id: uuid.UUID
+    score: int
+    pending: int = 0   # part of score not yet written to citizen_posts (buffered mode)
+
+# One round trip: upsert the vote and apply the score delta atomically.
+# - new vote (or no token: NULLs never conflict) -> inserted, delta = step
+# - same token, opposite vote -> updated (xmax <> 0), delta = 2 * step
+# - same token, same vote -> WHERE skips the update, no row, score untouched
+# The final SELECT reads the pre-statement snapshot only when nothing changed;
+# an unknown post inserts nothing and yields no row.
+_VOTE_SQL = text("""
+WITH v AS (
+    INSERT INTO post_votes (id, post_id, vote, voter_token_hash, created_at)
+    SELECT :vote_id, p.id, CAST(:vote AS vote_type), :token, :now
+    FROM citizen_posts p WHERE p.id = :post_id
+    ON CONFLICT (post_id, voter_token_hash) DO UPDATE SET vote = excluded.vote
+        WHERE post_votes.vote IS DISTINCT FROM excluded.vote
+    RETURNING (xmax = 0) AS inserted
+), upd AS (
+    UPDATE citizen_posts p
+    SET score = p.score + CASE WHEN v.inserted THEN :step ELSE 2 * :step END
+    FROM v WHERE p.id = :post_id
+    RETURNING p.score, p.city, p.county, p.state_name
+)
+SELECT p.id, coalesce((SELECT score FROM upd), p.score) AS score, EXISTS (SELECT 1 FROM upd) AS changed,
+       p.city, p.county, p.state_name
+FROM citizen_posts p WHERE p.id = :post_id
+""").bindparams(bindparam("vote_id", type_=UUID(as_uuid=True)), bindparam("post_id", type_=UUID(as_uuid=True)))
+
+# Buffered mode: same vote upsert, but the delta is returned instead of applied
+# (vote_buffer adds it to citizen_posts later). delta is NULL for a repeated vote.
+# flushed is the buffer generation already in p.score (same snapshot).
+_VOTE_ROW_SQL = text("""
+WITH v AS (
+    INSERT INTO post_votes (id, post_id, vote, voter_token_hash, created_at)
+    SELECT :vote_id, p.id, CAST(:vote AS vote_type), :token, :now
+    FROM citizen_posts p WHERE p.id = :post_id
+    ON CONFLICT (post_id, voter_token_hash) DO UPDATE SET vote = excluded.vote
+        WHERE post_votes.vote IS DISTINCT FROM excluded.vote
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT p.id, p.score, (SELECT CASE WHEN v.inserted THEN :step ELSE 2 * :step END FROM v) AS delta,
+       coalesce((SELECT generation FROM vote_buffer_flushes WHERE buffer_id = :buffer_id), 0) AS flushed
+FROM citizen_posts p WHERE p.id = :post_id
+""").bindparams(bindparam("vote_id", type_=UUID(as_uuid=True)), bindparam("post_id", type_=UUID(as_uuid=True)),
+                bindparam("buffer_id", type_=UUID(as_uuid=True)))
 
-    post = CitizenPost.query.get(post_id)
-    post.score = (post.score or 0) + delta
+def vote_post(post_id, voter_token_hash: str | None, vote: VoteType, buffered: bool | None = None) -> VoteResult | None:
+    """
+    Record a vote (once per token; flipping an existing vote moves the score
+    by 2) and return the post's new score, or None if the post does not exist.
+    Tokenless votes are not deduplicated (dev-only).
+
+    buffered (default: VOTE_BUFFER env) leaves the score update to
+    vote_buffer; the returned score then includes this process's pending
+    delta (not other workers').
+    """
+    params = {
+        "vote_id": uuid.uuid4(),
+        "post_id": uuid.UUID(str(post_id)),  # ValueError for a malformed id
+        "vote": vote.value,
+        "token": voter_token_hash,
+        "now": datetime.now(),
+        "step": 1 if vote == VoteType.up else -1,
+    }
+    if vote_buffer.ENABLED if buffered is None else buffered:
+        buf = vote_buffer.buffer
+        row = db.session.execute(_VOTE_ROW_SQL, {**params, "buffer_id": buf.id}).first()
+        db.session.commit()
+        if row is None:
+            return None
+        post_id = uuid.UUID(str(row.id))
+        pending = (buf.add(current_app._get_current_object(), post_id, row.delta, row.flushed) if row.delta
+                   else buf.pending(post_id, row.flushed))
+        return VoteResult(post_id, row.score + pending, pending)
+
+    row = db.session.execute(_VOTE_SQL, params).first()
     db.session.commit()
-    return post
+    if row is None:
+        return None
+    if row.changed:
+        # raw SQL bypasses the ORM hooks that normally invalidate cached discover responses
+        discover_cache.invalidate_geo([geo_key(row.city, row.county, row.state_name)])
+    return VoteResult(uuid.UUID(str(row.id)), row.score)
@@ -0,0 +1,87 @@
+"""
+Single-pass keyword matcher for ner_service rules.
+
+Phrases are split into tokens (maximal \\w runs and single non-word chars) and
+stored in a token trie. Scanning tokenizes the text once and walks the trie
+from each word token, so cost grows with text length, not with the number of
+phrases. Matching whole tokens gives the same result as
+re.search(r"\\b(phrase|...)\\b", text, re.I) for each phrase.
+"""
+from __future__ import annotations
+import re
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+_TOKEN_RX = re.compile(r"\w+|\W")
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RX.findall(text.lower())
+
+class RuleMatch(NamedTuple):
+    label: str
+    phrase: str
+    weight: float
+
+class PhraseMatcher:
+    """
+    Built from (label, weight, phrases) rules. Phrases must start and end with
+    a word character, since they are matched on word boundaries.
+    """
+
+    def __init__(self, rules: Iterable[Tuple[str, float, Iterable[str]]]):
+        self._root: Dict = {}
+        self._labels: List[str] = []   # rule order, used to order results
+        self.size = 0
+        for label, weight, phrases in rules:
+            for phrase in phrases:
+                self.add(label, weight, phrase)
+
+    def add(self, label: str, weight: float, phrase: str) -> None:
+        toks = _tokens(phrase)
+        if not toks or not re.match(r"\w", toks[0]) or not re.match(r"\w", toks[-1]):
+            raise ValueError(f"rule phrase must start and end with a word character: {phrase!r}")
+        if label not in self._labels:
+            self._labels.append(label)
+        node = self._root
+        for tok in toks:
+            node = node.setdefault(tok, {})
+        node.setdefault(None, []).append(RuleMatch(label, phrase, weight))  # None key = terminal
+        self.size += 1
+
+    def finditer(self, text: str) -> Iterable[RuleMatch]:
+        """Every (label, phrase, weight) hit in the text, overlapping ones included."""
+        toks = _tokens(text)
+        root = self._root
+        n = len(toks)
+        for i in range(n):
+            node = root.get(toks[i])
+            j = i + 1
+            while node is not None:
+                hits = node.get(None)
+                if hits:
+                    yield from hits
+                if j >= n:
+                    break
+                node = node.get(toks[j])
+                j += 1
+
+    def scan(self, text: str) -> Tuple[Dict[str, float], Dict[str, List[str]]]:
+        """
+        One pass, both views (labels in rule order):
+          scores:  label -> best weight among matched rules
+          matches: label -> distinct phrases that matched, in text order
+        """
+        best: Dict[str, float] = {}
+        found: Dict[str, List[str]] = {}
+        for m in self.finditer(text):
+            best[m.label] = max(best.get(m.label, 0.0), m.weight)
+            phrases = found.setdefault(m.label, [])
+            if m.phrase not in phrases:
+                phrases.append(m.phrase)
+        labels = [l for l in self._labels if l in best]
+        return {l: best[l] for l in labels}, {l: found[l] for l in labels}
+
+    def scores(self, text: str) -> Dict[str, float]:
+        return self.scan(text)[0]
+
+    def matches(self, text: str) -> Dict[str, List[str]]:
+        return self.scan(text)[1]
@@ -0,0 +1,90 @@
+"""
+Local full-text search over sources and citizen posts.
+
+Both tables carry a generated, GIN-indexed `search_vector` (title weighted
+above summary/body). A query is parsed with websearch_to_tsquery, so users
+can type quotes, "or" and "-term". Hits from both tables are merged by
+ts_rank_cd and paged with a keyset cursor on (rank, kind, id).
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+from sqlalchemy import Float, String, cast, func, literal, tuple_, union_all
+from sqlalchemy.dialects.postgresql import ARRAY, array
+
+from .. import db
+from ..models.civic import CitizenPost
+from ..models.enums import Category
+from ..models.governance import Source
+from .discover_service import _geo_posts_query, _geo_source_query, _post_dict, _source_dict
+from .pagination import decode_cursor, page
+
+KINDS = ("sources", "posts")
+MAX_LIMIT = 50
+_CURSOR_KIND = "search"
+
+def _tsquery(q: str):
+    return func.websearch_to_tsquery("english", q)
+
+def _source_hits(tsq, has_geo: bool, city, county, state_name, category: Optional[str]):
+    q = _geo_source_query(city, county, state_name) if has_geo else db.session.query(Source)
+    rank = cast(func.ts_rank_cd(Source.search_vector, tsq), Float)
+    q = q.filter(Source.search_vector.op("@@")(tsq))
+    if category:
+        q = q.filter(Source.tags.contains(cast(array([category]), ARRAY(String))))
+    return q.with_entities(literal("source").label("kind"), Source.id.label("id"), rank.label("rank"))
+
+def _post_hits(tsq, has_geo: bool, city, county, state_name, category: Optional[str]):
+    q = _geo_posts_query(city, county, state_name) if has_geo else CitizenPost.query
+    rank = cast(func.ts_rank_cd(CitizenPost.search_vector, tsq), Float)
+    q = q.filter(CitizenPost.search_vector.op("@@")(tsq))
+    if category:
+        if category not in Category.__members__:
+            return None
+        q = q.filter(CitizenPost.category == Category(category))
+    return q.with_entities(literal("post").label("kind"), CitizenPost.id.label("id"), rank.label("rank"))
+
+def search(
+    q: str,
+    kinds: List[str] = KINDS,
+    city: Optional[str] = None,
+    county: Optional[str] = None,
+    state_name: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Dict:
+    """
+    Ranked matches for `q`; returns {"results": [...], "next_cursor": str|None}.
+    Raises pagination.InvalidCursor for a cursor from another listing.
+    """
+    limit = max(1, min(limit, MAX_LIMIT))
+    after = decode_cursor(cursor, _CURSOR_KIND, 3)
+    tsq = _tsquery(q)
+    has_geo = bool(city or county or state_name)
+
+    parts = []
+    if "sources" in kinds:
+        parts.append(_source_hits(tsq, has_geo, city, county, state_name, category))
+    if "posts" in kinds:
+        parts.append(_post_hits(tsq, has_geo, city, county, state_name, category))
+    parts = [p.statement for p in parts if p is not None]
+    if not parts:
+        return {"results": [], "next_cursor": None}
+
+    hits = (union_all(*parts) if len(parts) > 1 else parts[0]).subquery("hits")
+    listing = db.session.query(hits.c.kind, hits.c.id, hits.c.rank)
+    if after:
+        listing = listing.filter(tuple_(hits.c.rank, hits.c.kind, hits.c.id) < tuple_(*after))
+    rows, next_cursor = page(
+        listing.order_by(hits.c.rank.desc(), hits.c.kind.desc(), hits.c.id.desc()).limit(limit + 1).all(),
+        limit, lambda r: (r.rank, r.kind, r.id), _CURSOR_KIND,
+    )
+    sources = {s.id: s for s in Source.query.filter(Source.id.in_([r.id for r in rows if r.kind == "source"]))}
+    posts = {p.id: p for p in CitizenPost.query.filter(CitizenPost.id.in_([r.id for r in rows if r.kind == "post"]))}
+
+    results = []
+    for kind, id_, rank in rows:
+        item = _source_dict(sources[id_]) if kind == "source" else _post_dict(posts[id_])
+        results.append({"kind": kind, "rank": rank, **item})
+    return {"results": results, "next_cursor": next_cursor}
@@ -1,8 +1,32 @@
+from sqlalchemy import select, tuple_
+
 from ..models.governance import Source, Body
 from ..models.enums import SourceType
 from .. import db
+from .pagination import decode_cursor, page
+
+def list_sources_for_city(city: str, limit: int = 10, cursor: str | None = None):
+    """
+    One page of sources from bodies whose name matches `city`, ordered
+    meeting_datetime DESC NULLS LAST, created_at DESC, id DESC.
+    Returns (sources, next_cursor); raises pagination.InvalidCursor.
+    """
+    after = decode_cursor(cursor, "sources", 3)
+    # minimal: match via body names for MVP
+    body_ids = select(Body.id).where(Body.name.ilike(f"%{city}%")).scalar_subquery()
+    base = db.session.query(Source).filter(Source.body_id.in_(body_ids))
 
-def list_sources_for_city(city: str, limit: int = 10):
-    # minimal: join via body/jurisdiction names for MVP
-    q = db.session.query(Source).join(Body, Body.id == Source.body_id).filter(Body.name.ilike(f"%{city}%"))
-    return q.order_by(Source.meeting_datetime.desc().nullslast(), Source.created_at.desc()).limit(limit).all()
+    # Dated and undated sources are read as two index ranges, so a page never
+    # has to skip over the rows before the cursor.
+    rows = []
+    if after is None or after[0] is not None:
+        dated = base.filter(Source.meeting_datetime.isnot(None))
+        if after:
+            dated = dated.filter(tuple_(Source.meeting_datetime, Source.created_at, Source.id) < tuple_(*after))
+        rows = dated.order_by(Source.meeting_datetime.desc(), Source.created_at.desc(), Source.id.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        undated = base.filter(Source.meeting_datetime.is_(None))
+        if after and after[0] is None:
+            undated = undated.filter(tuple_(Source.created_at, Source.id) < tuple_(*after[1:]))
+        rows += undated.order_by(Source.created_at.desc(), Source.id.desc()).limit(limit + 1 - len(rows)).all()
+    return page(rows, limit, lambda s: (s.meeting_datetime, s.created_at, s.id), "sources")
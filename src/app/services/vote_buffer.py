@@ -0,0 +1,190 @@
+"""
+Write-behind score aggregation for votes (VOTE_BUFFER=1).
+
+Vote rows are still written (idempotently) on the request path, but the
+score delta is added to an in-memory per-post counter instead of updating
+citizen_posts. A flusher thread applies all pending deltas in one UPDATE
+every VOTE_BUFFER_INTERVAL_MS, or as soon as VOTE_BUFFER_MAX_PENDING votes
+are waiting, so a viral post takes one row lock per flush instead of one per
+vote. Pending deltas are flushed at interpreter exit; a hard crash loses at
+most one interval's worth of score (the vote rows survive, so
+rebuild-from-votes is possible).
+
+Each flush commits a generation number for this buffer into
+vote_buffer_flushes together with the scores. The vote statement reads that
+generation in the same snapshot as the score, so the score it reports adds
+back exactly the deltas that score is missing: never a flushed batch twice,
+never one the read predates. The buffer is per process; a reported score
+does not include other workers' pending votes.
+"""
+from __future__ import annotations
+import atexit
+import logging
+import os
+import time
+import uuid
+from collections import Counter, OrderedDict
+from datetime import datetime
+from threading import Condition, Lock, Thread
+from typing import Dict, Optional
+
+from flask import Flask
+from sqlalchemy import Integer, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID, insert
+
+from .. import db
+from ..models.civic import CitizenPost, VoteBufferFlush
+from . import discover_cache
+from .geo_resolver import geo_key
+
+log = logging.getLogger(__name__)
+
+ENABLED = os.getenv("VOTE_BUFFER", "0") == "1"
+INTERVAL_MS = float(os.getenv("VOTE_BUFFER_INTERVAL_MS", "250"))
+MAX_PENDING = int(os.getenv("VOTE_BUFFER_MAX_PENDING", "1000"))
+HISTORY = 16  # committed batches kept for votes that read a score mid-flush
+
+class VoteBuffer:
+    def __init__(self, interval_ms: float = INTERVAL_MS, max_pending: int = MAX_PENDING):
+        self.interval = interval_ms / 1000.0
+        self.max_pending = max_pending
+        self.id = uuid.uuid4()                # this buffer's row in vote_buffer_flushes
+        self._deltas: Counter = Counter()     # post_id -> unflushed score delta
+        self._inflight: Counter = Counter()   # deltas of the flush in progress
+        self._inflight_gen = 0                # generation that flush will commit as
+        self._generation = 0                  # last committed flush
+        self._flushed: "OrderedDict[int, Counter]" = OrderedDict()  # recent generation -> its deltas
+        self._votes = 0                       # votes behind _deltas
+        self._app: Optional[Flask] = None
+        self._thread: Optional[Thread] = None
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._wake = Condition(self._lock)
+        self._stats = {"votes": 0, "flushes": 0, "flushed_posts": 0, "flushed_votes": 0, "errors": 0, "last_flush_ms": 0.0}
+
+    def add(self, app: Flask, post_id, delta: int, seen: Optional[int] = None) -> int:
+        """Buffer a score delta; returns pending(post_id, seen) including it."""
+        self._ensure_started(app)
+        with self._lock:
+            self._deltas[post_id] += delta
+            self._votes += 1
+            self._stats["votes"] += 1
+            if self._votes >= self.max_pending:
+                self._wake.notify()
+            return self._unapplied(post_id, seen)
+
+    def pending(self, post_id, seen: Optional[int] = None) -> int:
+        """
+        This process's delta for `post_id` missing from a score read at flush
+        generation `seen` (default: the latest). Other workers' buffers are
+        not included.
+        """
+        with self._lock:
+            return self._unapplied(post_id, seen)
+
+    def _unapplied(self, post_id, seen: Optional[int]) -> int:
+        seen = self._generation if seen is None else seen
+        total = self._deltas.get(post_id, 0)
+        if self._inflight_gen > seen:
+            total += self._inflight.get(post_id, 0)
+        # flushes that committed after the score was read; older ones are
+        # already in it (a read more than HISTORY flushes old undercounts)
+        return total + sum(batch.get(post_id, 0) for gen, batch in self._flushed.items() if gen > seen)
+
+    def _ensure_started(self, app: Flask) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._app = app
+                self._thread = Thread(target=self._run, name="vote-buffer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                self._wake.wait_for(lambda: self._votes >= self.max_pending, timeout=self.interval)
+            try:
+                self.flush()
+            except Exception:  # keep the flusher alive; flush() already restored the deltas
+                log.exception("vote buffer flush failed")
+
+    def flush(self) -> int:
+        """Apply every pending delta in one transaction; returns the number of posts updated."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._deltas:
+                    return 0
+                batch, votes = Counter({k: v for k, v in self._deltas.items() if v}), self._votes
+                gen = self._generation + 1
+                self._inflight, self._inflight_gen = Counter(batch), gen
+                self._deltas, self._votes = Counter(), 0
+            t0 = time.perf_counter()
+            geos = []
+            try:
+                if batch:
+                    # the commit (outside _lock: voters never wait on it) makes
+                    # the scores and this buffer's generation visible together
+                    with self._app.app_context():
+                        geos = _apply(batch, self.id, gen)
+                        db.session.commit()
+            except Exception:
+                with self._lock:
+                    self._deltas.update(self._inflight)  # retry on the next flush
+                    self._votes += votes
+                    self._inflight, self._inflight_gen = Counter(), 0
+                    self._stats["errors"] += 1
+                raise
+            with self._lock:
+                if batch:
+                    self._flushed[gen] = self._inflight
+                    while len(self._flushed) > HISTORY:
+                        self._flushed.popitem(last=False)
+                    self._generation = gen
+                self._inflight, self._inflight_gen = Counter(), 0
+                self._stats["flushes"] += 1
+                self._stats["flushed_posts"] += len(batch)
+                self._stats["flushed_votes"] += votes
+                self._stats["last_flush_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+            discover_cache.invalidate_geo(geos)
+            return len(batch)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "pending_posts": len(self._deltas), "pending_votes": self._votes,
+                    "generation": self._generation}
+
+def _apply(batch: Counter, buffer_id: uuid.UUID, generation: int):
+    ids = sorted(batch)
+    # lock rows in id order so concurrent flushers (other workers) cannot deadlock
+    db.session.execute(select(CitizenPost.id).where(CitizenPost.id.in_(ids)).order_by(CitizenPost.id).with_for_update())
+    d = values(column("id", UUID(as_uuid=True)), column("delta", Integer), name="d").data(
+        [(i, batch[i]) for i in ids])
+    rows = db.session.execute(
+        update(CitizenPost)
+        .where(CitizenPost.id == d.c.id)
+        .values(score=CitizenPost.score + d.c.delta)
+        .returning(CitizenPost.city, CitizenPost.county, CitizenPost.state_name)
+        .execution_options(synchronize_session=False)
+    ).all()
+    marks = VoteBufferFlush.__table__
+    stmt = insert(marks).values(buffer_id=buffer_id, generation=generation, flushed_at=datetime.now())
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[marks.c.buffer_id],
+        set_={"generation": stmt.excluded.generation, "flushed_at": stmt.excluded.flushed_at},
+    ))
+    return [geo_key(*r) for r in rows]  # committed by flush()
+
+buffer = VoteBuffer()
+
+def stats() -> Dict:
+    return buffer.stats()
+
+@atexit.register
+def _flush_on_exit() -> None:
+    if buffer._app is None:
+        return
+    try:
+        buffer.flush()
+    except Exception:
+        log.exception("vote buffer: final flush failed")
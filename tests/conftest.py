@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from src.app import create_app, db
+from src.app.models import State
+from src.app.services import context_snapshot, discover_cache, geo_resolver
+
+# DB tests need real Postgres (ARRAY/JSONB/enums); point this at a throwaway database
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+@pytest.fixture
+def app():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not set")
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": TEST_DATABASE_URL})
+    discover_cache.invalidate_all()
+    geo_resolver.resolver.invalidate()
+    context_snapshot.invalidate()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add_all([State("California"), State("Georgia")])
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    """A settable stand-in for time.monotonic: advance it with clock.now = ..."""
+    return FakeClock()
+
+@pytest.fixture
+def seeded(app):
+    """Two cities in two states: jurisdictions, bodies, tagged sources and posts."""
+    from datetime import datetime, timedelta
+    from src.app.models import Body, CitizenPost, Jurisdiction, Source
+    from src.app.models.enums import Branch, BodyType, Category, JurisdictionLevel, SourceType
+
+    now = datetime(2025, 10, 1, 12, 0)
+    la = Jurisdiction(name="City of Los Angeles", level=JurisdictionLevel.city, state_name="California")
+    lac = Jurisdiction(name="Los Angeles County", level=JurisdictionLevel.county, state_name="California")
+    atl = Jurisdiction(name="City of Atlanta", level=JurisdictionLevel.city, state_name="Georgia")
+    db.session.add_all([la, lac, atl])
+    db.session.flush()
+    bodies = {
+        j.name: Body(jurisdiction_id=j.id, name=f"{j.name} Council", branch=Branch.legislative, body_type=BodyType.council)
+        for j in (la, lac, atl)
+    }
+    db.session.add_all(bodies.values())
+    db.session.flush()
+
+    def source(j, title, tags, days):
+        db.session.add(Source(body_id=bodies[j.name].id, source_type=SourceType.council_file, external_id=title,
+                              title=title, tags=tags, meeting_datetime=now - timedelta(days=days), created_at=now))
+
+    for i in range(4):
+        source(la, f"LA crime motion {i}", ["crime"], i)
+        source(la, f"LA housing motion {i}", ["housing", "zoning"], i)
+    source(lac, "County transit plan", ["transport"], 1)
+    source(atl, "Atlanta crime motion", ["crime"], 0)
+
+    def post(city, county, state, cat, score, hours):
+        db.session.add(CitizenPost(title=f"{city} {cat.value} {score}", body="...", category=cat, city=city,
+                                   county=county, state_name=state, score=score, created_at=now - timedelta(hours=hours)))
+
+    for i in range(4):
+        post("Los Angeles", "Los Angeles County", "California", Category.crime, i, i)
+        post("Los Angeles", "Los Angeles County", "California", Category.housing, 10 - i, i)
+    post("Pasadena", "Los Angeles County", "California", Category.transport, 3, 0)
+    post("Atlanta", "Fulton County", "Georgia", Category.crime, 50, 0)
+    db.session.commit()
+    geo_resolver.resolver.refresh()  # steady state: jurisdictions already indexed
+    return {"now": now}
@@ -0,0 +1,76 @@
+import json
+from datetime import date
+from pathlib import Path
+
+import httpx
+import respx
+
+from src.app import db
+from src.app.models import GeoContext, State
+from src.app.services import acs_ingest
+
+FIXTURES = Path(__file__).parent / "fixtures" / "census"
+ACS5 = "https://api.census.gov/data/2022/acs/acs5"
+
+def _recorded(fips):
+    return json.loads((FIXTURES / f"acs5_2022_place_{fips}.json").read_text())
+
+def test_place_names_and_sentinels():
+    assert acs_ingest.place_city("Los Angeles city, California") == "Los Angeles"
+    assert acs_ingest.place_city("East Los Angeles CDP, California") == "East Los Angeles"
+    assert acs_ingest.place_city("Athens-Clarke County unified government (balance), Georgia") == "Athens-Clarke County"
+    vernon = dict(zip(*_recorded("06")[::4]))
+    row = acs_ingest.to_geo_context(vernon, "California", date(2022, 12, 31))
+    assert (row["median_income_usd"], row["median_rent_usd"], row["percent_poverty"]) == (None, None, 7.06)
+
+def _seed_fips():
+    for name, fips in (("California", "06"), ("Georgia", "13")):
+        db.session.get(State, name).fips_code = fips
+    db.session.commit()
+
+@respx.mock
+def test_ingest_pulls_each_state_once_and_upserts(app):
+    _seed_fips()
+    ca = respx.get(ACS5, params__contains={"for": "place:*", "in": "state:06"}).respond(json=_recorded("06"))
+    ga = respx.get(ACS5, params__contains={"for": "place:*", "in": "state:13"}).respond(json=_recorded("13"))
+    db.session.add(GeoContext(city="Atlanta", state_name="Georgia", as_of=date(2022, 12, 31), crime_index_12mo=1.2))
+    db.session.commit()
+
+    out = acs_ingest.ingest_acs(2022, "k", concurrency=2)
+    assert out == {"states": 2, "rows": 6, "failed": {}}
+    assert ca.call_count == ga.call_count == 1
+
+    la = GeoContext.query.filter_by(city="Los Angeles").one()
+    assert (la.population, la.median_rent_usd, float(la.percent_poverty)) == (3881041, 1748, 16.57)
+    atl = GeoContext.query.filter_by(city="Atlanta").one()   # upserted in place, crime index kept
+    assert atl.population == 494838 and float(atl.crime_index_12mo) == 1.2
+
+    acs_ingest.ingest_acs(2022, "k")                          # re-run is idempotent
+    assert GeoContext.query.count() == 6
+
+@respx.mock
+def test_failed_state_does_not_stop_the_others(app):
+    _seed_fips()
+    respx.get(ACS5, params__contains={"in": "state:06"}).respond(json=_recorded("06"))
+    respx.get(ACS5, params__contains={"in": "state:13"}).mock(side_effect=httpx.ConnectTimeout("slow"))
+    out = acs_ingest.ingest_acs(2022, "k")
+    assert out["states"] == 1 and list(out["failed"]) == ["Georgia"]
+    assert GeoContext.query.count() == 4
+
+def test_colliding_places_keep_the_most_populous():
+    as_of = date(2022, 12, 31)
+    rows = [acs_ingest.to_geo_context({"NAME": name, acs_ingest.POPULATION: pop}, "Georgia", as_of)
+            for name, pop in (("Fairview city, Georgia", "900"), ("Fairview CDP, Georgia", "4200"),
+                              ("Fairview town, Georgia", "35"))]
+    kept = acs_ingest._dedupe(rows)
+    assert [(r["city"], r["population"]) for r in kept] == [("Fairview", 4200)]
+
+@respx.mock
+def test_new_year_carries_the_crime_index_forward(app):
+    _seed_fips()
+    respx.get(ACS5, params__contains={"in": "state:13"}).respond(json=_recorded("13"))
+    db.session.add(GeoContext(city="Atlanta", state_name="Georgia", as_of=date(2021, 12, 31), crime_index_12mo=1.2))
+    db.session.commit()
+    acs_ingest.ingest_acs(2022, "k", states=["Georgia"])
+    atl = GeoContext.query.filter_by(city="Atlanta", as_of=date(2022, 12, 31)).one()
+    assert atl.population == 494838 and float(atl.crime_index_12mo) == 1.2
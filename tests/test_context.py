@@ -0,0 +1,63 @@
+from datetime import date, datetime, timezone
+
+from sqlalchemy import func, update
+
+from src.app import db
+from src.app.models import GeoContext
+from src.app.services import context_snapshot
+
+def _add(city, state, as_of, rent, **kw):
+    db.session.add(GeoContext(city=city, state_name=state, as_of=as_of, median_rent_usd=rent, **kw))
+    db.session.commit()
+
+def test_context_serves_latest_row_from_snapshot(client):
+    _add("Los Angeles", "California", date(2025, 1, 1), 2100)
+    _add("Los Angeles", "California", date(2025, 9, 1), 2300)
+    _add("Los Angeles", "California", None, 9999)           # undated rows lose (NULLS LAST)
+    _add("Atlanta", "Georgia", date(2025, 6, 1), 1600)
+
+    assert client.get("/api/v1/context/?city=los angeles&state_name=California").get_json()["median_rent_usd"] == 2300
+    assert client.get("/api/v1/context/?state_name=Georgia").get_json()["city"] == "Atlanta"
+    assert client.get("/api/v1/context/?city=Los Angeles").get_json()["as_of"] == "2025-09-01"
+    assert client.get("/api/v1/context/").get_json()["as_of"] == "2025-09-01"
+    assert client.get("/api/v1/context/?city=Atlanta&state_name=California").status_code == 404
+    assert context_snapshot.snapshot.stats()["loads"] == 1
+
+def test_context_revalidates_and_follows_ingestion(client):
+    _add("Atlanta", "Georgia", date(2025, 6, 1), 1600, updated_at=datetime(2025, 6, 2, tzinfo=timezone.utc))
+    first = client.get("/api/v1/context/?city=Atlanta")
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"] == "Mon, 02 Jun 2025 00:00:00 GMT"
+
+    again = client.get("/api/v1/context/?city=Atlanta", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.data == b""
+
+    _add("Atlanta", "Georgia", date(2025, 7, 1), 1650)      # committed write reloads the snapshot
+    fresh = client.get("/api/v1/context/?city=Atlanta", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.get_json()["median_rent_usd"] == 1650
+
+def test_context_revalidates_in_place_updates(client):
+    _add("Atlanta", "Georgia", date(2025, 6, 1), 1600, updated_at=datetime(2025, 6, 2, tzinfo=timezone.utc))
+    first = client.get("/api/v1/context/?city=Atlanta")
+
+    # ingestion rewrites the row without moving as_of (see crime_index / acs_ingest)
+    db.session.execute(update(GeoContext).values(crime_index_12mo=1.2, updated_at=func.now()))
+    db.session.commit()
+    context_snapshot.invalidate()
+
+    for validator in ({"If-None-Match": first.headers["ETag"]}, {"If-Modified-Since": first.headers["Last-Modified"]}):
+        resp = client.get("/api/v1/context/?city=Atlanta", headers=validator)
+        assert resp.status_code == 200 and resp.get_json()["crime_index_12mo"] == 1.2
+
+def test_concurrent_lookups_share_one_reload(app):
+    from concurrent.futures import ThreadPoolExecutor
+    _add("Atlanta", "Georgia", date(2025, 6, 1), 1600)
+    snap = context_snapshot.ContextSnapshot()
+
+    def look(_):
+        with app.app_context():
+            return snap.lookup("Atlanta", None).payload["median_rent_usd"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert set(pool.map(look, range(32))) == {1600}
+    assert snap.stats()["loads"] == 1
@@ -0,0 +1,62 @@
+from datetime import date
+from urllib.parse import urlsplit
+
+import httpx
+import numpy as np
+import respx
+
+from src.app import db
+from src.app.external import fbi_client, fbi_stub
+from src.app.models import GeoContext, LawEnforcementAgency, State
+from src.app.services import crime_index
+
+def test_compute_index_against_state_baseline():
+    nan = np.nan
+    counts = np.array([[10, 10], [5, 5], [5, nan], [nan, nan], [30, 10]])   # agency x offense
+    city_of = np.array([0, 0, 1, 2, 3])                                     # two agencies in city 0
+    population = np.array([1000.0, 500.0, 700.0, 2000.0])
+    idx = crime_index.compute_index(counts, city_of, population)
+    # baseline over complete cities only: (30 + 40) / (1000 + 2000)
+    assert np.isclose(idx[0], (30 / 1000) / (70 / 3000)) and np.isclose(idx[3], (40 / 2000) / (70 / 3000))
+    assert np.isnan(idx[1])  # one failed offense request: no index rather than an undercount
+    assert np.isnan(idx[2])  # every request for city 2 failed
+
+def test_agency_city_names():
+    assert crime_index.agency_city("Los Angeles Police Department") == "Los Angeles"
+    assert crime_index.agency_city("Atlanta City Police Department") == "Atlanta"
+
+def _mount_stub():
+    base = urlsplit(fbi_client.BASE)
+
+    def handle(request):
+        status, body = fbi_stub.respond(request.url.path[len(base.path):])
+        return httpx.Response(status, json=body)
+    respx.route(host=base.hostname).mock(side_effect=handle)
+
+@respx.mock
+def test_pipeline_against_local_stub(app):
+    _mount_stub()
+    db.session.get(State, "California").ocd_id = "ocd-jurisdiction/country:us/state:ca/government"
+    db.session.get(State, "Georgia").ocd_id = "ocd-jurisdiction/country:us/state:ga/government"
+    db.session.add_all([
+        GeoContext(city="Los Angeles", state_name="California", population=3_800_000, as_of=date(2022, 12, 31)),
+        GeoContext(city="Los Angeles", state_name="California", population=3_700_000, as_of=date(2021, 12, 31)),
+        GeoContext(city="Pasadena", state_name="California", population=137_000, as_of=date(2022, 12, 31)),
+        GeoContext(city="Atlanta", state_name="Georgia", population=495_000, as_of=date(2022, 12, 31)),
+    ])
+    db.session.commit()
+
+    assert crime_index.sync_agencies("k")["agencies"] == 4
+    assert db.session.get(LawEnforcementAgency, "CA0190000").city is None    # county agencies are not cities
+
+    out = crime_index.ingest_crime("k", 2023, 2023, offenses=["robbery", "burglary"], concurrency=4, rate=0)
+    assert out == {"states": 2, "cities": 3, "requests": 6, "failed_requests": 0}
+
+    def count(ori):
+        return sum(fbi_stub.offense_count(ori, o, 2023) for o in ("robbery", "burglary"))
+    la, pas = count("CA0194200"), count("CA0195300")
+    baseline = (la + pas) / (3_800_000 + 137_000)
+    latest = GeoContext.query.filter_by(city="Los Angeles", as_of=date(2022, 12, 31)).one()
+    assert float(latest.crime_index_12mo) == round((la / 3_800_000) / baseline, 3)
+    assert GeoContext.query.filter_by(city="Los Angeles", as_of=date(2021, 12, 31)).one().crime_index_12mo is None
+    assert float(GeoContext.query.filter_by(city="Atlanta").one().crime_index_12mo) == 1.0  # alone in its state
@@ -0,0 +1,102 @@
+from sqlalchemy import event
+
+from src.app import db
+from src.app.services.discover_service import discover
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(db.engine, "before_cursor_execute", self._inc)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(db.engine, "before_cursor_execute", self._inc)
+
+    def _inc(self, *args):
+        self.count += 1
+
+def test_sections_use_one_query_per_list(seeded):
+    cats = ["crime", "housing", "zoning", "transport", "health"]
+    with QueryCounter() as q:
+        out = discover("Los Angeles", None, None, None, cats, per_category=3)
+    assert q.count == 2
+
+    by_cat = {s["category"]: s for s in out["sections"]}
+    assert [s["category"] for s in out["sections"]] == cats
+    assert [a["title"] for a in by_cat["crime"]["government_actions"]] == [
+        "LA crime motion 0", "LA crime motion 1", "LA crime motion 2"]
+    assert [i["score"] for i in by_cat["housing"]["citizen_issues"]] == [10, 9, 8]
+    assert [a["title"] for a in by_cat["zoning"]["government_actions"]][0] == "LA housing motion 0"
+    assert by_cat["health"] == {"category": "health", "government_actions": [], "citizen_issues": []}
+    assert all("Atlanta" not in i["title"] for s in out["sections"] for i in s["citizen_issues"])
+
+def test_trending_sections_and_cache_keys(seeded):
+    top = discover("Los Angeles", None, None, None, ["crime"], per_category=4)
+    trending = discover("Los Angeles", None, None, None, ["crime"], per_category=4, sort="trending")
+    assert [i["score"] for i in top["sections"][0]["citizen_issues"]] == [3, 2, 1, 0]
+    # a fresh 0-score post outranks a 1-score post from an hour earlier
+    assert [i["score"] for i in trending["sections"][0]["citizen_issues"]] == [3, 2, 0, 1]
+
+def test_query_count_does_not_grow_with_categories(seeded):
+    with QueryCounter() as one:
+        discover("Los Angeles", None, "California", None, ["crime"], per_category=5)
+    with QueryCounter() as many:
+        discover("Los Angeles", None, "California", None, ["crime", "housing", "zoning", "transport",
+                                                             "budget", "health", "road_safety", "food_access"], 5)
+    assert one.count == many.count == 2
+
+def _legacy_top_counts(city, county, state_name):
+    # the pre-rollup computation: count tags/categories over the geo-filtered rows in Python
+    from src.app.services.discover_service import (CANDIDATE_LABELS, _geo_posts_query,
+                                                   _geo_source_query)
+    counts = {c: 0 for c in CANDIDATE_LABELS}
+    for s in _geo_source_query(city, county, state_name).all():
+        for t in set(s.tags or []):
+            if t in counts: counts[t] += 1
+    for p in _geo_posts_query(city, county, state_name).all():
+        counts[p.category.value] += 1
+    return {c: n for c, n in counts.items() if n}
+
+def _rollup_top_counts(city, county, state_name):
+    from src.app.services.discover_service import _top_categories_for_geo
+    return {t["label"]: t["count"] for t in _top_categories_for_geo(city, county, state_name, limit=10) if t["count"]}
+
+GEOS = [("Los Angeles", None, None), (None, "Los Angeles", None), (None, None, "California"),
+        ("Los Angeles", "Los Angeles", "California"), ("Atlanta", None, "Georgia"), ("Nowhere", None, None)]
+
+def test_rollups_match_legacy_counts(seeded):
+    for geo in GEOS:
+        assert _rollup_top_counts(*geo) == _legacy_top_counts(*geo), geo
+
+def test_rollups_follow_writes(seeded):
+    from src.app.models import CitizenPost, Source
+    from src.app.models.enums import Category
+
+    s = Source.query.filter_by(title="LA crime motion 0").one()
+    s.tags = ["crime", "budget"]
+    db.session.delete(Source.query.filter_by(title="LA crime motion 1").one())
+    p = CitizenPost.query.filter_by(title="Los Angeles crime 0").one()
+    p.category = Category.health
+    p.score = 99  # not a counted column
+    db.session.delete(CitizenPost.query.filter_by(title="Pasadena transport 3").one())
+    db.session.commit()
+
+    for geo in GEOS:
+        assert _rollup_top_counts(*geo) == _legacy_top_counts(*geo), geo
+    assert _rollup_top_counts("Los Angeles", None, None)["crime"] == 3 + 3
+
+def test_rebuild_rollups_is_idempotent(seeded):
+    from src.app.services.discover_service import rebuild_category_rollups
+    before = {geo: _rollup_top_counts(*geo) for geo in GEOS}
+    db.session.execute(db.text("UPDATE jurisdiction_category_counts SET source_count = 0"))
+    db.session.commit()
+    assert rebuild_category_rollups()["jurisdiction_category_counts"] > 0
+    assert {geo: _rollup_top_counts(*geo) for geo in GEOS} == before
+
+def test_geo_only_discover_query_count(seeded):
+    with QueryCounter() as q:
+        out = discover("Los Angeles", "Los Angeles", "California", None, None, per_category=3)
+    assert q.count == 4  # 2 rollup reads + 2 section queries
+    assert [t["label"] for t in out["top_categories"]] == ["crime", "housing", "zoning"]
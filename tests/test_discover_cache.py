@@ -0,0 +1,80 @@
+from src.app import db
+from src.app.cache import TTLCache
+from src.app.services import discover_cache
+from src.app.services.discover_service import discover
+
+from .test_discover import QueryCounter
+
+def test_ttl_cache_expires_and_evicts(clock):
+    c = TTLCache(maxsize=2, ttl=10, clock=clock)
+    c.put("a", 1)
+    c.put("b", 2)
+    c.put("c", 3)  # evicts "a"
+    assert c.get("a") is None and c.get("b") == 2
+    clock.now = 11
+    assert c.get("b") is None and c.get("c") is None
+    assert c.stats()["expired"] == 2 and len(c) == 0
+
+def test_ttl_cache_pop_where():
+    c = TTLCache(maxsize=10, ttl=10)
+    for k in ("la", "lb", "x"):
+        c.put(k, k)
+    assert c.pop_where(lambda k: k.startswith("l")) == 2
+    assert c.get("x") == "x" and c.get("la") is None
+
+def test_cache_key_normalizes_geo():
+    a = discover_cache.cache_key(" Los Angeles ", "Los Angeles", "California", ["crime"], 5)
+    b = discover_cache.cache_key("los angeles", "los angeles county", "CALIFORNIA", ["crime"], 5)
+    assert a == b
+    assert a != discover_cache.cache_key("los angeles", None, "california", ["crime"], 5)
+
+def test_repeat_discover_served_from_cache(seeded):
+    first = discover("Los Angeles", None, None, None, None, per_category=3)
+    with QueryCounter() as q:
+        again = discover("los angeles", None, None, None, None, per_category=3)
+    assert q.count == 0
+    assert again["sections"] == first["sections"]
+    assert again["geo"]["city"] == "los angeles"
+
+def test_new_post_invalidates_only_its_geo(seeded):
+    from src.app.models import CitizenPost
+    from src.app.models.enums import Category
+
+    discover("Los Angeles", None, None, None, ["crime"], per_category=5)
+    discover("Atlanta", None, None, None, ["crime"], per_category=5)
+    db.session.add(CitizenPost(title="Fresh LA crime", body="...", category=Category.crime, city="Los Angeles",
+                               county="Los Angeles County", state_name="California", score=100))
+    db.session.commit()
+
+    with QueryCounter() as q:
+        la = discover("Los Angeles", None, None, None, ["crime"], per_category=5)
+        discover("Atlanta", None, None, None, ["crime"], per_category=5)
+    assert q.count == 2  # LA recomputed, Atlanta still cached
+    assert la["sections"][0]["citizen_issues"][0]["title"] == "Fresh LA crime"
+
+def test_vote_and_source_writes_invalidate(seeded):
+    from src.app.models import CitizenPost, Source
+    from src.app.models.enums import VoteType
+    from src.app.services.posts_service import vote_post
+
+    key = discover_cache.cache_key(None, None, "Georgia", ["crime"], 5)
+    discover(None, None, "Georgia", None, ["crime"], per_category=5)
+    assert discover_cache.get(key) is not None
+    post = CitizenPost.query.filter_by(city="Atlanta").one()
+    vote_post(post.id, "tok", VoteType.up)
+    assert discover_cache.get(key) is None
+
+    discover(None, None, "Georgia", None, ["crime"], per_category=5)
+    Source.query.filter_by(title="Atlanta crime motion").one().tags = ["crime", "budget"]
+    db.session.commit()
+    assert discover_cache.get(key) is None
+
+def test_rolled_back_write_keeps_entries(seeded):
+    from src.app.models import CitizenPost
+
+    key = discover_cache.cache_key("Atlanta", None, None, ["crime"], 5)
+    discover("Atlanta", None, None, None, ["crime"], per_category=5)
+    CitizenPost.query.filter_by(city="Atlanta").one().score = 0
+    db.session.flush()
+    db.session.rollback()
+    assert discover_cache.get(key) is not None
@@ -0,0 +1,23 @@
+from src.app.models import Enrichment
+from src.app.services.enrichment_service import EnrichmentPool
+
+def test_drop_newest_sheds_incoming_jobs():
+    pool = EnrichmentPool(workers=0, max_queue=2, policy="drop_newest")  # no workers: queue only fills
+    assert [pool.submit(None, None, t) for t in "abc"] == [True, True, False]
+    s = pool.stats()
+    assert (s["queue_depth"], s["dropped"], s["enqueued"]) == (2, 1, 3)
+
+def test_drop_oldest_keeps_latest_jobs():
+    pool = EnrichmentPool(workers=0, max_queue=2, policy="drop_oldest")
+    for t in "abc":
+        pool.submit(None, None, t)
+    assert [job[2] for job in list(pool._q.queue)] == ["b", "c"]
+    assert pool.stats()["dropped"] == 1
+
+def test_enrichment_is_persisted(app):
+    pool = EnrichmentPool(workers=1, max_queue=4)
+    pool.submit(app, None, "A shooting near the metro station")
+    pool.join()
+    row = Enrichment.query.one()
+    assert "crime" in row.tags and row.latency_ms >= 0
+    assert pool.stats()["processed"] == 1
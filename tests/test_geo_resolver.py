@@ -0,0 +1,53 @@
+from src.app import db
+from src.app.services.geo_resolver import GeoResolver
+
+from .test_discover import QueryCounter
+
+def _names(resolved):
+    from src.app.models import Jurisdiction
+    return sorted(j.name for j in Jurisdiction.query.filter(Jurisdiction.id.in_(resolved.jurisdiction_ids)))
+
+def test_resolve_matches_geo_parts(seeded):
+    r = GeoResolver()
+    assert _names(r.resolve("los angeles", None, None)) == ["City of Los Angeles"]
+    assert _names(r.resolve(None, "Los Angeles", None)) == ["Los Angeles County"]
+    assert _names(r.resolve("Los Angeles", None, "California")) == ["City of Los Angeles", "Los Angeles County"]
+    assert _names(r.resolve(None, None, "Georgia")) == ["City of Atlanta"]
+    assert len(r.resolve("Atlanta", None, None).body_ids) == 1
+
+def test_lookups_after_load_hit_memory(seeded):
+    r = GeoResolver()
+    r.resolve("Atlanta", None, None)
+    with QueryCounter() as q:
+        r.resolve("Atlanta", None, None)
+        r.resolve(None, "Los Angeles County", "California")
+    assert q.count == 0
+
+def test_unknown_geo_is_negatively_cached(seeded):
+    r = GeoResolver()
+    assert not r.resolve("Springfield", None, None).body_ids
+    with QueryCounter() as q:
+        for _ in range(3):
+            assert not r.resolve("springfield", None, None).jurisdiction_ids
+    assert q.count == 0
+    assert r.stats()["negative_hits"] == 3
+
+def test_committed_jurisdiction_write_refreshes(seeded):
+    from src.app.models import Jurisdiction
+    from src.app.models.enums import JurisdictionLevel
+    from src.app.services.geo_resolver import resolver
+
+    assert not resolver.resolve("Springfield", None, None).jurisdiction_ids
+    db.session.add(Jurisdiction(name="City of Springfield", level=JurisdictionLevel.city, state_name="Georgia"))
+    db.session.commit()
+    assert _names(resolver.resolve("Springfield", None, None)) == ["City of Springfield"]
+
+def test_ttl_reload(seeded, clock):
+    r = GeoResolver(ttl=60, clock=clock)
+    r.resolve("Atlanta", None, None)
+    clock.now = 30
+    r.resolve("Atlanta", None, None)
+    assert r.stats()["loads"] == 1
+    clock.now = 61
+    r.resolve("Atlanta", None, None)
+    assert r.stats()["loads"] == 2
@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import String, cast, func, text
+from sqlalchemy.dialects.postgresql import ARRAY, array
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from src.app import db
+from src.app.models.trgm import trgm_available
+
+# The seeded tables are tiny, so with seqscans allowed the planner would
+# (rightly) scan them; disabling seqscans shows whether an index *can* serve
+# each hot query, which is what these tests pin down.
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, stmt):
+        self.stmt = stmt
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN " + compiler.process(element.stmt, **kw)
+
+def _plan(query) -> str:
+    db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    rows = db.session.execute(Explain(getattr(query, "statement", query))).scalars().all()
+    return "\n".join(rows)
+
+def test_posts_geo_filter_uses_key_indexes(seeded):
+    from src.app.services.discover_service import _geo_posts_query
+    plan = _plan(_geo_posts_query("Los Angeles", "Los Angeles", "California"))
+    for ix in ("ix_citizen_posts_city_key", "ix_citizen_posts_county_key", "ix_citizen_posts_state_key"):
+        assert ix in plan, plan
+
+def test_posts_feed_order_uses_city_index(seeded):
+    from src.app.models import CitizenPost
+    from src.app.services.posts_service import list_posts
+    q = (CitizenPost.query.filter(func.lower(CitizenPost.city) == "los angeles")
+         .order_by(CitizenPost.score.desc(), CitizenPost.created_at.desc(), CitizenPost.id.desc()).limit(20))
+    plan = _plan(q)
+    assert "ix_citizen_posts_city_key" in plan and "Sort" not in plan, plan
+    assert len(list_posts("LOS ANGELES", None, None)[0]) == 8
+
+def test_tag_containment_uses_gin(seeded):
+    from src.app.models import Source
+    plan = _plan(db.session.query(Source).filter(Source.tags.contains(cast(array(["crime"]), ARRAY(String)))))
+    assert "ix_sources_tags" in plan, plan
+
+def test_sources_per_body_order_uses_composite(seeded):
+    from src.app.models import Body, Source
+    body = Body.query.filter_by(name="City of Los Angeles Council").one()
+    q = (db.session.query(Source).filter(Source.body_id == body.id, Source.meeting_datetime.isnot(None))
+         .order_by(Source.meeting_datetime.desc(), Source.created_at.desc(), Source.id.desc()).limit(5))
+    plan = _plan(q)
+    assert "ix_sources_body_recent" in plan and "Sort" not in plan, plan
+
+def test_context_lookup_uses_geo_key(seeded):
+    from src.app.models import GeoContext
+    q = (GeoContext.query.filter(func.lower(GeoContext.city) == "los angeles", GeoContext.state_name == "California")
+         .order_by(GeoContext.as_of.desc().nullslast()).limit(1))
+    plan = _plan(q)
+    assert "ix_geo_context_geo_key" in plan and "Sort" not in plan, plan
+
+def test_body_name_substring_uses_trigram(seeded):
+    if not trgm_available(db.session.connection()):
+        pytest.skip("pg_trgm not available on this server")
+    from src.app.models import Body
+    plan = _plan(Body.query.filter(Body.name.ilike("%Los Angeles%")))
+    assert "ix_bodies_name_trgm" in plan, plan
+
+def test_trending_order_uses_geo_trending_index(seeded):
+    from src.app.models import CitizenPost
+    from src.app.models.enums import Category
+    q = (CitizenPost.query.filter(func.lower(CitizenPost.city) == "los angeles", CitizenPost.state_name == "California",
+                                  CitizenPost.category == Category.crime)
+         .order_by(CitizenPost.hot_rank.desc(), CitizenPost.id.desc()).limit(20))
+    plan = _plan(q)
+    assert "ix_citizen_posts_geo_trending" in plan and "Sort" not in plan, plan
@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from src.app.services.inference_batcher import InferenceOverloaded, MicroBatcher
+
+def test_concurrent_submits_share_a_batch():
+    seen = []
+    b = MicroBatcher(lambda items: seen.append(list(items)) or [i * 2 for i in items], max_batch=8, max_wait_ms=50)
+    futures = b.submit_many(range(5))
+    assert [f.result(2) for f in futures] == [0, 2, 4, 6, 8]
+    assert seen == [[0, 1, 2, 3, 4]]
+
+def test_full_queue_sheds_load_and_errors_propagate():
+    gate, started = threading.Event(), threading.Event()
+    def slow(items):
+        started.set()
+        gate.wait(2)
+        raise RuntimeError("model blew up")
+    b = MicroBatcher(slow, max_batch=1, max_wait_ms=0, max_queue=1, submit_timeout=0.01)
+    first = b.submit("a")       # taken by the worker, which blocks on the gate
+    assert started.wait(2)
+    b.submit("b")               # fills the queue
+    with pytest.raises(InferenceOverloaded):
+        b.submit("c")
+    gate.set()
+    with pytest.raises(RuntimeError):
+        first.result(2)
+    assert b.stats()["rejected"] == 1
+
+def test_short_result_fails_every_caller():
+    b = MicroBatcher(lambda items: [i for i in items][:-1], max_batch=8, max_wait_ms=50)
+    futures = b.submit_many(range(3))
+    for f in futures:
+        with pytest.raises(RuntimeError, match="2 results for 3 items"):
+            f.result(2)
+
+def test_overloaded_submit_many_cancels_what_it_queued():
+    gate, started, seen = threading.Event(), threading.Event(), []
+    def slow(items):
+        started.set()
+        gate.wait(2)
+        seen.append(list(items))
+        return items
+    b = MicroBatcher(slow, max_batch=1, max_wait_ms=0, max_queue=1, submit_timeout=0.01)
+    b.submit("a")
+    assert started.wait(2)
+    with pytest.raises(InferenceOverloaded):
+        b.submit_many(["b", "c"])   # "b" fits in the queue, "c" does not
+    gate.set()
+    assert b.submit("d").result(2) == "d"
+    assert seen == [["a"], ["d"]]   # "b" was cancelled, never run
@@ -1,4 +1,5 @@
-from src.app.services.ner_service import analyze
+from src.app.services import ner_cache, ner_service
+from src.app.services.ner_service import analyze, analyze_many
 
 def test_food_access():
     out = analyze("Our neighborhood is a food desert with no grocery store.")
@@ -8,3 +9,56 @@ def test_food_access():
 def test_crime():
     out = analyze("Two shootings and a car break-in last week near Market St.")
     assert out["category"] == "crime" or out["confidence"] >= 0.7
+
+def test_analyze_many_matches_analyze():
+    texts = [
+        "Our neighborhood is a food desert with no grocery store.",
+        "Two shootings and a car break-in last week near Market St.",
+        "",
+        "The bus to the metro station is always late.",
+    ]
+    assert analyze_many(texts, batch_size=2) == [analyze(t) for t in texts]
+
+def test_repeat_analyze_hits_cache():
+    ner_cache.clear()
+    first = analyze("Pothole on Sunset Blvd caused a collision.")
+    hits = ner_cache.stats()["lru"]["hits"]
+    assert analyze("  Pothole on Sunset Blvd   caused a collision. ") == first
+    assert ner_cache.stats()["lru"]["hits"] == hits + 1
+
+def test_cascade_skips_zero_shot_when_rules_are_decisive(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ner_service, "USE_ZERO_SHOT", True)
+    monkeypatch.setattr(ner_service, "CASCADE", True)
+    monkeypatch.setattr(ner_service, "_zero_shot_direct", lambda ts, *a: calls.extend(ts) or [{"health": 0.9} for _ in ts])
+    ner_service.model_version.cache_clear()
+    try:
+        decisive = analyze("There was a shooting on Main St.")
+        vague = analyze("Something should be done about the park.")
+    finally:
+        ner_service.model_version.cache_clear()
+    assert decisive["tier"] == "rules"
+    assert vague["tier"] == "zero_shot"
+    assert calls == ["Something should be done about the park."]
+
+def test_analyze_without_entities_skips_spacy(monkeypatch):
+    monkeypatch.setattr(ner_service, "_nlp", lambda: 1 / 0)
+    out = analyze("Eviction notices on Oak Ave", entities=False)
+    assert out["entities"] == {}
+    assert "housing" in out["tags"]
+
+def test_shared_cache_purges_only_old_other_versions(app, monkeypatch):
+    from datetime import datetime, timedelta
+    from src.app import db
+    from src.app.models import ClassificationCache
+    monkeypatch.setattr(ner_cache, "USE_DB_TIER", True)
+    old = datetime.now() - timedelta(days=40)
+    db.session.add_all([ClassificationCache(key="a", version="v1", result={}, created_at=old),
+                        ClassificationCache(key="b", version="v2", result={}, created_at=old),
+                        ClassificationCache(key="c", version="v2", result={})])
+    db.session.commit()
+
+    ner_cache.get_many(["x"], "v1")  # another version reading the shared tier deletes nothing
+    assert ClassificationCache.query.count() == 3
+    assert ner_cache.purge_stale(["v1"], older_than_days=30) == 1
+    assert sorted(k for (k,) in db.session.query(ClassificationCache.key)) == ["a", "c"]
@@ -0,0 +1,116 @@
+import pytest
+import requests
+
+from src.app.external import openstates_client as osc
+
+class FakeResponse:
+    def __init__(self, status, body=None, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self.text = str(body)
+        self._body = body
+
+    def json(self):
+        return self._body
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def request(self, method, url, **kw):
+        self.calls += 1
+        r = self.responses.pop(0)
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+class FakeUpstream:
+    """Installs canned responses as the pooled session; sleeps advance the test clock."""
+    def __init__(self, monkeypatch, clock):
+        self._monkeypatch = monkeypatch
+        self._clock = clock
+        self.slept = []
+
+    def sleep(self, s):
+        self.slept.append(s)
+        self._clock.now += s
+
+    def install(self, *responses):
+        session = FakeSession(responses)
+        self._monkeypatch.setattr(osc, "_SESSION", session)
+        return session
+
+@pytest.fixture
+def fake(monkeypatch, clock):
+    upstream = FakeUpstream(monkeypatch, clock)
+    monkeypatch.setenv("OPENSTATES_API_KEY", "k")
+    monkeypatch.setattr(osc, "current_app", None)
+    monkeypatch.setattr(osc, "_sleep", upstream.sleep)
+    monkeypatch.setattr(osc, "_clock", clock)
+    monkeypatch.setattr(osc, "_metrics", osc._Metrics())
+    return upstream
+
+def test_retries_honor_retry_after(fake):
+    session = fake.install(FakeResponse(429, headers={"Retry-After": "2"}), requests.ConnectionError("reset"),
+                   FakeResponse(200, {"results": []}))
+    assert osc._request("GET", "/bills", params={}) == {"results": []}
+    assert session.calls == 3 and fake.slept[0] == 2.0 and 0 <= fake.slept[1] <= osc.BACKOFF_BASE * 2
+    stats = osc.stats()
+    assert (stats["calls"], stats["attempts"], stats["retries"], stats["failures"]) == (1, 3, 2, 0)
+    assert stats["statuses"] == {"429": 1, "network_error": 1, "200": 1}
+
+def test_retry_after_past_deadline_fails_fast(fake, monkeypatch):
+    monkeypatch.setattr(osc, "DEADLINE", 5.0)
+    session = fake.install(FakeResponse(429, headers={"Retry-After": "30"}))
+    with pytest.raises(osc.RateLimitError):
+        osc._request("GET", "/bills", params={})
+    assert session.calls == 1 and fake.slept == []
+    assert osc.stats()["deadline_exceeded"] == 1 and osc.stats()["failures"] == 1
+
+def test_get_bills_shares_one_deadline_across_calls(fake, monkeypatch):
+    from src.app.cache import SWRCache
+    monkeypatch.setattr(osc, "DEADLINE", 5.0)
+    monkeypatch.setattr(osc, "_BILLS", SWRCache(8))
+    monkeypatch.setattr(osc, "_LATEST_SESSIONS", SWRCache(8))
+    session = fake.install(FakeResponse(503, headers={"Retry-After": "3"}),               # session lookup, retried
+                   FakeResponse(200, {"results": [{"session": "20252026"}]}),
+                   FakeResponse(503, headers={"Retry-After": "3"}))               # bills: 3s + 3s > 5s budget
+    with pytest.raises(osc.OpenStatesError):
+        osc.get_bills("California")
+    assert session.calls == 3 and fake.slept == [3.0]
+    assert osc.stats()["deadline_exceeded"] == 1
+
+def test_client_errors_are_not_retried(fake):
+    session = fake.install(FakeResponse(401))
+    with pytest.raises(osc.InvalidAPIKeyError):
+        osc._request("GET", "/bills", params={})
+    assert session.calls == 1
+
+def test_get_bills_serves_stale_while_refreshing(fake, monkeypatch, clock):
+    import threading
+    from src.app import cache
+    refreshers = []
+
+    class RecordingThread(threading.Thread):
+        def start(self):
+            refreshers.append(self)
+            super().start()
+
+    monkeypatch.setattr(cache, "Thread", RecordingThread)
+    monkeypatch.setattr(osc, "_BILLS", cache.SWRCache(8, ttl=60, stale_ttl=600, clock=clock))
+    monkeypatch.setattr(osc, "_LATEST_SESSIONS", cache.SWRCache(8, ttl=3600, stale_ttl=3600, clock=clock))
+    latest = FakeResponse(200, {"results": [{"session": "20252026"}]})
+    session = fake.install(latest, FakeResponse(200, {"results": [{"identifier": "AB 1", "session": "20252026"}]}),
+                   FakeResponse(200, {"results": [{"identifier": "AB 2", "session": "20252026"}]}))
+
+    assert [b["id"] for b in osc.get_bills("California", " ")] == ["AB 1"]
+    assert [b["id"] for b in osc.get_bills("california", None)] == ["AB 1"]  # same key, no upstream call
+    assert session.calls == 2 and refreshers == []
+
+    clock.now = 120  # stale: answered from cache, refreshed in the background (session still fresh)
+    assert [b["id"] for b in osc.get_bills("California")] == ["AB 1"]
+    assert len(refreshers) == 1
+    refreshers[0].join(2)
+    assert osc._BILLS.stats()["refreshes"] == 1
+    assert [b["id"] for b in osc.get_bills("California")] == ["AB 2"] and session.calls == 3
@@ -0,0 +1,109 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import tuple_
+
+from src.app import db
+from src.app.services.pagination import InvalidCursor, decode_cursor, encode_cursor
+from src.app.services.posts_service import list_posts
+from src.app.services.topics_service import list_sources_for_city
+
+from .test_indexes import _plan
+
+def test_cursor_round_trip():
+    values = [7, datetime(2025, 10, 1, 12, 30), uuid.uuid4(), None]
+    token = encode_cursor(values, "posts")
+    assert decode_cursor(token, "posts", 4) == values
+    assert decode_cursor(None, "posts", 4) is None
+
+@pytest.mark.parametrize("token", ["garbage", encode_cursor([1, 2], "posts"), encode_cursor([1, 2, 3], "sources")])
+def test_cursor_rejects_foreign_or_broken_tokens(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, "posts", 3)
+
+def _all_pages(fetch, limit):
+    seen, cursor = [], None
+    while True:
+        rows, cursor = fetch(limit, cursor)
+        seen += rows
+        if not cursor:
+            return seen
+
+def test_post_pages_are_complete_with_ties(seeded):
+    from src.app.models import CitizenPost
+    from src.app.models.enums import Category
+    # identical (score, created_at): only id breaks the tie
+    db.session.add_all([CitizenPost(title=f"tie {i}", body="...", category=Category.budget, city="Los Angeles",
+                                    state_name="California", score=5, created_at=seeded["now"]) for i in range(5)])
+    db.session.commit()
+
+    everything = list_posts("Los Angeles", None, None, limit=100)[0]
+    for limit in (1, 2, 3, 7):
+        paged = _all_pages(lambda n, c: list_posts("Los Angeles", None, None, limit=n, cursor=c), limit)
+        assert [p.id for p in paged] == [p.id for p in everything]
+    assert len(everything) == 13
+
+def test_source_pages_put_undated_last(seeded):
+    from src.app.models import Body, Source
+    from src.app.models.enums import SourceType
+    body = Body.query.filter_by(name="City of Los Angeles Council").one()
+    db.session.add_all([Source(body_id=body.id, source_type=SourceType.council_file, external_id=f"undated {i}",
+                               title=f"undated {i}", created_at=seeded["now"] - timedelta(hours=i)) for i in range(3)])
+    db.session.commit()
+
+    paged = _all_pages(lambda n, c: list_sources_for_city("Los Angeles", limit=n, cursor=c), 3)
+    titles = [s.title for s in paged]
+    assert len(titles) == len(set(titles)) == 12  # includes the county body's source
+    assert titles[-3:] == ["undated 0", "undated 1", "undated 2"]
+    dated = [s.meeting_datetime for s in paged[:-3]]
+    assert dated == sorted(dated, reverse=True)
+
+def test_routes_expose_next_cursor(client, seeded):
+    first = client.get("/api/v1/posts/?city=Los Angeles&limit=5")
+    assert len(first.get_json()) == 5
+    rest = client.get(f"/api/v1/posts/?city=Los Angeles&limit=5&cursor={first.headers['X-Next-Cursor']}")
+    assert len(rest.get_json()) == 3 and "X-Next-Cursor" not in rest.headers
+    assert client.get("/api/v1/topics/?city=Los Angeles&cursor=nope").status_code == 400
+    assert client.get("/api/v1/topics/?city=Los Angeles&limit=abc").status_code == 400
+    assert client.get("/api/v1/posts/?city=Los Angeles&limit=abc").status_code == 400
+
+def test_deep_pages_seek_through_the_index(seeded):
+    # a page after a cursor is an index range scan, not a scan-and-discard
+    from src.app.models import CitizenPost, Source
+    db.session.execute(db.text("SET LOCAL enable_bitmapscan = off"))  # tiny table: bitmap+sort looks cheaper
+    after = (3, seeded["now"], uuid.uuid4())
+    plan = _plan(CitizenPost.query
+                 .filter(tuple_(CitizenPost.score, CitizenPost.created_at, CitizenPost.id) < tuple_(*after))
+                 .order_by(CitizenPost.score.desc(), CitizenPost.created_at.desc(), CitizenPost.id.desc()).limit(20))
+    assert "Index Scan Backward using ix_citizen_posts_feed" in plan and "Index Cond" in plan and "Sort" not in plan, plan
+
+    plan = _plan(Source.query.filter(Source.meeting_datetime.isnot(None),
+                                     tuple_(Source.meeting_datetime, Source.created_at, Source.id) < tuple_(seeded["now"], seeded["now"], uuid.uuid4()))
+                 .order_by(Source.meeting_datetime.desc(), Source.created_at.desc(), Source.id.desc()).limit(20))
+    assert "Index Scan Backward using ix_sources_recent" in plan and "Sort" not in plan, plan
+
+def test_trending_decays_old_posts_and_pages_cleanly(seeded):
+    from src.app.models import CitizenPost
+    from src.app.models.enums import Category, VoteType
+    from src.app.services.posts_service import vote_post
+    old = CitizenPost(title="last month", body="...", category=Category.crime, city="Los Angeles",
+                      state_name="California", score=100, created_at=seeded["now"] - timedelta(days=30))
+    db.session.add(old)
+    db.session.commit()
+
+    assert list_posts("Los Angeles", None, None, limit=1)[0][0].id == old.id
+    trending = list_posts("Los Angeles", None, None, limit=100, sort="trending")[0]
+    assert trending[0].title == "Los Angeles housing 10" and trending[-1].id == old.id
+    for limit in (1, 4):
+        paged = _all_pages(lambda n, c: list_posts("Los Angeles", None, None, limit=n, cursor=c, sort="trending"), limit)
+        assert [p.id for p in paged] == [p.id for p in trending]
+
+    # the rank follows the score without any refresh job
+    before = trending[1].hot_rank
+    vote_post(trending[1].id, "a", VoteType.up)
+    db.session.expire_all()
+    assert db.session.get(CitizenPost, trending[1].id).hot_rank > before
+
+    with pytest.raises(InvalidCursor):  # top and trending cursors are not interchangeable
+        list_posts(None, None, None, cursor=encode_cursor([1, 2, 3], "posts"), sort="trending")
@@ -0,0 +1,65 @@
+import io
+import json
+
+from src.app import db
+from src.app.models import CitizenPost
+from src.app.services import post_import
+
+def _fake_analyze_many(calls):
+    def analyze_many(texts, entities=True):
+        calls.append(len(texts))
+        return [{"primary_category": "housing", "categories": [{"label": "housing", "score": 0.8}],
+                 "tags": ["housing"], "entities": {}} for _ in texts]
+    return analyze_many
+
+NDJSON = "\n".join([
+    json.dumps({"title": "Rent up 20%", "body": "again", "city": "Los Angeles", "state_name": "California"}),
+    "{not json",
+    json.dumps({"title": "No state", "body": "...", "city": "Atlanta"}),
+    "",
+    json.dumps({"title": "Evictions", "body": "...", "city": "Atlanta", "state_name": "Georgia", "score": 4,
+                "created_at": "2025-09-01T08:00:00"}),
+    json.dumps({"title": "Bad state", "body": "...", "city": "Austin", "state_name": "Texas"}),
+    json.dumps({"title": "Shelters", "body": "...", "city": "Atlanta", "state_name": "Georgia"}),
+]) + "\n"
+
+def test_import_batches_rejects_and_resumes(app, monkeypatch):
+    calls, progress = [], []
+    monkeypatch.setattr(post_import, "analyze_many", _fake_analyze_many(calls))
+    rejects = io.StringIO()
+    stats = post_import.import_posts(io.StringIO(NDJSON), "ndjson", "city.ndjson", rejects=rejects,
+                                     batch_size=2,
+                                     on_batch=lambda s: progress.append((s["row"], rejects.getvalue().count("\n"))))
+    assert (stats["read"], stats["inserted"], stats["rejected"]) == (6, 3, 3)
+    # rejects land with their batch's checkpoint, never ahead of it
+    assert calls == [2, 1] and progress == [(4, 2), (6, 3)]
+    assert [json.loads(l)["row"] for l in rejects.getvalue().splitlines()] == [2, 3, 5]
+
+    post = CitizenPost.query.filter_by(title="Evictions").one()
+    assert (post.score, post.tags, post.created_at.month) == (4, ["housing"], 9)
+
+    # a re-run inserts nothing; resuming skips committed rows without classifying them
+    again = post_import.import_posts(io.StringIO(NDJSON), "ndjson", "city.ndjson", batch_size=2)
+    assert (again["inserted"], again["duplicates"]) == (0, 3)
+    calls.clear()
+    resumed = post_import.import_posts(io.StringIO(NDJSON), "ndjson", "city.ndjson", start_after=6)
+    assert resumed["read"] == 0 and calls == []
+    db.session.remove()
+    assert CitizenPost.query.count() == 3
+
+def test_import_streams_csv(app, monkeypatch):
+    monkeypatch.setattr(post_import, "analyze_many", _fake_analyze_many([]))
+    data = "title,body,city,county,state_name\nPotholes,Everywhere,Pasadena,Los Angeles County,California\n"
+    stats = post_import.import_posts(io.StringIO(data), "csv", "pasadena.csv")
+    assert stats["inserted"] == 1
+    assert CitizenPost.query.one().county == "Los Angeles County"
+
+def test_source_follows_content_not_just_the_name(tmp_path):
+    path = tmp_path / "posts.ndjson"
+    path.write_text(NDJSON)
+    first = post_import.source_for(str(path))
+    with open(path, "a") as f:
+        f.write(json.dumps({"title": "Appended", "body": "...", "city": "Atlanta", "state_name": "Georgia"}) + "\n")
+    assert post_import.source_for(str(path)) == first           # same leading rows: same post ids
+    path.write_text(NDJSON.replace("Rent up 20%", "Rent up 30%"))  # next month's export, same name
+    assert post_import.source_for(str(path)) != first and first.startswith("posts.ndjson:")
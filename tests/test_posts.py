@@ -0,0 +1,36 @@
+from src.app import db
+from src.app.services import posts_service
+
+def test_create_classifies_once_and_reads_stored_analysis(client, monkeypatch):
+    calls = []
+    ner = {"primary_category": "transport", "categories": [{"label": "transport", "score": 0.9}],
+           "tags": ["road_safety", "transport"], "entities": {"GPE": ["Sacramento"]}}
+    monkeypatch.setattr(posts_service, "analyze", lambda text: calls.append(text) or ner)
+
+    created = client.post("/api/v1/posts/", json={"title": "Bus lane", "body": "Sacramento needs one.",
+                                                    "city": "Sacramento", "state_name": "California"})
+    assert created.status_code == 201 and len(calls) == 1
+    out = created.get_json()
+    assert (out["primary_category"], out["categories"], out["tags"], out["entities"]) == (
+        "transport", ner["categories"], ner["tags"], ner["entities"])
+
+    db.session.remove()
+    listed = client.get("/api/v1/posts/?city=Sacramento").get_json()
+    assert listed[0]["tags"] == ["road_safety", "transport"] and len(calls) == 1
+
+def test_backfill_analysis_fills_old_posts(seeded, monkeypatch):
+    from src.app.models import CitizenPost
+    ner = {"primary_category": "housing", "categories": [{"label": "housing", "score": 0.8}],
+           "tags": ["housing"], "entities": {"GPE": ["Atlanta"]}}
+    calls = []
+    monkeypatch.setattr(posts_service, "analyze_many", lambda texts, entities=True: calls.append(len(texts)) or
+                        [ner for _ in texts])
+    total = CitizenPost.query.count()
+    before = {p.id: p.category for p in CitizenPost.query}
+
+    assert posts_service.backfill_analysis(batch_size=4) == total
+    assert calls == [4] * (total // 4) + ([total % 4] if total % 4 else [])
+    db.session.expire_all()
+    assert all(p.tags == ["housing"] and p.entities == ner["entities"] for p in CitizenPost.query)
+    assert {p.id: p.category for p in CitizenPost.query} == before   # primary category untouched
+    assert posts_service.backfill_analysis() == 0                    # nothing left to do
@@ -0,0 +1,62 @@
+import re
+
+import pytest
+
+from src.app.services.ner_service import RULES, rule_matches, rule_scores
+from src.app.services.rule_engine import PhraseMatcher
+
+# the per-label regexes rule_scores used before the phrase matcher
+LEGACY_RULES = [
+    (re.compile(r"\b(food desert|grocery|produce|supermarket|fresh food|food bank)\b", re.I), "food_access", 0.85),
+    (re.compile(r"\b(pothole|speeding|crosswalk|traffic light|unsafe road|collision|accident)\b", re.I), "road_safety", 0.80),
+    (re.compile(r"\b(homicide|shooting|robbery|assault|crime|car break[- ]?in|theft)\b", re.I), "crime", 0.85),
+    (re.compile(r"\b(rent hike|eviction|landlord|affordable housing|shelter|homeless encampment)\b", re.I), "housing", 0.80),
+    (re.compile(r"\b(zoning|rezon(e|ing)|variance|land use|setback|upzone)\b", re.I), "zoning", 0.75),
+    (re.compile(r"\b(bus|transit|metro|subway|train|station|bike lane|sidewalk)\b", re.I), "transport", 0.75),
+    (re.compile(r"\b(budget|appropriation|bond measure|levy|tax|funding cut|funding increase)\b", re.I), "budget", 0.75),
+    (re.compile(r"\b(clinic|hospital|urgent care|public health|mental health|overdose)\b", re.I), "health", 0.70),
+]
+
+def legacy_rule_scores(text):
+    best = {}
+    for rx, label, weight in LEGACY_RULES:
+        if rx.search(text):
+            best[label] = max(best.get(label, 0.0), weight)
+    return best
+
+CORPUS = [
+    "Our neighborhood is a food desert with no grocery store.",
+    "Two shootings and a car break-in last week near Market St.",
+    "CAR BREAKIN on 3rd, another car break in yesterday",
+    "The busses are late; bus_stop signs missing; the bus is late.",
+    "Rezoning and rezone hearings, but not rezoned or rezones.",
+    "Taxes went up. tax-funded clinic. The taxi stand moved.",
+    "trainee program at the train-station, stations closed",
+    "Public  health (double space) vs public health, mental-health",
+    "Landlord's eviction notice; SHELTER full; homeless encampment grows",
+    "food bank, food-bank, foodbank, fresh food market",
+    "bike lane/sidewalk/crosswalk/traffic light/unsafe road",
+    "land use, land-use, setback, upzone, upzoned, variance",
+    "Café grocery — naïve levy; über-budget funding cut",
+    "",
+    "nothing to see here",
+]
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_rule_scores_match_legacy_regexes(text):
+    assert rule_scores(text) == legacy_rule_scores(text)
+
+def test_rule_matches_report_phrases():
+    hits = rule_matches("Two shootings, a shooting and a Car Break-In near the bus station.")
+    assert hits == {"crime": ["shooting", "car break-in"], "transport": ["bus", "station"]}
+
+def test_overlapping_phrases_across_labels():
+    m = PhraseMatcher([("a", 0.5, ["food"]), ("b", 0.9, ["food bank"]), ("c", 0.1, ["bank"])])
+    assert m.scores("the Food Bank") == {"a": 0.5, "b": 0.9, "c": 0.1}
+
+def test_phrase_must_be_word_bounded():
+    with pytest.raises(ValueError):
+        PhraseMatcher([("x", 1.0, ["-dash"])])
+
+def test_rules_are_well_formed():
+    assert PhraseMatcher(RULES).size == sum(len(p) for _, _, p in RULES)
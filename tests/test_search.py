@@ -0,0 +1,47 @@
+from src.app import db
+from src.app.services.search_service import search
+
+from .test_indexes import _plan
+
+def test_search_ranks_across_sources_and_posts(client, seeded):
+    res = client.get("/api/v1/search/?q=housing").get_json()
+    kinds = {r["kind"] for r in res["results"]}
+    assert kinds == {"source", "post"}
+    assert all("housing" in r["title"].lower() for r in res["results"])
+    ranks = [r["rank"] for r in res["results"]]
+    assert ranks == sorted(ranks, reverse=True)
+
+def test_search_filters(seeded):
+    crime_ga = search("crime", state_name="Georgia")["results"]
+    assert {r["title"] for r in crime_ga} == {"Atlanta crime motion", "Atlanta crime 50"}
+
+    only_posts = search("crime", kinds=("posts",), city="Los Angeles")["results"]
+    assert len(only_posts) == 4 and all(r["kind"] == "post" for r in only_posts)
+
+    zoning = search("motion", category="zoning")["results"]
+    assert {r["title"] for r in zoning} == {f"LA housing motion {i}" for i in range(4)}
+
+def test_search_keyset_pages_cover_all_hits_once(seeded):
+    everything = search("crime OR housing", limit=50)["results"]
+    seen, cursor = [], None
+    while True:
+        page = search("crime OR housing", limit=3, cursor=cursor)
+        seen += [r["id"] for r in page["results"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == [r["id"] for r in everything]
+    assert len(seen) == len(set(seen)) == 18
+
+def test_search_rejects_bad_input(client, seeded):
+    assert client.get("/api/v1/search/").status_code == 400
+    assert client.get("/api/v1/search/?q=crime&type=bills").status_code == 400
+    assert client.get("/api/v1/search/?q=crime&cursor=garbage").status_code == 400
+
+def test_search_uses_gin_indexes(seeded):
+    from sqlalchemy import func
+    from src.app.models import CitizenPost, Source
+    tsq = func.websearch_to_tsquery("english", "housing")
+    assert "ix_sources_search_vector" in _plan(db.session.query(Source.id).filter(Source.search_vector.op("@@")(tsq)))
+    assert "ix_citizen_posts_search_vector" in _plan(
+        db.session.query(CitizenPost.id).filter(CitizenPost.search_vector.op("@@")(tsq)))
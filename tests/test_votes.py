@@ -0,0 +1,128 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.app import db
+from src.app.models.enums import VoteType
+from src.app.services.posts_service import vote_post
+
+from .test_discover import QueryCounter
+
+def _atlanta_post():
+    from src.app.models import CitizenPost
+    return CitizenPost.query.filter_by(city="Atlanta").one()
+
+def test_vote_transitions(seeded):
+    pid = _atlanta_post().id  # score 50
+    assert vote_post(pid, "a", VoteType.up).score == 51
+    assert vote_post(pid, "a", VoteType.up).score == 51    # repeat is a no-op
+    assert vote_post(pid, "a", VoteType.down).score == 49  # flip moves by 2
+    assert vote_post(pid, None, VoteType.up).score == 50   # tokenless: always counts
+    assert vote_post(pid, None, VoteType.up).score == 51
+
+    from src.app.models import PostVote
+    votes = PostVote.query.filter_by(post_id=pid).all()
+    assert sorted((v.voter_token_hash or "", v.vote.value) for v in votes) == [("", "up"), ("", "up"), ("a", "down")]
+
+def test_vote_is_one_statement(seeded):
+    pid = _atlanta_post().id
+    with QueryCounter() as q:
+        vote_post(pid, "tok", VoteType.up)
+    assert q.count == 1
+
+def test_vote_unknown_or_malformed_post(client, seeded):
+    assert vote_post(uuid.uuid4(), "a", VoteType.up) is None
+    assert client.post("/api/v1/posts/vote", json={"post_id": str(uuid.uuid4()), "vote": "up"}).status_code == 404
+    assert client.post("/api/v1/posts/vote", json={"post_id": "nope", "vote": "up"}).status_code == 400
+    pid = str(uuid.uuid4())
+    assert client.post("/api/v1/posts/vote", json={"post_id": pid, "vote": "sideways"}).status_code == 400
+    assert client.post("/api/v1/posts/vote", json={"post_id": pid}).status_code == 400
+    res = client.post("/api/v1/posts/vote", json={"post_id": str(_atlanta_post().id), "vote": "down", "voter_token_hash": "x"})
+    assert res.get_json()["score"] == 49
+
+def test_concurrent_votes_are_exact(app, seeded):
+    pid = _atlanta_post().id
+    db.session.remove()
+
+    def cast(i):
+        with app.app_context():
+            # 120 voters; every voter also retries its vote, and every 4th flips down afterwards
+            token = f"voter-{i}"
+            vote_post(pid, token, VoteType.up)
+            vote_post(pid, token, VoteType.up)
+            if i % 4 == 0:
+                vote_post(pid, token, VoteType.down)
+            vote_post(pid, None, VoteType.down)
+            db.session.remove()
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        list(pool.map(cast, range(120)))
+
+    flips = len(range(0, 120, 4))
+    expected = 50 + (120 - flips) - flips - 120
+    assert _atlanta_post().score == expected
+
+@pytest.fixture
+def buffer(monkeypatch):
+    # long interval / high threshold: nothing flushes unless the test says so
+    from src.app.services import vote_buffer
+    buf = vote_buffer.VoteBuffer(interval_ms=60_000, max_pending=100_000)
+    monkeypatch.setattr(vote_buffer, "buffer", buf)
+    return buf
+
+def test_buffered_votes_report_pending_score(seeded, buffer):
+    pid = _atlanta_post().id
+    assert vote_post(pid, "a", VoteType.up, buffered=True) == (pid, 51, 1)
+    assert vote_post(pid, "a", VoteType.up, buffered=True) == (pid, 51, 1)   # repeat: still idempotent
+    assert vote_post(pid, "a", VoteType.down, buffered=True) == (pid, 49, -1)
+    db.session.expire_all()
+    assert _atlanta_post().score == 50
+
+    assert buffer.flush() == 1
+    db.session.expire_all()
+    assert _atlanta_post().score == 49
+    assert buffer.pending(pid) == 0 and buffer.stats()["flushed_votes"] == 2
+
+def test_buffered_score_read_across_a_flush(app, seeded, buffer):
+    pid = _atlanta_post().id
+    assert vote_post(pid, "a", VoteType.up, buffered=True) == (pid, 51, 1)
+    buffer.flush()                                        # generation 1: score 51 in the table
+    # a vote whose statement read score 50 (generation 0) before that flush
+    # committed gets the flushed delta back; one that read 51 does not
+    assert buffer.add(app, pid, 1, seen=0) == 2
+    assert buffer.add(app, pid, 1, seen=1) == 2           # 2 unflushed: this vote and the last
+    assert buffer.pending(pid) == 2 and buffer.pending(pid, seen=0) == 3
+    assert vote_post(pid, "b", VoteType.up, buffered=True) == (pid, 51 + 3, 3)
+
+def test_buffered_concurrent_votes_are_exact(app, seeded, buffer):
+    pid = _atlanta_post().id
+    db.session.remove()
+
+    def cast(i):
+        with app.app_context():
+            vote_post(pid, f"voter-{i}", VoteType.up if i % 3 else VoteType.down, buffered=True)
+            db.session.remove()
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        list(pool.map(cast, range(90)))
+    buffer.flush()
+    assert _atlanta_post().score == 50 + 60 - 30
+
+def test_failed_flush_keeps_deltas(seeded, buffer, monkeypatch):
+    from src.app.services import vote_buffer
+    pid = _atlanta_post().id
+    vote_post(pid, "a", VoteType.up, buffered=True)
+
+    def boom(*args):
+        raise RuntimeError("db down")
+    monkeypatch.setattr(vote_buffer, "_apply", boom)
+    with pytest.raises(RuntimeError):
+        buffer.flush()
+    assert buffer.pending(pid) == 1 and buffer.stats()["errors"] == 1
+
+    monkeypatch.undo()
+    monkeypatch.setattr(vote_buffer, "buffer", buffer)
+    buffer.flush()
+    db.session.expire_all()
+    assert _atlanta_post().score == 51